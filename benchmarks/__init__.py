@@ -0,0 +1,7 @@
+"""
+Performance benchmarks, in asv's format (see asv.conf.json in the repository root).
+
+Run the suite against the current commit with ``asv run``, compare two commits with
+``asv continuous master HEAD`` (which flags benchmarks that changed by more than 10%), or ``asv compare`` results
+already recorded. ``asv run --quick --bench IndexerSuite`` runs a single suite once, for a quick look.
+"""
@@ -0,0 +1,56 @@
+"""
+Benchmarks for generating many workbooks with xl_link.batch, by number of workers, and by how frames reach them.
+"""
+from functools import partial
+
+import pandas as pd
+
+from xl_link.batch import Job, generate
+
+from .common import make_frame, temp_path
+
+
+class GenerateSuite:
+    """
+    Generate 64 workbooks of 1,000 x 10 frames, each with a line chart.
+    """
+
+    params = [[1, 2, 4, 8]]
+    param_names = ['workers']
+    timeout = 600
+
+    n_jobs = 64
+
+    def setup(self, workers):
+        self.jobs = [Job(temp_path('batch_{}.xlsx'.format(i)), partial(make_frame, 1000, 10))
+                     for i in range(self.n_jobs)]
+        self.charts = [{'type_': 'line', 'values': ['col 0', 'col 1']}]
+
+    def time_generate(self, workers):
+        generate(self.jobs, workers=workers, charts=self.charts, chunksize=4)
+
+
+class FrameTransferSuite:
+    """
+    Generate 16 workbooks of 20,000 x 10 frames with 2 workers, sending each frame to its worker pickled ('frame'), or
+    sending a callable that reads it from a pickle file ('loader').
+    """
+
+    params = [['frame', 'loader']]
+    param_names = ['source']
+    timeout = 600
+
+    n_jobs = 16
+
+    def setup(self, source):
+        self.jobs = []
+        for i in range(self.n_jobs):
+            frame = make_frame(20000, 10)
+            if source == 'loader':
+                path = temp_path('batch_{}.pkl'.format(i))
+                frame.to_pickle(path)
+                frame = partial(pd.read_pickle, path)
+            self.jobs.append(Job(temp_path('batch_{}.xlsx'.format(i)), frame))
+
+    def time_generate(self, source):
+        generate(self.jobs, workers=2, labels='hash')
@@ -0,0 +1,38 @@
+"""
+Benchmarks for creating charts from an XLMap, in asv's format (setup plus time_ methods).
+"""
+import pandas as pd
+
+from .common import ENGINES, make_frame, temp_path
+
+
+class CreateChartSuite:
+    """
+    XLMap.create_chart with a series per column or per row, and create_charts_by_group.
+    """
+
+    params = [ENGINES, [1, 10, 100]]
+    param_names = ['engine', 'series']
+
+    n_rows = 1000
+
+    def setup(self, engine, n_series):
+        f = make_frame(self.n_rows, n_series)
+        f['group'] = [i % 10 for i in range(self.n_rows)]
+
+        self.writer = pd.ExcelWriter(temp_path('CreateChartSuite.xlsx'), engine=engine)
+        self.xlmap = f.to_excel(self.writer, group_by='group')
+        self.values = list(f.columns[:-1])
+        self.rows = list(f.index[:n_series])
+
+    def time_create_chart(self, engine, n_series):
+        self.xlmap.create_chart('line', values=self.values)
+
+    def time_create_chart_categories(self, engine, n_series):
+        self.xlmap.create_chart('scatter', values=self.values[1:] or self.values, categories=self.values[0])
+
+    def time_create_chart_rows(self, engine, n_series):
+        self.xlmap.create_chart('line', values=self.rows, orient='rows')
+
+    def time_create_charts_by_group(self, engine, n_series):
+        self.xlmap.create_charts_by_group('line', values=self.values)
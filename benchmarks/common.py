@@ -0,0 +1,65 @@
+"""
+Frames and writers shared by the benchmark suites.
+
+Frame sizes run from 10 to 10^6 rows and 1 to 1,000 columns, suites that need a frame in memory skip combinations
+larger than FRAME_LIMIT cells, and suites that write to a workbook skip those larger than WRITE_LIMIT cells, by raising
+NotImplementedError in setup (which asv reports as skipped rather than failed).
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from xl_link import XLDataFrame
+
+
+ROWS = [10, 1000, 100000, 1000000]
+COLS = [1, 10, 1000]
+INDEX_TYPES = ['range', 'str', 'datetime', 'multi']
+ENGINES = ['xlsxwriter', 'openpyxl']
+
+FRAME_LIMIT = 10 ** 7
+WRITE_LIMIT = 10 ** 6
+
+
+def skip_larger_than(limit, n_rows, n_cols):
+    """
+    Skip the current benchmark if a frame of n_rows x n_cols has more than limit cells.
+    """
+    if n_rows * n_cols > limit:
+        raise NotImplementedError("{} x {} frame is larger than {} cells".format(n_rows, n_cols, limit))
+
+
+def make_index(index_type, n_rows):
+    """
+    Create an index of n_rows labels of index_type, one of INDEX_TYPES.
+
+    'multi' is a sorted two level index (blocks of 100 rows), so it's written with merged cells.
+    """
+    if index_type == 'range':
+        return pd.RangeIndex(n_rows)
+    if index_type == 'str':
+        return pd.Index(['row {}'.format(i) for i in range(n_rows)])
+    if index_type == 'datetime':
+        return pd.date_range('2000-01-01', periods=n_rows, freq='min')
+    if index_type == 'multi':
+        positions = np.arange(n_rows)
+        return pd.MultiIndex.from_arrays([positions // 100, positions % 100], names=['block', 'row'])
+    raise ValueError("Unknown index type {}".format(index_type))
+
+
+def make_frame(n_rows, n_cols, index_type='range'):
+    """
+    Create an XLDataFrame of random floats with n_rows, n_cols and an index of index_type.
+    """
+    return XLDataFrame(np.random.RandomState(0).rand(n_rows, n_cols),
+                       index=make_index(index_type, n_rows),
+                       columns=['col {}'.format(i) for i in range(n_cols)])
+
+
+def temp_path(name):
+    """
+    Path for a workbook in a fresh temporary directory.
+    """
+    return os.path.join(tempfile.mkdtemp(prefix='xl_link_bench_'), name)
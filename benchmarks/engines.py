@@ -0,0 +1,84 @@
+"""
+Calibration of the cost model xl_link.engines uses to choose an engine for to_excel(..., engine='auto').
+
+Run python -m benchmarks.engines to measure each engine's seconds and bytes per cell on this machine, and copy the
+results into xl_link.engines.ENGINE_COSTS. EngineCostSuite tracks the same numbers with asv, so changes in an engine's
+costs show up alongside the other benchmarks.
+"""
+import gc
+import pprint
+from time import perf_counter
+
+import pandas as pd
+
+from xl_link.engines import installed_engines
+
+from .common import make_frame, temp_path
+from .memory import RSSSampler
+
+
+def measure(engine, n_rows=100000, n_cols=10):
+    """
+    Measure the seconds and bytes (peak RSS growth) writing and saving an n_rows x n_cols frame with engine takes, per
+    cell written (index and header included).
+
+    Returns
+    -------
+    dict
+        of 'seconds_per_cell' and 'bytes_per_cell' (None if RSS can't be read on this platform).
+    """
+    f = make_frame(n_rows, n_cols)
+    n_cells = (n_rows + 1) * (n_cols + 1)
+
+    gc.collect()
+    sampler = RSSSampler()
+    sampler.start()
+    start = perf_counter()
+    try:
+        writer = pd.ExcelWriter(temp_path('engines.xlsx'), engine=engine)
+        pd.DataFrame.to_excel(f, writer)
+        writer.save()
+    finally:
+        seconds = perf_counter() - start
+        sampler.stop()
+
+    growth = sampler.growth
+    return {'seconds_per_cell': seconds / n_cells,
+            'bytes_per_cell': None if growth is None else int(round(growth / n_cells))}
+
+
+def calibrate(n_rows=100000, n_cols=10, engines=None):
+    """
+    Measure every installed engine, giving a dict in the format of xl_link.engines.ENGINE_COSTS.
+
+    Frames should be large enough for each engine's fixed costs (e.g. importing it, creating the workbook) not to count.
+    """
+    return {engine: measure(engine, n_rows, n_cols) for engine in installed_engines() if engines is None or
+            engine in engines}
+
+
+class EngineCostSuite:
+    """
+    Seconds and bytes per cell each engine takes to write and save a frame.
+    """
+
+    params = [['xlsxwriter', 'openpyxl']]
+    param_names = ['engine']
+    timeout = 600
+
+    def setup(self, engine):
+        if engine not in installed_engines():
+            raise NotImplementedError("{} isn't installed".format(engine))
+        self.costs = measure(engine)
+
+    def track_seconds_per_cell(self, engine):
+        return self.costs['seconds_per_cell']
+    track_seconds_per_cell.unit = 'seconds'
+
+    def track_bytes_per_cell(self, engine):
+        return self.costs['bytes_per_cell']
+    track_bytes_per_cell.unit = 'bytes'
+
+
+if __name__ == '__main__':
+    pprint.pprint(calibrate())
@@ -0,0 +1,171 @@
+"""
+Benchmarks for writing frames and mapping them, in asv's format (setup plus time_ methods).
+"""
+import pandas as pd
+
+from xl_link import XLDataFrame, XLMap, get_xl_ranges, frame_layout, layout_cache
+
+from .common import (ROWS, COLS, INDEX_TYPES, ENGINES, FRAME_LIMIT, WRITE_LIMIT, skip_larger_than, make_index,
+                     make_frame, temp_path)
+
+
+class ToExcelSuite:
+    """
+    XLDataFrame.to_excel, including saving the workbook, against plain DataFrame.to_excel for the overhead of mapping.
+    """
+
+    params = [ROWS, COLS, INDEX_TYPES, ENGINES]
+    param_names = ['rows', 'cols', 'index', 'engine']
+    timeout = 600
+
+    def setup(self, n_rows, n_cols, index_type, engine):
+        skip_larger_than(WRITE_LIMIT, n_rows, n_cols)
+        self.f = make_frame(n_rows, n_cols, index_type)
+        self.path = temp_path('ToExcelSuite.xlsx')
+
+    def time_to_excel(self, n_rows, n_cols, index_type, engine):
+        writer = pd.ExcelWriter(self.path, engine=engine)
+        self.f.to_excel(writer)
+        writer.save()
+
+    def time_pandas_to_excel(self, n_rows, n_cols, index_type, engine):
+        writer = pd.ExcelWriter(self.path, engine=engine)
+        pd.DataFrame.to_excel(self.f, writer)
+        writer.save()
+
+
+class LayoutSuite:
+    """
+    Working out where a frame lands, which only needs its index and columns. Repeats hit layout_cache, the _uncached
+    benchmarks run pandas' formatter every time.
+    """
+
+    params = [ROWS, COLS, INDEX_TYPES]
+    param_names = ['rows', 'cols', 'index']
+
+    def setup(self, n_rows, n_cols, index_type):
+        self.index = make_index(index_type, n_rows)
+        self.columns = pd.Index(['col {}'.format(i) for i in range(n_cols)])
+
+    def time_frame_layout(self, n_rows, n_cols, index_type):
+        frame_layout(self.index, self.columns)
+
+    def time_frame_layout_offset(self, n_rows, n_cols, index_type):
+        frame_layout(self.index, self.columns, startrow=3, startcol=2, index_label='label')
+
+    def time_frame_layout_uncached(self, n_rows, n_cols, index_type):
+        layout_cache.maxsize, maxsize = 0, layout_cache.maxsize
+        try:
+            frame_layout(self.index, self.columns)
+        finally:
+            layout_cache.maxsize = maxsize
+
+
+class GetXLRangesSuite:
+    """
+    get_xl_ranges, which also builds the empty frame it returns.
+    """
+
+    params = [ROWS, COLS, INDEX_TYPES]
+    param_names = ['rows', 'cols', 'index']
+
+    def setup(self, n_rows, n_cols, index_type):
+        skip_larger_than(FRAME_LIMIT, n_rows, n_cols)
+        self.index = make_index(index_type, n_rows)
+        self.columns = pd.Index(['col {}'.format(i) for i in range(n_cols)])
+
+    def time_get_xl_ranges(self, n_rows, n_cols, index_type):
+        get_xl_ranges(self.index, self.columns)
+
+
+class XLMapSuite:
+    """
+    Constructing an XLMap, and deriving maps from it.
+    """
+
+    params = [ROWS, COLS, INDEX_TYPES]
+    param_names = ['rows', 'cols', 'index']
+
+    def setup(self, n_rows, n_cols, index_type):
+        skip_larger_than(FRAME_LIMIT, n_rows, n_cols)
+        self.f = make_frame(n_rows, n_cols, index_type)
+        self.layout = frame_layout(self.f.index, self.f.columns)
+        self.writer = pd.ExcelWriter(temp_path('XLMapSuite.xlsx'), engine='openpyxl')
+        XLDataFrame(index=[0], columns=[0]).to_excel(self.writer)
+        self.xlmap = self.make_map()
+
+    def make_map(self):
+        layout = self.layout
+        return XLMap(layout.data, layout.index, layout.columns, self.f, writer=self.writer, layout=layout)
+
+    def time_init(self, n_rows, n_cols, index_type):
+        self.make_map()
+
+    def time_init_and_index(self, n_rows, n_cols, index_type):
+        self.make_map().iat[0, 0]
+
+    def time_subset(self, n_rows, n_cols, index_type):
+        self.xlmap.subset(columns=self.f.columns[n_cols // 2:])
+
+    def time_transpose(self, n_rows, n_cols, index_type):
+        self.xlmap.T
+
+
+class IndexerSuite:
+    """
+    Each XLMap indexer, with the kinds of key that go through pandas and those resolved directly.
+    """
+
+    params = [ROWS, INDEX_TYPES]
+    param_names = ['rows', 'index']
+
+    n_cols = 10
+
+    def setup(self, n_rows, index_type):
+        f = make_frame(n_rows, self.n_cols, index_type)
+        layout = frame_layout(f.index, f.columns)
+        writer = pd.ExcelWriter(temp_path('IndexerSuite.xlsx'), engine='openpyxl')
+        XLDataFrame(index=[0], columns=[0]).to_excel(writer)
+
+        self.xlmap = XLMap(layout.data, layout.index, layout.columns, f, writer=writer, layout=layout)
+        self.xlmap.iat[0, 0] # build the mapper frame outside of the timings
+
+        self.label = f.index[n_rows // 2]
+        self.labels = f.index[n_rows // 4:n_rows // 2]
+        self.first, self.last = self.labels[0], self.labels[-1]
+        self.column = f.columns[self.n_cols // 2]
+        self.mask = (f[self.column] > 0.5).values
+        self.position = n_rows // 2
+
+    def time_loc_label(self, n_rows, index_type):
+        self.xlmap.loc[self.label]
+
+    def time_loc_label_column(self, n_rows, index_type):
+        self.xlmap.loc[self.label, self.column]
+
+    def time_loc_slice(self, n_rows, index_type):
+        self.xlmap.loc[self.first:self.last, self.column]
+
+    def time_loc_mask(self, n_rows, index_type):
+        self.xlmap.loc[self.mask, self.column]
+
+    def time_iloc_row(self, n_rows, index_type):
+        self.xlmap.iloc[self.position]
+
+    def time_iloc_slice(self, n_rows, index_type):
+        self.xlmap.iloc[self.position // 2:self.position, 1:3]
+
+    def time_at(self, n_rows, index_type):
+        self.xlmap.at[self.label, self.column]
+
+    def time_iat(self, n_rows, index_type):
+        self.xlmap.iat[self.position, 1]
+
+    def time_getitem(self, n_rows, index_type):
+        self.xlmap[self.column]
+
+    def time_loc_cached(self, n_rows, index_type):
+        self.xlmap.cache_indexers()
+        for _ in range(100):
+            self.xlmap.loc[self.label, self.column]
+        self.xlmap.cache_indexers(0)
@@ -0,0 +1,246 @@
+"""
+Memory benchmarks for the write and map path, in asv's format (track_ methods report bytes, peakmem_ methods the peak
+RSS asv measures), along with the harness tests/memory.py uses to check thresholds.
+
+Each phase of writing and mapping a frame is run under tracemalloc, which reports the peak bytes allocated by Python
+and NumPy during the phase and what's still allocated at the end of it. RSS is sampled alongside from a background
+thread, catching allocations tracemalloc can't see (e.g. inside the engine's C extensions).
+"""
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from xl_link import XLDataFrame, XLMap, frame_layout
+from xl_link.xl_types import XLCell
+
+from .common import make_frame, temp_path
+
+
+def rss():
+    """
+    Get the resident set size of this process, in bytes, or None if it can't be read on this platform.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RSSSampler(threading.Thread):
+    """
+    Sample the RSS of this process every interval seconds until stopped, keeping the largest value seen.
+    """
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_rss = rss()
+        self.peak_rss = self.start_rss
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        current = rss()
+        if current is not None and (self.peak_rss is None or current > self.peak_rss):
+            self.peak_rss = current
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        self._sample()
+
+    @property
+    def growth(self):
+        """
+        Largest RSS seen above the RSS when sampling started, None if RSS can't be read.
+        """
+        if self.start_rss is None:
+            return None
+        return self.peak_rss - self.start_rss
+
+
+class PhaseRecorder:
+    """
+    Record the memory used by each phase of a workload.
+
+    Attributes
+    ----------
+    phases : OrderedDict
+        maps each phase's name to a dict of 'peak' (most bytes allocated at once during the phase), 'retained' (bytes
+        still allocated when the phase ended) and 'rss' (peak RSS growth during the phase, None if RSS can't be read).
+
+    Examples
+    --------
+    >>> recorder = PhaseRecorder()
+    >>> with recorder.phase('layout'):
+    >>>     layout = frame_layout(f.index, f.columns)
+    >>> recorder.phases['layout']['peak']
+        8001520
+    """
+
+    def __init__(self):
+        self.phases = OrderedDict()
+
+    @contextmanager
+    def phase(self, name):
+        if tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is already tracing, phases can't be recorded")
+
+        gc.collect()
+        sampler = RSSSampler()
+        sampler.start()
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            sampler.stop()
+            self.phases[name] = {'peak': peak, 'retained': retained, 'rss': sampler.growth}
+
+
+def write_and_map(n_rows, n_cols, index_type='range', engine='xlsxwriter'):
+    """
+    Record the memory of each phase of writing and mapping an n_rows x n_cols frame of floats.
+
+    Phases are 'write' (DataFrame.to_excel), 'layout' (frame_layout), 'map' (XLMap construction), 'index' (the first
+    indexer lookup, which builds the mapper frame) and, separately, 'to_excel' (XLDataFrame.to_excel, i.e. all of the
+    above in one call).
+
+    Returns
+    -------
+    PhaseRecorder
+        with an extra attribute, bytes_per_cell, the bytes an XLMap keeps per cell it maps (after its first lookup).
+    """
+    f = make_frame(n_rows, n_cols, index_type)
+    recorder = PhaseRecorder()
+
+    writer = pd.ExcelWriter(temp_path('write_and_map.xlsx'), engine=engine)
+    with recorder.phase('write'):
+        pd.DataFrame.to_excel(f, writer)
+
+    with recorder.phase('layout'):
+        layout = frame_layout(f.index, f.columns)
+
+    with recorder.phase('map'):
+        xlmap = XLMap(layout.data, layout.index, layout.columns, f, writer=writer, layout=layout)
+
+    with recorder.phase('index'):
+        xlmap.loc[f.index[n_rows // 2]]
+
+    del writer, xlmap
+
+    writer = pd.ExcelWriter(temp_path('write_and_map.xlsx'), engine=engine)
+    with recorder.phase('to_excel'):
+        XLDataFrame.to_excel(f, writer)
+
+    phases = recorder.phases
+    recorder.bytes_per_cell = (phases['map']['retained'] + phases['index']['retained']) / f.size
+    return recorder
+
+
+def bytes_per_object(make, n=10000):
+    """
+    Get the bytes each of n objects created with make(i) takes up.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        objects = [make(i) for i in range(n)]
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (current - sys.getsizeof(objects)) / n
+
+
+def bytes_per_xlcell(n=10000):
+    return bytes_per_object(lambda i: XLCell(i, i % 100, 'Sheet1'), n)
+
+
+def bytes_per_xlrange(n=10000):
+    return bytes_per_object(lambda i: XLCell(i, 0, 'Sheet1') - XLCell(i + 10, 5, 'Sheet1'), n)
+
+
+class WriteAndMapSuite:
+    """
+    Peak and retained bytes of each phase of writing and mapping a frame.
+    """
+
+    params = [[1000, 100000, 1000000], ['xlsxwriter', 'openpyxl']]
+    param_names = ['rows', 'engine']
+    unit = 'bytes'
+    timeout = 600
+
+    n_cols = 10
+
+    def setup(self, n_rows, engine):
+        self.recorder = write_and_map(n_rows, self.n_cols, engine=engine)
+
+    def track_write_peak(self, n_rows, engine):
+        return self.recorder.phases['write']['peak']
+
+    def track_layout_peak(self, n_rows, engine):
+        return self.recorder.phases['layout']['peak']
+
+    def track_map_peak(self, n_rows, engine):
+        return self.recorder.phases['map']['peak']
+
+    def track_index_peak(self, n_rows, engine):
+        return self.recorder.phases['index']['peak']
+
+    def track_to_excel_peak(self, n_rows, engine):
+        return self.recorder.phases['to_excel']['peak']
+
+    def track_bytes_per_mapped_cell(self, n_rows, engine):
+        return self.recorder.bytes_per_cell
+
+
+class ObjectSizeSuite:
+    """
+    Bytes per XLCell and XLRange.
+    """
+
+    unit = 'bytes'
+
+    def track_bytes_per_xlcell(self):
+        return bytes_per_xlcell()
+
+    def track_bytes_per_xlrange(self):
+        return bytes_per_xlrange()
+
+
+class PeakRSSSuite:
+    """
+    Peak RSS of XLDataFrame.to_excel, as measured by asv.
+    """
+
+    params = [[1000, 100000], ['xlsxwriter', 'openpyxl']]
+    param_names = ['rows', 'engine']
+
+    n_cols = 10
+
+    def setup(self, n_rows, engine):
+        self.f = make_frame(n_rows, self.n_cols)
+        self.path = temp_path('PeakRSSSuite.xlsx')
+
+    def peakmem_to_excel(self, n_rows, engine):
+        writer = pd.ExcelWriter(self.path, engine=engine)
+        self.f.to_excel(writer)
+        writer.save()
@@ -0,0 +1,36 @@
+"""
+Benchmarks for writing multi-sheet workbooks with xl_link.parallel.ParallelWriter, by number of workers, against
+XLDataFrame.to_excel.
+"""
+import pandas as pd
+
+from xl_link import XLDataFrame
+from xl_link.parallel import ParallelWriter
+
+from .common import make_frame, temp_path
+
+
+class ParallelWriterSuite:
+    """
+    Write 8 sheets of 50,000 x 10 frames to one workbook.
+    """
+
+    params = [[0, 1, 2, 4, 8]]
+    param_names = ['workers'] # 0 writes with XLDataFrame.to_excel
+    timeout = 600
+
+    n_sheets = 8
+
+    def setup(self, workers):
+        self.frames = [make_frame(50000, 10) for _ in range(self.n_sheets)]
+
+    def time_write(self, workers):
+        if workers:
+            writer = ParallelWriter(temp_path('parallel.xlsx'), workers=workers)
+            for i, frame in enumerate(self.frames):
+                writer.to_excel(frame, sheet_name='Sheet{}'.format(i))
+        else:
+            writer = pd.ExcelWriter(temp_path('parallel.xlsx'), engine='xlsxwriter')
+            for i, frame in enumerate(self.frames):
+                XLDataFrame.to_excel(frame, writer, sheet_name='Sheet{}'.format(i))
+        writer.save()
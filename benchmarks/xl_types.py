@@ -0,0 +1,104 @@
+"""
+Benchmarks for XLCell and XLRange, in asv's format (setup plus time_ methods).
+"""
+import numpy as np
+
+from xl_link.xl_types import XLCell, XLRange
+
+
+class HashingSuite:
+    """
+    Dict and set heavy workloads, the kind charting and mapping code runs when references are cached or deduplicated.
+    """
+
+    def setup(self):
+        self.cells = [XLCell(row, col) for row in range(1000) for col in range(20)]
+        self.columns = [XLRange(XLCell(0, col), XLCell(row, col)) for row in range(1, 501) for col in range(40)]
+        # ranges sharing their start and rows, previously these all hashed alike
+        self.rows = [XLRange(XLCell(row, 0), XLCell(row, col)) for row in range(10) for col in range(2000)]
+        self.lookup = {xlrange: i for i, xlrange in enumerate(self.columns)}
+
+    def time_set_of_cells(self):
+        set(self.cells)
+
+    def time_dict_of_column_ranges(self):
+        {xlrange: i for i, xlrange in enumerate(self.columns)}
+
+    def time_dict_lookup(self):
+        lookup = self.lookup
+        for xlrange in self.columns:
+            lookup[xlrange]
+
+    def time_dict_of_row_ranges(self):
+        {xlrange: i for i, xlrange in enumerate(self.rows)}
+
+    def time_sort_ranges(self):
+        sorted(self.columns)
+
+    def time_unique_packed(self):
+        np.unique(np.array([xlrange.packed for xlrange in self.columns], dtype=np.int64))
+
+
+class IterationSuite:
+    """
+    Walking every cell of a long column, and every row of a wide block.
+    """
+
+    def setup(self):
+        self.column = XLCell(0, 2) - XLCell(999999, 2)
+        self.block = XLCell(0, 0) - XLCell(99999, 9)
+
+    def time_iter_column(self):
+        for _ in self.column:
+            pass
+
+    def time_iter_cells_rowcol(self):
+        for _ in self.column.iter_cells('rowcol'):
+            pass
+
+    def time_iter_cells_str(self):
+        for _ in self.column.iter_cells('cell'):
+            pass
+
+    def time_iterrows(self):
+        for _ in self.block.iterrows():
+            pass
+
+
+class RangeOpsSuite:
+    """
+    The XLCell and XLRange operations indexers and charts use for every result: creating, moving, slicing and
+    formatting references.
+    """
+
+    def setup(self):
+        self.starts = [XLCell(row, row % 50) for row in range(10000)]
+        self.column = XLCell(0, 3) - XLCell(99999, 3)
+        self.block = XLCell(5, 2) - XLCell(100004, 41)
+        self.franges = [xlrange.frange for xlrange in (start - start.translate(20, 0) for start in self.starts)]
+
+    def time_cell_subtraction(self):
+        for start in self.starts:
+            start - start.translate(20, 0)
+
+    def time_translate(self):
+        for start in self.starts:
+            start.translate(5, 5)
+
+    def time_range_slice(self):
+        column = self.column
+        for i in range(10000):
+            column[i:i + 10]
+
+    def time_block_select(self):
+        block = self.block
+        for i in range(10000):
+            block[i:i, 3:7]
+
+    def time_frange(self):
+        for start in self.starts:
+            (start - start.translate(20, 0)).frange
+
+    def time_from_frange(self):
+        for frange in self.franges:
+            XLRange.from_frange(frange)
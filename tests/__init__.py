@@ -1,6 +1,6 @@
 from unittest import defaultTestLoader, TestSuite
 
-from . import xlmap, xl_types, indexers, charts
+from . import xlmap, xl_types, indexers, charts, memory
 
 
 def load_tests(loader, standard_tests, pattern):
@@ -12,4 +12,5 @@ def load_tests(loader, standard_tests, pattern):
     suite.addTests(xl_types_tests)
     suite.addTest(indexer_tests)
     suite.addTest(charts.suite)
+    suite.addTests(defaultTestLoader.loadTestsFromModule(memory))
     return suite
@@ -8,9 +8,11 @@ inspected them. So please take these tests with a pinch of salt!
 import unittest
 from .tools import path_for, TEST_CASE_FOLDER
 
+import numpy as np
 import pandas as pd
 
 from xl_link import XLDataFrame
+from xl_link.downsample import lttb_indices, minmax_indices
 
 
 test_frame = XLDataFrame(columns=("Mon", "Tues", "Weds", "Thur"),
@@ -102,3 +104,199 @@ for chart_type in CHART_TYPES:
             case_suite.addTest(FromFactory(name))
 
         suite.addTest(case_suite)
+
+
+class DownsampleCase(unittest.TestCase):
+
+    n_points = 50
+
+    def setUp(self):
+        self.f = XLDataFrame(data={'Y1': np.sin(np.linspace(0, 20, 2000)),
+                                   'Y2': np.random.rand(2000)})
+        self.writer = pd.ExcelWriter(path_for('charts', 'DownsampleCase'), engine='xlsxwriter')
+        self.xlmap = self.f.to_excel(self.writer)
+
+    def tearDown(self):
+        self.writer.close()
+
+    def test_helper_block(self):
+        self.xlmap.create_chart('scatter', values=('Y1', 'Y2'), downsample=self.n_points)
+        helper, = self.xlmap.helpers
+
+        self.assertLessEqual(len(helper.f), self.n_points * 2)
+        self.assertEqual(helper.index.start.row, self.xlmap.index.start.row)
+        self.assertGreater(helper.index.start.col, self.xlmap.data.stop.col)
+        pd.testing.assert_frame_equal(pd.DataFrame(helper.f), pd.DataFrame(self.f.loc[helper.f.index]))
+
+    def test_minmax_keeps_extremes(self):
+        self.xlmap.create_chart('line', values='Y2', downsample=self.n_points, downsample_method='minmax')
+        helper, = self.xlmap.helpers
+
+        self.assertEqual(helper.f['Y2'].max(), self.f['Y2'].max())
+        self.assertEqual(helper.f['Y2'].min(), self.f['Y2'].min())
+
+    def test_helpers_do_not_overlap(self):
+        self.xlmap.create_chart('line', values='Y1', downsample=self.n_points)
+        self.xlmap.create_chart('line', values='Y2', downsample=self.n_points)
+        first, second = self.xlmap.helpers
+
+        self.assertGreater(second.index.start.col, first.extent.stop.col)
+
+    def test_point_budget(self):
+        x, y = np.arange(len(self.f)), self.f['Y2'].values
+        for n_out in (1, 2, 3, 4, 5, 6, 7, 50, 51, len(y) - 1):
+            for selected in (lttb_indices(x, y, n_out), minmax_indices(y, n_out)):
+                self.assertLessEqual(len(selected), n_out)
+                self.assertEqual(selected[0], 0)
+                if n_out > 1:
+                    self.assertEqual(selected[-1], len(y) - 1)
+        self.assertRaises(ValueError, lttb_indices, x, y, 0)
+        self.assertRaises(ValueError, minmax_indices, y, 0)
+
+    def test_short_frame_not_downsampled(self):
+        self.xlmap.create_chart('line', values='Y1', downsample=len(self.f))
+        self.assertEqual(self.xlmap.helpers, [])
+
+
+class RowChartCase:
+
+    engine = None
+
+    def setUp(self):
+        self.writer = pd.ExcelWriter(path_for('charts', self.engine + 'RowChartCase'), engine=self.engine)
+        self.xlmap = test_frame.to_excel(self.writer)
+
+    def tearDown(self):
+        self.writer.close()
+
+    def test_row_ranges(self):
+        ranges = self.xlmap._row_ranges(['Lunch', 'Breakfast'])
+        self.assertEqual(ranges, [self.xlmap.loc['Lunch'], self.xlmap.loc['Breakfast']])
+        self.assertRaises(KeyError, self.xlmap._row_ranges, ['Brunch'])
+
+    def test_default_params(self):
+        self.xlmap.create_chart('line', orient='rows')
+
+    def test_values_and_categories(self):
+        self.xlmap.create_chart('scatter', values=('Lunch', 'Dinner'), categories='Breakfast', orient='rows')
+
+    def test_bad_orient(self):
+        self.assertRaises(ValueError, self.xlmap.create_chart, 'line', orient='diagonal')
+
+
+class XlsxWriterRowChartCase(RowChartCase, unittest.TestCase):
+
+    engine = 'xlsxwriter'
+
+    def test_series(self):
+        chart = self.xlmap.create_chart('line', values=('Lunch', 'Dinner'), orient='rows')
+        self.assertEqual([series['values'] for series in chart.series],
+                         ['=' + self.xlmap.loc['Lunch'].frange, '=' + self.xlmap.loc['Dinner'].frange])
+        self.assertEqual([series['name'] for series in chart.series], ['Lunch', 'Dinner'])
+
+
+class OpenPyXLRowChartCase(RowChartCase, unittest.TestCase):
+
+    engine = 'openpyxl'
+
+    def test_series(self):
+        chart = self.xlmap.create_chart('line', values=('Lunch', 'Dinner'), orient='rows')
+        self.assertEqual([series.tx.v for series in chart.series], ['Lunch', 'Dinner'])
+        self.assertEqual(len(chart.series), 2)
+
+
+class PlaceChartsCase:
+
+    engine = None
+
+    def setUp(self):
+        self.writer = pd.ExcelWriter(path_for('charts', self.engine + 'PlaceChartsCase'), engine=self.engine)
+        self.xlmap = test_frame.to_excel(self.writer)
+        self.charts = [self.xlmap.create_chart('line', values=column) for column in test_frame.columns]
+
+    def tearDown(self):
+        self.writer.close()
+
+    def assertNoOverlaps(self, ranges):
+        for i, a in enumerate(ranges):
+            for b in ranges[i + 1:]:
+                overlap = (a.start.row <= b.stop.row and b.start.row <= a.stop.row and
+                           a.start.col <= b.stop.col and b.start.col <= a.stop.col)
+                self.assertFalse(overlap, "{} overlaps {}".format(a, b))
+
+    def test_right(self):
+        placed = self.xlmap.place_charts(self.charts)
+        self.assertEqual(len(placed), len(self.charts))
+        self.assertTrue(all(r.start.col > self.xlmap.data.stop.col for r in placed))
+        self.assertNoOverlaps(placed)
+
+    def test_below_grid(self):
+        placed = self.xlmap.place_charts(self.charts, anchor='below', cols=2, size=(320, 200))
+        self.assertTrue(all(r.start.row > self.xlmap.data.stop.row for r in placed))
+        self.assertEqual(placed[0].shape, (10, 5))
+        self.assertEqual(placed[0].start.row, placed[1].start.row)
+        self.assertGreater(placed[2].start.row, placed[0].stop.row)
+        self.assertNoOverlaps(placed)
+
+    def test_repeated_calls(self):
+        placed = self.xlmap.place_charts(self.charts[:2], anchor='below')
+        placed += self.xlmap.place_charts(self.charts[2:])
+        self.assertNoOverlaps(placed + [self.xlmap.data])
+
+
+class XlsxWriterPlaceChartsCase(PlaceChartsCase, unittest.TestCase):
+
+    engine = 'xlsxwriter'
+
+
+class OpenPyXLPlaceChartsCase(PlaceChartsCase, unittest.TestCase):
+
+    engine = 'openpyxl'
+
+
+class ReferenceCacheCase:
+
+    engine = None
+
+    def setUp(self):
+        self.writer = pd.ExcelWriter(path_for('charts', self.engine + 'ReferenceCacheCase'), engine=self.engine)
+        self.xlmap = test_frame.to_excel(self.writer)
+
+    def tearDown(self):
+        self.writer.close()
+
+    def test_shared_categories(self):
+        cache = self.xlmap.reference_cache
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+        for column in test_frame.columns:
+            self.xlmap.create_chart('scatter', values=column)
+
+        self.assertEqual(cache.misses, 1 + len(test_frame.columns))
+        self.assertEqual(cache.hits, len(test_frame.columns) - 1)
+
+        self.xlmap.create_chart('scatter')
+        self.assertEqual(cache.misses, 1 + len(test_frame.columns))
+
+    def test_keyed_by_position(self):
+        cache = self.xlmap.reference_cache
+        first = cache.get(self.xlmap['Mon'], lambda r: object())
+        self.assertIs(cache.get(self.xlmap.iloc[:, 0], lambda r: object()), first)
+        self.assertIsNot(cache.get(self.xlmap['Tues'], lambda r: object()), first)
+
+
+class XlsxWriterReferenceCacheCase(ReferenceCacheCase, unittest.TestCase):
+
+    engine = 'xlsxwriter'
+
+
+class OpenPyXLReferenceCacheCase(ReferenceCacheCase, unittest.TestCase):
+
+    engine = 'openpyxl'
+
+
+for case in (DownsampleCase, XlsxWriterRowChartCase, OpenPyXLRowChartCase,
+             XlsxWriterPlaceChartsCase, OpenPyXLPlaceChartsCase,
+             XlsxWriterReferenceCacheCase, OpenPyXLReferenceCacheCase):
+    for name in unittest.TestLoader().getTestCaseNames(case):
+        suite.addTest(case(name))
@@ -9,6 +9,8 @@ These tests build upon pandas and openpyxl, and work on the assumption that thos
 import unittest
 from pathlib import Path
 
+import numpy as np
+
 from xl_link import XLDataFrame
 
 from .tools import XLMapBaseCase, path_for
@@ -39,6 +41,10 @@ class GetItemIndexerCase(XLMapBaseCase, unittest.TestCase):
         cols = self.f[column_names]
         self.check_frame(cols, self.xlmap[column_names])
 
+    def test_get_non_contiguous_columns(self):
+        selection = self.xlmap[['Mon', 'Weds']]
+        self.assertEqual(selection.ranges, [self.xlmap['Mon'], self.xlmap['Weds']])
+
 
 class BaseIndexerCase(XLMapBaseCase):
 
@@ -98,5 +104,29 @@ class iLocIndexerCase(iAtIndexerCase):
             self.check_series(self.f_indexer[:, column], self.map_indexer[:, column])
 
 
+class MaskIndexerCase(unittest.TestCase):
+
+    def setUp(self):
+        self.f = XLDataFrame(data={'value': [5, 1, 7, 8, 0, 9, 2], 'other': range(7)}, columns=('value', 'other'))
+        self.xlmap = self.f.to_excel(path_for('MaskIndexerCase'), engine='openpyxl')
+
+    def test_mask_runs(self):
+        selection = self.xlmap.loc[self.f['value'] > 4, 'value']
+        self.assertEqual(selection.range, 'B2:B2,B4:B5,B7:B7')
+
+    def test_contiguous_mask(self):
+        self.assertEqual(self.xlmap.loc[self.f['other'] < 3], self.xlmap.iloc[0:3, :])
+        self.assertEqual(self.xlmap[(self.f['other'] < 3).values], self.xlmap.iloc[0:3, :])
+
+    def test_integer_array(self):
+        self.assertEqual(self.xlmap.iloc[[5, 0, 1], 1].range, 'C2:C3,C7:C7')
+        self.assertEqual(self.xlmap.iloc[np.array([-1]), :], self.xlmap.iloc[6, :])
+
+    def test_matches_pandas_path(self):
+        mask = self.f['value'] % 2 == 0
+        shuffled = mask.sample(frac=1, random_state=0) # needs aligning, so is resolved by pandas
+        self.assertEqual(self.xlmap.loc[mask, 'other'], self.xlmap.loc[shuffled, 'other'])
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=3)
@@ -0,0 +1,60 @@
+"""
+Memory regression tests for the write and map path, using the harness in benchmarks/memory.py.
+
+Thresholds are relative to the size of the frame's values (nbytes), so they hold for any frame size. They are set a
+little above what is currently measured, if one fails, check for a new copy of the frame (or a larger mapper frame)
+before raising it.
+"""
+import unittest
+
+from benchmarks.memory import write_and_map, bytes_per_xlcell, bytes_per_xlrange
+
+
+MAX_BYTES_PER_MAPPED_CELL = 20 # a copy of the values and the int64 mapper frame
+MAX_MAP_PEAK = 1.25 # times nbytes
+MAX_INDEX_PEAK = 1.25 # times nbytes
+MAX_LAYOUT_BYTES_PER_ROW = 64
+MAX_TO_EXCEL_OVERHEAD = 2 # peak of XLDataFrame.to_excel above DataFrame.to_excel, times nbytes
+
+MAX_BYTES_PER_XLCELL = 256
+MAX_BYTES_PER_XLRANGE = 700
+
+
+class WriteAndMapCase(unittest.TestCase):
+
+    n_rows, n_cols = 20000, 10
+
+    @classmethod
+    def setUpClass(cls):
+        cls.recorder = write_and_map(cls.n_rows, cls.n_cols)
+        cls.nbytes = cls.n_rows * cls.n_cols * 8
+        cls.phases = cls.recorder.phases
+
+    def test_bytes_per_mapped_cell(self):
+        self.assertLessEqual(self.recorder.bytes_per_cell, MAX_BYTES_PER_MAPPED_CELL)
+
+    def test_map_peak(self):
+        self.assertLessEqual(self.phases['map']['peak'], MAX_MAP_PEAK * self.nbytes)
+
+    def test_index_peak(self):
+        self.assertLessEqual(self.phases['index']['peak'], MAX_INDEX_PEAK * self.nbytes)
+
+    def test_layout_peak(self):
+        self.assertLessEqual(self.phases['layout']['peak'], MAX_LAYOUT_BYTES_PER_ROW * self.n_rows)
+
+    def test_to_excel_overhead(self):
+        overhead = self.phases['to_excel']['peak'] - self.phases['write']['peak']
+        self.assertLessEqual(overhead, MAX_TO_EXCEL_OVERHEAD * self.nbytes)
+
+
+class ObjectSizeCase(unittest.TestCase):
+
+    def test_xlcell(self):
+        self.assertLessEqual(bytes_per_xlcell(), MAX_BYTES_PER_XLCELL)
+
+    def test_xlrange(self):
+        self.assertLessEqual(bytes_per_xlrange(), MAX_BYTES_PER_XLRANGE)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=3)
@@ -8,7 +8,9 @@ TEST_CASE_FOLDER = Path("./tests/test_cases")
 def path_for(*args):
     *path, file = args
     file += '.xlsx'
-    return Path(TEST_CASE_FOLDER , *path, file).absolute().as_posix()
+    path = Path(TEST_CASE_FOLDER , *path, file).absolute()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.as_posix()
 
 class XLMapBaseCase:
 
@@ -10,6 +10,7 @@ These tests build upon openpyxl, and work on the assumption that those modules a
 """
 
 import json
+import threading
 import unittest
 from abc import abstractmethod
 
@@ -17,7 +18,7 @@ import numpy as np
 from openpyxl import load_workbook
 from openpyxl.chart.reference import Reference
 
-from xl_link import xl_types
+from xl_link import xl_types, count_ops
 from xl_link.xlsxwriter.utility import xl_rowcol_to_cell
 
 test_workbook = load_workbook(r"./tests/test_cases/XLTypesTestGrid.xlsx")
@@ -267,4 +268,235 @@ XLCell34by20Sheet1Case = xl_cell_case_factory(34, 20, 'Sheet1')
 XLCell73by103DifferentSheetCase = xl_cell_case_factory(73, 103, 'DifferentSheet')
 
 XLRange2DCase = xl_range_case_factory((3, 2), (6, 8), 'Sheet1')
-XLRangeRowCase = xl_range_case_factory((5, 10), (10, 10), 'Sheet1')
\ No newline at end of file
+XLRangeRowCase = xl_range_case_factory((5, 10), (10, 10), 'Sheet1')
+
+def cells_of(xlranges):
+    return {(sheet, row, col)
+            for xlrange in xlranges
+            for sheet in (xlrange.sheet,)
+            for row in range(xlrange.start.row, xlrange.stop.row + 1)
+            for col in range(xlrange.start.col, xlrange.stop.col + 1)}
+
+
+class HashOrderCase(unittest.TestCase):
+
+    def test_range_hash_uses_stop_col(self):
+        columns = {xl_types.XLRange.from_range('A1:{}10'.format(xl_rowcol_to_cell(0, col)[:-1]))
+                   for col in range(1, 50)}
+        self.assertEqual(len(columns), 49)
+        self.assertEqual(len({hash(xlrange) for xlrange in columns}), 49)
+
+    def test_equal_ranges_hash_equal(self):
+        a, b = xl_types.XLRange.from_range('B2:D9', 'Data'), xl_types.XLRange.from_frange("'Data'!B2:D9")
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual({a: 1}[b], 1)
+        self.assertEqual(a, "'Data'!B2:D9")
+
+    def test_compare_other_types(self):
+        xlrange = xl_types.XLRange.from_range('A1:B2')
+        self.assertNotEqual(xlrange, 5)
+        self.assertNotEqual(xlrange, xlrange.start)
+        self.assertNotEqual(xlrange.start, None)
+        self.assertRaises(TypeError, lambda: xlrange < 5)
+        self.assertNotEqual(xlrange, 'foo')
+        self.assertNotEqual(xlrange.start, 'foo')
+        self.assertIs(xlrange.__eq__('foo'), False)
+
+        ranges = xl_types.XLRangeSet([xlrange])
+        self.assertIs(ranges.__eq__(5), NotImplemented)
+        self.assertNotEqual(ranges, 'foo')
+        self.assertEqual(ranges, "'Sheet1'!A1:B2")
+        self.assertEqual(xl_types.XLRangeSet([xlrange, xl_types.XLRange.from_frange("'a,b'!C3")]),
+                         "'a,b'!C3,'Sheet1'!A1:B2")
+
+    def test_cell_ordering(self):
+        cells = [xl_types.XLCell(2, 0), xl_types.XLCell(0, 3), xl_types.XLCell(0, 1, 'A'), xl_types.XLCell(0, 0)]
+        self.assertEqual(sorted(cells), [cells[2], cells[3], cells[1], cells[0]])
+        self.assertEqual(sorted(cells, key=lambda cell: cell.packed)[1:], [cells[2], cells[1], cells[0]])
+
+    def test_range_ordering(self):
+        ranges = [xl_types.XLRange.from_range(r) for r in ('B1:B4', 'A1:C1', 'A1:A9', 'A2:A3')]
+        self.assertEqual([xlrange.range for xlrange in sorted(ranges)], ['A1:C1', 'A1:A9', 'B1:B4', 'A2:A3'])
+        packed = np.array([xlrange.packed for xlrange in ranges + ranges], dtype=np.int64)
+        self.assertEqual(list(np.unique(packed)), sorted(xlrange.packed for xlrange in ranges))
+
+
+class IterationCase(unittest.TestCase):
+
+    def setUp(self):
+        self.square = xl_types.XLCell(1, 2, "Bob's") - xl_types.XLCell(3, 4, "Bob's")
+
+    def test_iter_cells_matches_indexing(self):
+        expected = [self.square[row, col] for row in range(3) for col in range(3)]
+        self.assertEqual(list(self.square.iter_cells()), expected)
+        self.assertEqual(list(self.square.iter_cells('rowcol')), [cell.rowcol for cell in expected])
+        self.assertEqual(list(self.square.iter_cells('cell')), [cell.cell for cell in expected])
+        self.assertEqual(list(self.square.iter_cells('fcell')), [cell.fcell for cell in expected])
+
+    def test_iter_cells_by_cols(self):
+        expected = [self.square[row, col] for col in range(3) for row in range(3)]
+        self.assertEqual(list(self.square.iter_cells(order='cols')), expected)
+        self.assertEqual(list(self.square.iter_cells('cell', order='cols')), [cell.cell for cell in expected])
+
+    def test_iterrows_itercols(self):
+        self.assertEqual(list(self.square.iterrows()), [self.square[row:row, :] for row in range(3)])
+        self.assertEqual(list(self.square.itercols()), [self.square[:, col:col] for col in range(3)])
+        self.assertEqual(list(self.square.iterrows('frange')), [row.frange for row in self.square.iterrows()])
+        self.assertEqual(list(self.square.itercols('rowcol')), [col.rowcol_rowcol for col in self.square.itercols()])
+
+    def test_iter_1D(self):
+        column = xl_types.XLRange.from_range('B2:B6')
+        self.assertEqual(list(column), [column[i] for i in range(len(column))])
+        self.assertRaises(TypeError, list, column.itercols())
+
+    def test_bad_arguments(self):
+        self.assertRaises(ValueError, list, self.square.iter_cells('xlrange'))
+        self.assertRaises(ValueError, list, self.square.iter_cells(order='diagonal'))
+        self.assertRaises(ValueError, list, self.square.iterrows('cell'))
+
+
+class ParsingCase(unittest.TestCase):
+
+    def test_quoted_sheets(self):
+        cell = xl_types.XLCell(2, 3, "Bob's!Sheet")
+        self.assertEqual(cell.fcell, "'Bob''s!Sheet'!D3")
+        self.assertEqual(xl_types.XLCell.from_fcell(cell.fcell), cell)
+        xlrange = cell - cell.translate(4, 1)
+        self.assertEqual(xl_types.XLRange.from_frange(xlrange.frange), xlrange)
+
+    def test_absolute_references(self):
+        self.assertEqual(xl_types.XLCell.from_fcell("Data!$B$7"), xl_types.XLCell(6, 1, 'Data'))
+        self.assertEqual(xl_types.XLRange.from_frange("'Data'!$A$1:B$20").range, 'A1:B20')
+
+    def test_bad_references(self):
+        for bad in ("A1", "'Data'!A1:B2", "'Data'!", "Data!A1:", ""):
+            self.assertRaises(ValueError, xl_types.XLCell.from_fcell, bad)
+        self.assertRaises(ValueError, xl_types.XLRange.from_frange, "A1:B2")
+
+    def test_parse_franges(self):
+        franges = ["'Sales'!$A$1:$A$20", "Costs!B1:C9", "'Bob''s'!Z5", "'Sales'!D2:D20"]
+        ranges = xl_types.parse_franges(franges)
+        self.assertEqual(len(ranges), 4)
+        self.assertEqual(ranges.sheets, ['Sales', 'Costs', "Bob's"])
+        self.assertEqual(list(ranges), [xl_types.XLRange.from_frange(frange) for frange in franges])
+        self.assertEqual(ranges.shapes.tolist(), [[20, 1], [9, 2], [1, 1], [19, 1]])
+        self.assertEqual(list(ranges[ranges.sheet_codes == 0].starts), [xl_types.XLCell(0, 0, 'Sales'),
+                                                                         xl_types.XLCell(1, 3, 'Sales')])
+
+    def test_parse_fcells(self):
+        cells = xl_types.parse_fcells(["'A'!A1", "B2", "'A'!$C$3"], sheet='Default')
+        self.assertEqual(cells.rows.tolist(), [0, 1, 2])
+        self.assertEqual(cells[1], xl_types.XLCell(1, 1, 'Default'))
+        self.assertEqual(cells.sheet_names.tolist(), ['A', 'Default', 'A'])
+        self.assertRaises(ValueError, xl_types.parse_fcells, ["B2"])
+        self.assertRaises(ValueError, xl_types.parse_fcells, ["'A'!A1:B2"])
+        self.assertRaises(ValueError, xl_types.parse_fcells, ["'A'!A1", "nonsense"])
+
+
+class CountOpsCase(unittest.TestCase):
+
+    def test_counts(self):
+        with count_ops() as counts:
+            start = xl_types.XLCell(0, 0)
+            column = start - start.translate(9, 0)
+            column.frange
+            xl_types.XLRange.from_frange("'Sheet1'!A1:B2")
+
+        self.assertEqual(counts['translate'], 1)
+        self.assertEqual(counts['xlrange'], 2)
+        self.assertEqual(counts['to_a1'], 2)
+        self.assertEqual(counts['from_a1'], 1)
+        self.assertEqual(counts['xlcell'], 8) # 3 made, 1 by translate and 2 copies per range
+
+    def test_per_cell_paths(self):
+        column = xl_types.XLCell(0, 0) - xl_types.XLCell(999, 0)
+        with count_ops() as counts:
+            list(column.iter_cells('rowcol'))
+            list(column.iter_cells('cell'))
+        self.assertEqual(counts['xlcell'], 0)
+        self.assertEqual(counts['to_a1'], 0)
+
+        with count_ops() as counts:
+            list(column)
+        self.assertEqual(counts['xlcell'], 1000)
+
+    def test_nested_and_threads(self):
+        with count_ops() as outer:
+            with count_ops() as inner:
+                xl_types.XLCell(0, 0)
+            thread = threading.Thread(target=xl_types.XLCell, args=(1, 1))
+            thread.start()
+            thread.join()
+        self.assertEqual(outer['xlcell'], 1)
+        self.assertEqual(inner['xlcell'], 1)
+
+    def test_off(self):
+        with count_ops() as counts:
+            pass
+        xl_types.XLCell(0, 0)
+        self.assertEqual(sum(counts.values()), 0)
+
+
+class XLRangeSetCase(unittest.TestCase):
+
+    def setUp(self):
+        self.column = xl_types.XLRange.from_range('A1:A12')
+        self.row = xl_types.XLRange.from_range('B3:M3')
+
+    def test_bool_indexer_with_holes(self):
+        mask = np.array([True] * 5 + [False] * 3 + [True] * 4)
+        selection = self.column[mask]
+        self.assertIsInstance(selection, xl_types.XLRangeSet)
+        self.assertEqual(selection.frange, "'Sheet1'!A1:A5,'Sheet1'!A9:A12")
+        self.assertEqual(len(selection), 2)
+        self.assertEqual(selection.size, mask.sum())
+
+    def test_bool_indexer_contiguous(self):
+        self.assertEqual(self.row[[False, True, True] + [False] * 9], xl_types.XLRange.from_range('C3:D3'))
+
+    def test_integer_array_indexer(self):
+        self.assertEqual(self.row[[0, 1, 2, 6, 7]].range, 'B3:D3,H3:I3')
+        self.assertEqual(self.column[np.array([4, 3, -1])].range, 'A4:A5,A12:A12')
+
+    def test_rectangles_coalesced(self):
+        halves = xl_types.XLRangeSet([xl_types.XLRange.from_range('A1:B4'), xl_types.XLRange.from_range('C1:D4'),
+                                      xl_types.XLRange.from_range('A5:D6')])
+        self.assertEqual(halves.ranges, [xl_types.XLRange.from_range('A1:D6')])
+
+    def test_difference(self):
+        block = xl_types.XLRangeSet([xl_types.XLRange.from_range('A1:B4')])
+        hole = block - xl_types.XLCell.from_cell('A3')
+        self.assertEqual(hole.range, 'A1:B2,B3:B3,A4:B4')
+        self.assertNotIn(xl_types.XLCell.from_cell('A3'), hole)
+        self.assertIn(xl_types.XLCell.from_cell('B3'), hole)
+        self.assertEqual(hole | xl_types.XLCell.from_cell('A3'), block)
+
+    def test_sheets_kept_apart(self):
+        a = xl_types.XLRangeSet([xl_types.XLRange.from_range('A1:A2', 'One')])
+        b = xl_types.XLRangeSet([xl_types.XLRange.from_range('A1:A2', 'Two')])
+        self.assertEqual((a | b).sheets, ['One', 'Two'])
+        self.assertFalse(a & b)
+        self.assertRaises(ValueError, lambda: (a | b).sheet)
+
+    def test_algebra_matches_cells(self):
+        rng = np.random.RandomState(0)
+
+        def random_ranges(n):
+            ranges = []
+            for _ in range(n):
+                row, col = rng.randint(0, 12, 2)
+                height, width = rng.randint(0, 5, 2)
+                ranges.append(xl_types.XLCell(row, col) - xl_types.XLCell(row + height, col + width))
+            return ranges
+
+        for _ in range(25):
+            a, b = random_ranges(6), random_ranges(6)
+            set_a, set_b = xl_types.XLRangeSet(a), xl_types.XLRangeSet(b)
+            cells_a, cells_b = cells_of(a), cells_of(b)
+
+            self.assertEqual(cells_of(set_a), cells_a)
+            self.assertEqual(cells_of(set_a | set_b), cells_a | cells_b)
+            self.assertEqual(cells_of(set_a & set_b), cells_a & cells_b)
+            self.assertEqual(cells_of(set_a - set_b), cells_a - cells_b)
+            self.assertEqual((set_a - set_b).size, len(cells_a - cells_b))
@@ -5,9 +5,29 @@ Note
 ----
 These tests build upon pandas and openpyxl, and work on the assumption that those modules are functional.
 """
+import os
+import random
+import re
 import unittest
+import warnings
+import weakref
+import zipfile
+from unittest import mock
+from functools import partial
+from itertools import chain
 
-from xl_link import XLDataFrame
+import numpy as np
+import pandas as pd
+import openpyxl
+
+from xl_link import (XLDataFrame, XLMap, get_workbook_map, set_instrumentation, get_timings, hooks, choose_engine,
+                     frame_layout, layout_cache, manifest)
+from xl_link.batch import Job, generate
+from xl_link.parallel import ParallelWriter, splice_bodies, INDEX_FORMAT
+from xl_link.xl_types import XLCell
+from xl_link.xlsxwriter.utility import xl_rowcol_to_cell
+from xl_link.workbook_map import _IntervalTree, _RectangleTree, _SheetIndex
+from xl_link.instrumentation import span
 
 from .tools import XLMapBaseCase, path_for
 
@@ -54,6 +74,742 @@ class XLMapCase(XLMapBaseCase):
     def test_data(self):
         self.check_frame(self.f, self.xlmap.data)
 
+group_frame = XLDataFrame(columns=("Region", "Month", "Sales"),
+                           data={'Region': ('North', 'South', 'North', 'East', 'South', 'North'),
+                                 'Month': (1, 1, 2, 1, 2, 3),
+                                 'Sales': (10, 20, 30, 40, 50, 60)})
+
+
+class GroupByCase(XLMapBaseCase, unittest.TestCase):
+
+    subdir = 'xlmap'
+    test_frame = group_frame
+    to_excel_args = {'engine': 'openpyxl', 'group_by': 'Region'}
+
+    def test_groups_contiguous(self):
+        self.assertEqual(list(self.xlmap.groups), ['East', 'North', 'South'])
+
+        for region, block in self.xlmap.groups.items():
+            rows = self.f[self.f['Region'] == region]
+            self.assertEqual(block.shape, rows.shape)
+            for i, values in enumerate(rows.values):
+                for j, value in enumerate(values):
+                    self.check_cell(value, block.start.translate(i, j))
+
+    def test_order_within_groups_kept(self):
+        north = self.xlmap.groups['North']
+        self.check_series(pd.Series([1, 2, 3]), north[:, 1:1])
+
+    def test_create_charts_by_group(self):
+        charts = self.xlmap.create_charts_by_group('scatter', values='Sales', categories='Month')
+        self.assertEqual(list(charts), list(self.xlmap.groups))
+
+    def test_create_charts_by_group_missing_label(self):
+        self.assertRaises(KeyError, self.xlmap.create_charts_by_group, 'line', values='nope')
+        self.assertRaises(KeyError, self.xlmap.create_charts_by_group, 'line', values='Sales', categories='nope')
+
+    def test_create_charts_by_group_transposed(self):
+        def refs(charts):
+            return [[series.val.numRef.f for series in chart.series] for chart in charts.values()]
+
+        expected = self.xlmap.create_charts_by_group('line', values='Sales')
+        transposed = self.xlmap.T.create_charts_by_group('line', values='Sales')
+        self.assertEqual(list(transposed), list(expected))
+        self.assertEqual(refs(transposed), refs(expected))
+        self.assertEqual(refs(self.xlmap.T.subset(columns=slice(None)).create_charts_by_group('line', values='Sales')),
+                         refs(expected))
+
+    def test_no_groups(self):
+        xlmap = self.f.to_excel(path_for(self.subdir, 'NoGroupByCase'), engine='openpyxl')
+        self.assertIsNone(xlmap.groups)
+        self.assertRaises(TypeError, xlmap.create_charts_by_group)
+
+
+class LabelAtCase(XLMapBaseCase, unittest.TestCase):
+
+    subdir = 'xlmap'
+    test_frame = test_frame.set_index('Meal')
+    to_excel_args = {'engine': 'openpyxl', 'startrow': 2, 'startcol': 1}
+
+    def test_round_trip(self):
+        for index in self.f.index:
+            for column in self.f.columns:
+                cell = self.xlmap.at[index, column]
+                self.assertEqual(self.xlmap.label_at(cell), ('data', index, column))
+                self.assertEqual(self.xlmap.label_at(cell.fcell), ('data', index, column))
+
+    def test_index_and_header(self):
+        self.assertEqual(self.xlmap.label_at(self.xlmap.index[1]), ('index', 'Lunch', None))
+        self.assertEqual(self.xlmap.label_at(self.xlmap.columns[-1].cell), ('columns', None, 'Thur'))
+
+    def test_outside(self):
+        self.assertRaises(KeyError, self.xlmap.label_at, 'A1')
+        self.assertRaises(KeyError, self.xlmap.label_at, "'Other'!" + self.xlmap.data.start.cell)
+
+    def test_labels_at(self):
+        cells = [self.xlmap.at['Dinner', 'Weds'], self.xlmap.index[0], 'A1', self.xlmap.columns[0].fcell]
+        labels = self.xlmap.labels_at(cells)
+        self.assertEqual(labels['kind'].tolist(), ['data', 'index', None, 'columns'])
+        self.assertEqual(labels['index'].tolist(), ['Dinner', 'Breakfast', None, None])
+        self.assertEqual(labels['column'].tolist(), ['Weds', None, None, 'Mon'])
+
+
+class IndexerCacheCase(XLMapBaseCase, unittest.TestCase):
+
+    subdir = 'xlmap'
+    test_frame = test_frame.set_index('Meal')
+    to_excel_args = {'engine': 'openpyxl'}
+
+    def setUp(self):
+        super().setUp()
+        self.cache = self.xlmap.cache_indexers(maxsize=3)
+
+    def test_results_unchanged(self):
+        for _ in range(2):
+            self.assertEqual(self.xlmap.loc['Lunch', 'Tues':'Weds'], self.xlmap.data[1, 1] - self.xlmap.data[1, 2])
+            self.assertEqual(self.xlmap['Mon'], self.xlmap.iloc[:, 0])
+        self.assertEqual((self.cache.hits, self.cache.misses), (3, 3))
+
+    def test_copies_returned(self):
+        cell = self.xlmap.at['Dinner', 'Thur']
+        cell.row += 10
+        self.assertEqual(self.xlmap.at['Dinner', 'Thur'], self.xlmap.data[2, 3])
+
+    def test_bounded(self):
+        for meal in self.f.index:
+            self.xlmap.loc[meal]
+        self.assertEqual(len(self.cache), 3)
+        self.xlmap.loc['Midnight Snack']
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_uncacheable_keys(self):
+        self.xlmap.loc[self.f['Mon'] == 'Soup']
+        self.xlmap.loc[lambda f: f.index[:2]]
+        self.assertEqual(self.cache.hits + self.cache.misses, 0)
+
+    def test_moved(self):
+        self.xlmap.iat[0, 0]
+        self.xlmap.data = self.xlmap.data.translate(5, 0)
+        self.assertEqual(self.xlmap.iat[0, 0], self.xlmap.data.start)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_disable(self):
+        self.assertIsNone(self.xlmap.cache_indexers(0))
+        self.assertIsNone(self.xlmap.indexer_cache)
+
+
+class MultiIndexCase(XLMapBaseCase, unittest.TestCase):
+
+    subdir = 'xlmap'
+    test_frame = XLDataFrame(np.arange(36).reshape(12, 3) + 100,
+                             index=pd.MultiIndex.from_product([[2023, 2024], ['east', 'west'], [1, 2, 3]],
+                                                              names=['year', 'region', 'n']),
+                             columns=pd.MultiIndex.from_tuples([('A', 'p'), ('A', 'q'), ('B', 'p')]))
+    to_excel_args = {'engine': 'openpyxl', 'startrow': 1, 'startcol': 2}
+
+    def test_data(self):
+        self.check_frame(self.f, self.xlmap.data)
+
+    def test_levels(self):
+        self.assertEqual(len(self.xlmap.index_levels), 3)
+        self.assertEqual(len(self.xlmap.column_levels), 2)
+        self.assertEqual(self.xlmap.index, self.xlmap.index_levels[-1])
+        self.assertEqual(self.xlmap.columns, self.xlmap.column_levels[-1])
+        self.check_series(pd.Series(self.f.index.get_level_values('n')), self.xlmap.index)
+        self.check_series(pd.Series(self.f.columns.get_level_values(1)), self.xlmap.columns)
+
+    def test_merged_spans(self):
+        layout = self.xlmap.layout
+        merged = {str(merged) for merged in getattr(self.sheet.merged_cells, 'ranges', self.sheet.merged_cells)}
+        spans = {layout.index_span(level, start).range for level in range(2) for start in layout.index_runs[level][0]}
+        spans.add(layout.column_span(0, 0).range)
+        self.assertEqual(spans, merged)
+        self.check_cell('west', layout.index_span(1, 10).start)
+        self.check_cell('B', layout.column_span(0, 2).start)
+
+    def test_partial_loc(self):
+        self.assertEqual(self.xlmap.loc[2024], self.xlmap.data[6:11, :])
+        self.assertEqual(self.xlmap.loc[(2023, 'west'), ('A', 'q')], self.xlmap.data[3:5, 1:1])
+        self.assertEqual(self.xlmap.loc[(2024, 'east', 2), ('B', 'p')], self.xlmap.data[7, 2])
+        self.assertEqual(self.xlmap.loc[:, 'A'], self.xlmap.data[:, 0:1])
+        self.assertRaises(KeyError, lambda: self.xlmap.loc[2030])
+
+
+class ViewCase(XLMapBaseCase, unittest.TestCase):
+
+    subdir = 'xlmap'
+    test_frame = test_frame.set_index('Meal')
+    to_excel_args = {'engine': 'openpyxl', 'startrow': 1, 'startcol': 2}
+
+    def test_subset(self):
+        subset = self.xlmap.subset(columns=slice('Tues', 'Weds'), rows=['Lunch', 'Dinner'])
+        self.assertEqual(subset.data, self.xlmap.data[1:2, 1:2])
+        self.assertEqual(subset.columns, self.xlmap.columns[1:2])
+        self.assertEqual(subset.index, self.xlmap.index[1:2])
+        self.assertEqual(subset.loc['Dinner'], self.xlmap.loc['Dinner', 'Tues':'Weds'])
+        self.assertEqual(subset.at['Lunch', 'Weds'], self.xlmap.at['Lunch', 'Weds'])
+        self.check_frame(subset.f, subset.data)
+
+    def test_subset_contiguous(self):
+        self.assertRaises(ValueError, self.xlmap.subset, columns=['Mon', 'Weds'])
+        self.assertRaises(KeyError, self.xlmap.subset, columns=['Fri'])
+
+    def test_transpose(self):
+        transposed = self.xlmap.T
+        self.assertEqual(transposed.data, self.xlmap.data)
+        self.assertEqual(transposed.index, self.xlmap.columns)
+        self.assertEqual(transposed.loc['Mon'], self.xlmap['Mon'])
+        self.assertEqual(transposed['Lunch'], self.xlmap.loc['Lunch'])
+        self.assertEqual(transposed.iloc[1:3, 0], self.xlmap.iloc[0, 1:3])
+        self.assertEqual(transposed.T.loc['Lunch'], self.xlmap.loc['Lunch'])
+        self.assertEqual(transposed.subset(rows='Weds').data, self.xlmap['Weds'])
+        self.assertEqual(transposed.f.shape, self.f.T.shape)
+
+    def test_transpose_labels(self):
+        transposed = self.xlmap.T
+        self.assertEqual(transposed.label_at(self.xlmap.at['Dinner', 'Tues']), ('data', 'Tues', 'Dinner'))
+        self.assertEqual(transposed.label_at(self.xlmap.columns[2]), ('index', 'Weds', None))
+        self.assertEqual(transposed.label_at(self.xlmap.index[1]), ('columns', None, 'Lunch'))
+
+
+class InstrumentationCase(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = set_instrumentation(True)
+        self.writer = pd.ExcelWriter(path_for('xlmap', 'InstrumentationCase'), engine='openpyxl')
+        self.frame = XLDataFrame(test_frame.set_index('Meal'))
+
+    def tearDown(self):
+        set_instrumentation(self.previous)
+
+    def test_to_excel_phases(self):
+        xlmap = self.frame.to_excel(self.writer)
+        self.assertEqual(list(xlmap.timings), ['write', 'layout', 'map', 'register'])
+        self.assertTrue(all(seconds >= 0 for _, seconds in xlmap.timings.items()))
+
+        xlmap.loc['Lunch']
+        xlmap.create_chart('line', values='Mon')
+        self.assertIn('mapper', xlmap.timings)
+        self.assertEqual(xlmap.timings.counts['create_chart'], 1)
+
+    def test_writer_totals(self):
+        first = self.frame.to_excel(self.writer)
+        second = self.frame.to_excel(self.writer, sheet_name='Other')
+        timings = get_timings(self.writer)
+        self.assertEqual(timings.counts['write'], 2)
+        self.assertAlmostEqual(timings['write'], first.timings['write'] + second.timings['write'])
+
+    def test_off(self):
+        set_instrumentation(False)
+        xlmap = self.frame.to_excel(self.writer)
+        xlmap.create_chart('line', values='Mon')
+        xlmap.save()
+        self.assertEqual(len(xlmap.timings), 0)
+        self.assertFalse(hasattr(self.writer, 'xl_link_timings'))
+        self.assertIs(span('write'), span('save'))
+
+
+class Collector:
+    """
+    Records every event it's called with.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, payload):
+        self.events.append((event, payload))
+
+    def payloads(self, event):
+        return [payload for name, payload in self.events if name == event]
+
+
+class HooksCase(unittest.TestCase):
+
+    def setUp(self):
+        self.collector = Collector()
+        for event in hooks.EVENTS:
+            hooks.register(event, self.collector)
+        self.frame = XLDataFrame(test_frame.set_index('Meal'))
+
+    def tearDown(self):
+        hooks.clear()
+
+    def test_to_excel(self):
+        path = path_for('xlmap', 'HooksCase')
+        xlmap = self.frame.to_excel(path, engine='openpyxl')
+        self.assertEqual([event for event, _ in self.collector.events], ['frame_written', 'workbook_saved',
+                                                                         'map_built'])
+
+        written, = self.collector.payloads('frame_written')
+        self.assertEqual((written['rows'], written['cols'], written['engine']), (4, 4, 'openpyxl'))
+        saved, = self.collector.payloads('workbook_saved')
+        self.assertGreater(saved['bytes'], 0)
+        built, = self.collector.payloads('map_built')
+        self.assertEqual((built['cells'], built['mode']), (16, 'to_excel'))
+        self.assertTrue(all(payload['duration'] >= 0 for _, payload in self.collector.events))
+
+        xlmap.subset(columns=['Mon', 'Tues'])
+        self.assertEqual(self.collector.payloads('map_built')[-1]['cells'], 8)
+
+    def test_chart_created(self):
+        xlmap = self.frame.to_excel(path_for('xlmap', 'HooksChartCase'), engine='openpyxl')
+        xlmap.create_chart('line', values=['Mon', 'Weds'])
+        chart, = self.collector.payloads('chart_created')
+        self.assertEqual((chart['type'], chart['series']), ('line', 2))
+
+    def test_unregister(self):
+        hooks.unregister('frame_written', self.collector)
+        self.frame.to_excel(path_for('xlmap', 'HooksCase'), engine='openpyxl')
+        self.assertEqual(self.collector.payloads('frame_written'), [])
+        self.assertRaises(ValueError, hooks.unregister, 'frame_written', self.collector)
+        self.assertRaises(ValueError, hooks.register, 'frame_read', self.collector)
+
+
+class EngineChoiceCase(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = XLDataFrame(test_frame.set_index('Meal'))
+
+    def test_choose_engine(self):
+        engines = ['xlsxwriter', 'openpyxl']
+        choice = choose_engine(1000, 10, engines=engines)
+        self.assertEqual(choice.engine, 'xlsxwriter')
+        self.assertEqual(set(choice.estimates), set(engines))
+        self.assertIn('fastest', choice.reason)
+
+        self.assertEqual(choose_engine(1000, 10, requires=['append'], engines=engines).engine, 'openpyxl')
+        self.assertRaises(ValueError, choose_engine, 1000, 10, requires=['append'], engines=['xlsxwriter'])
+        self.assertRaises(ValueError, choose_engine, 1000, 10, requires=['macros'], engines=engines)
+
+    def test_size_independent(self):
+        # per cell, xlsxwriter is both faster and smaller, so only requirements change the choice
+        with mock.patch('xl_link.engines.available_memory', return_value=None):
+            for n_rows, n_cols in ((1, 1), (1000, 10), (10 ** 6, 100), (10 ** 9, 1)):
+                for engines in (['xlsxwriter', 'openpyxl'], ['openpyxl', 'xlsxwriter']):
+                    self.assertEqual(choose_engine(n_rows, n_cols, engines=engines).engine, 'xlsxwriter')
+                    self.assertEqual(choose_engine(n_rows, n_cols, requires=['append'], engines=engines).engine,
+                                     'openpyxl')
+
+    def test_memory_warning(self):
+        with mock.patch('xl_link.engines.available_memory', return_value=10 ** 6), \
+                warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(choose_engine(10, 10).engine, 'xlsxwriter')
+            self.assertEqual(caught, [])
+            self.assertEqual(choose_engine(10 ** 6, 100).engine, 'xlsxwriter')
+        self.assertEqual(len(caught), 1)
+        self.assertIn('memory available', str(caught[0].message))
+
+    def test_to_excel_auto(self):
+        xlmap = self.frame.to_excel(path_for('xlmap', 'EngineChoiceCase'), engine='auto')
+        self.assertEqual(xlmap.writer.engine, xlmap.engine_choice.engine)
+        xlmap.writer.save()
+
+        xlmap = self.frame.to_excel(path_for('xlmap', 'EngineChoiceCase'), engine='auto', requires=['append'])
+        self.assertEqual((xlmap.writer.engine, xlmap.engine_choice.engine), ('openpyxl', 'openpyxl'))
+        self.assertIs(xlmap.subset(columns=['Mon']).engine_choice, xlmap.engine_choice)
+
+    def test_append(self):
+        path = path_for('xlmap', 'EngineChoiceAppend')
+        self.frame.to_excel(path, sheet_name='First', engine='openpyxl')
+        xlmap = self.frame.to_excel(path, sheet_name='Second', engine='auto', requires=['append'])
+        xlmap.writer.save()
+
+        workbook = openpyxl.load_workbook(path)
+        self.assertEqual(workbook.sheetnames, ['First', 'Second'])
+        self.assertEqual(workbook['First']['B2'].value, workbook['Second']['B2'].value)
+
+    def test_writer_given(self):
+        writer = pd.ExcelWriter(path_for('xlmap', 'EngineChoiceCase'), engine='openpyxl')
+        xlmap = self.frame.to_excel(writer, engine='auto')
+        self.assertEqual(xlmap.engine_choice.engine, 'openpyxl')
+        self.assertEqual(xlmap.engine_choice.reason, 'writer given')
+        self.assertIsNone(self.frame.to_excel(writer, sheet_name='Other').engine_choice)
+
+
+class BatchCase(unittest.TestCase):
+
+    @staticmethod
+    def frame(n_rows):
+        index = pd.MultiIndex.from_arrays([np.arange(n_rows) // 3, np.arange(n_rows)], names=['block', 'row'])
+        return pd.DataFrame(np.arange(n_rows * 3).reshape(n_rows, 3), index=index, columns=['a', 'b', 'c'])
+
+    def test_generate(self):
+        sizes = [4, 9, 6]
+        jobs = [Job(path_for('xlmap', 'BatchCase{}'.format(i)), partial(self.frame, n_rows))
+                for i, n_rows in enumerate(sizes)]
+        jobs.append(Job(path_for('xlmap', 'BatchCaseOptions'), self.frame(5), charts=[], options={'startrow': 3}))
+
+        results = generate(jobs, workers=2, charts=[{'type_': 'line', 'values': ['a', 'b']}])
+
+        self.assertEqual([result.path for result in results], [job.path for job in jobs])
+        for result, n_rows in zip(results, sizes + [5]):
+            self.assertTrue(os.path.exists(result.path))
+            expected = frame_layout(self.frame(n_rows).index, self.frame(n_rows).columns,
+                                    startrow=3 if n_rows == 5 else 0)
+            xlmap = XLMap.from_manifest(result.manifest)
+            self.assertEqual(xlmap.data, expected.data)
+            self.assertEqual(xlmap.loc[(0, 2), 'b'], expected.data[2, 1])
+        self.assertEqual([len(result.charts) for result in results], [1, 1, 1, 0])
+
+    def test_serial(self):
+        result, = generate([Job(path_for('xlmap', 'BatchCaseSerial'), self.frame(3))], workers=1, labels='hash')
+        self.assertTrue(os.path.exists(result.path))
+        data = XLMap.from_manifest(result.manifest).data
+        self.assertEqual((data.start.row, data.stop.row, result.charts), (1, 3, []))
+        self.assertEqual(result.manifest['labels']['index']['hash'], manifest.labels_hash(self.frame(3).index))
+
+    def test_grouped(self):
+        frame = pd.DataFrame(self.frame(6).sort_index(level='row', ascending=False).reset_index('block'))
+        job = Job(path_for('xlmap', 'BatchCaseGrouped'), frame, options={'group_by': 'block'})
+        result, = generate([job], workers=1, engine='auto')
+
+        xlmap = XLMap.from_manifest(result.manifest)
+        self.assertEqual(list(xlmap.groups), [0, 1])
+        self.assertEqual((xlmap.groups[0].start.row, xlmap.groups[1].stop.row), (1, 6))
+        self.assertEqual(xlmap.engine_choice.engine, 'xlsxwriter')
+
+
+
+class LayoutCacheCase(unittest.TestCase):
+
+    frame = staticmethod(BatchCase.frame)
+
+    def setUp(self):
+        self.maxsize = layout_cache.maxsize
+        layout_cache.clear()
+
+    def tearDown(self):
+        layout_cache.maxsize = self.maxsize
+        layout_cache.clear()
+
+    def uncached(self, frame, **kwargs):
+        layout_cache.maxsize, maxsize = 0, layout_cache.maxsize
+        try:
+            return frame_layout(frame.index, frame.columns, **kwargs)
+        finally:
+            layout_cache.maxsize = maxsize
+
+    def check_layout(self, layout, expected):
+        self.assertEqual((layout.data, layout.index, layout.columns), (expected.data, expected.index, expected.columns))
+        self.assertEqual((layout.index_levels, layout.column_levels), (expected.index_levels, expected.column_levels))
+        for runs, expected_runs in ((layout.index_runs, expected.index_runs),
+                                    (layout.column_runs, expected.column_runs)):
+            self.assertEqual([(starts.tolist(), stops.tolist()) for starts, stops in runs],
+                             [(starts.tolist(), stops.tolist()) for starts, stops in expected_runs])
+
+    def test_hits(self):
+        for n_rows, startrow in ((4, 0), (9, 2), (1, 5), (12, 0)):
+            layout = frame_layout(self.frame(n_rows).index, self.frame(n_rows).columns, startrow=startrow)
+            self.check_layout(layout, self.uncached(self.frame(n_rows), startrow=startrow))
+        self.assertEqual((layout_cache.hits, layout_cache.misses, len(layout_cache)), (3, 1, 1))
+
+    def test_parameters(self):
+        columns = pd.MultiIndex.from_tuples([('A', 'p'), ('A', 'q'), ('B', 'p')])
+        frame = pd.DataFrame(np.zeros((4, 3)), index=self.frame(4).index, columns=columns)
+        for kwargs in ({}, {'merge_cells': False}, {'index_label': ['x', 'y']}, {'startrow': 3}):
+            for _ in range(2):
+                self.check_layout(frame_layout(frame.index, frame.columns, **kwargs), self.uncached(frame, **kwargs))
+        self.assertEqual(layout_cache.misses, 3)
+
+    def test_bounded(self):
+        layout_cache.maxsize = 2
+        frames = [self.frame(4), self.frame(4).rename(columns={'a': 'z'}), self.frame(4)[['c', 'b']]]
+        for frame in frames:
+            frame_layout(frame.index, frame.columns)
+        self.assertEqual(len(layout_cache), 2)
+        frame_layout(frames[0].index, frames[0].columns)
+        self.assertEqual((layout_cache.hits, layout_cache.misses), (0, 4))
+
+    def test_missing_columns(self):
+        self.assertRaises(KeyError, frame_layout, self.frame(4).index, self.frame(4).columns, columns=['a', 'nope'])
+
+    def test_errors_not_cached(self):
+        for _ in range(2):
+            self.assertRaises(ValueError, frame_layout, self.frame(4).index, self.frame(4).columns, header=False)
+        self.assertEqual((layout_cache.misses, len(layout_cache)), (2, 0))
+
+    def test_clear(self):
+        frame_layout(self.frame(4).index, self.frame(4).columns)
+        layout_cache.clear()
+        self.assertEqual((layout_cache.hits, layout_cache.misses, len(layout_cache)), (0, 0, 0))
+
+
+class ParallelWriterCase(unittest.TestCase):
+
+    def setUp(self):
+        n_rows = 12
+        index = pd.MultiIndex.from_arrays([np.arange(n_rows) // 4, ['r{}'.format(i) for i in range(n_rows)]],
+                                          names=['block', 'row'])
+        self.frame = pd.DataFrame({'float': np.linspace(0, 1, n_rows), 'int': np.arange(n_rows),
+                                   'str': [' a & <b> {}'.format(i) for i in range(n_rows)],
+                                   'bool': np.arange(n_rows) % 2 == 0,
+                                   'date': pd.date_range('2001-01-01', periods=n_rows, freq='36h')},
+                                  index=index, columns=['float', 'int', 'str', 'bool', 'date'])
+        self.frame.iloc[3, 0], self.frame.iloc[4, 0], self.frame.iloc[5, 2] = np.nan, np.inf, None
+        self.header_frame = pd.DataFrame(np.arange(12).reshape(3, 4), index=pd.date_range('2010-01-01', periods=3),
+                                         columns=pd.MultiIndex.from_product([['x', 'y'], ['p', 'q']]))
+
+    def write(self, to_excel):
+        xlmap = to_excel(self.frame, sheet_name='Frame')
+        to_excel(self.header_frame, sheet_name='Header', startrow=2, startcol=1)
+        to_excel(self.frame, sheet_name='Frame', startcol=8, index=False, na_rep='-', columns=['float', 'str'])
+        xlmap.place_charts(xlmap.create_chart('line', values=['float', 'int']))
+        return xlmap
+
+    def assertSameSheets(self, path, expected_path):
+        workbook, expected = openpyxl.load_workbook(path), openpyxl.load_workbook(expected_path)
+        self.assertEqual(workbook.sheetnames, expected.sheetnames)
+        for sheet, expected_sheet in zip(workbook, expected):
+            self.assertEqual(sheet.dimensions, expected_sheet.dimensions)
+            self.assertEqual(sorted(map(str, sheet.merged_cells.ranges)),
+                             sorted(map(str, expected_sheet.merged_cells.ranges)))
+            for cell, expected_cell in zip(chain.from_iterable(sheet.iter_rows()),
+                                           chain.from_iterable(expected_sheet.iter_rows())):
+                self.assertEqual((cell.value, cell.number_format, cell.font.b),
+                                 (expected_cell.value, expected_cell.number_format, expected_cell.font.b))
+
+    def test_matches_to_excel(self):
+        expected_path = path_for('xlmap', 'ParallelWriterExpected')
+        writer = pd.ExcelWriter(expected_path, engine='xlsxwriter')
+        self.write(lambda frame, **kwargs: XLDataFrame.to_excel(frame, writer, **kwargs)).save()
+
+        for workers in (1, 2):
+            path = path_for('xlmap', 'ParallelWriterCase{}'.format(workers))
+            writer = ParallelWriter(path, workers=workers)
+            xlmap = self.write(writer.to_excel)
+            self.assertEqual(xlmap.loc[(1, 'r5'), 'int'], XLCell(6, 3, 'Frame'))
+            xlmap.save()
+            self.assertSameSheets(path, expected_path)
+
+    def test_helpers(self):
+        frame = pd.DataFrame({'y': np.sin(np.linspace(0, 20, 200)), 'z': np.cos(np.linspace(0, 20, 200))})
+
+        def write(to_excel):
+            xlmap = to_excel(frame, sheet_name='Helpers')
+            xlmap.place_charts([xlmap.create_chart('line', values='y', downsample=20),
+                                xlmap.create_chart('scatter', values='z', categories='y', downsample=20,
+                                                   downsample_method='minmax')])
+            self.assertEqual(len(xlmap.helpers), 2)
+            return xlmap
+
+        expected_path = path_for('xlmap', 'ParallelWriterHelpersExpected')
+        writer = pd.ExcelWriter(expected_path, engine='xlsxwriter')
+        write(lambda frame, **kwargs: XLDataFrame.to_excel(frame, writer, **kwargs)).save()
+
+        path = path_for('xlmap', 'ParallelWriterHelpers')
+        writer = ParallelWriter(path, workers=1)
+        xlmap = write(writer.to_excel)
+        self.assertEqual(len(xlmap.workbook_map), 3)
+        xlmap.save()
+        self.assertSameSheets(path, expected_path)
+
+    def test_xlsxwriter_versions(self):
+        with mock.patch('xlsxwriter.__version__', '99.0.0'):
+            self.assertRaises(ImportError, ParallelWriter, path_for('xlmap', 'ParallelWriterVersion'))
+
+    def test_unexpected_xml(self):
+        body = ([(1, 0, '<c r="A2"><v>1</v></c>')], [], (1, 0, 1, 0))
+        self.assertRaises(ValueError, splice_bodies, '<worksheet><sheetData></sheetData><sheetData/></worksheet>',
+                          [body])
+        self.assertRaises(ValueError, splice_bodies, '<worksheet><sheetData><row r="1" ><c r="A1"/></row>'
+                                                     '<row  r="2"></row></sheetData></worksheet>', [body])
+        spliced = splice_bodies('<worksheet><sheetData><row r="1"><c r="B1" t="s"><v>0</v></c></row></sheetData>'
+                                '</worksheet>', [body])
+        self.assertIn('<row r="2"><c r="A2"><v>1</v></c></row>', spliced)
+
+    def test_overwritten_body(self):
+        writer = ParallelWriter(path_for('xlmap', 'ParallelWriterOverwritten'), workers=1)
+        xlmap = writer.to_excel(self.frame)
+        xlmap.sheet.write(xlmap.data.start.row + 1, xlmap.data.start.col, 'overwritten')
+        xlmap.sheet.write(xlmap.data.stop.row + 1, xlmap.data.start.col, 'below')
+        with self.assertRaisesRegex(ValueError, 'C3'):
+            writer.save()
+
+    def test_xf_indexes(self):
+        path = path_for('xlmap', 'ParallelWriterXFs')
+        writer = ParallelWriter(path, workers=1)
+        xfs = writer._get_xfs()
+        sheet = writer.book.add_worksheet('XFs')
+        expected = {}
+        for row, (kind, style) in enumerate((('index', INDEX_FORMAT), ('data', {}))):
+            for col, number_format in enumerate(xfs[kind]):
+                properties = dict(style, **({} if number_format is None else {'num_format': number_format}))
+                sheet.write_number(row, col, 1, writer.book.add_format(properties) if properties else None)
+                expected[xl_rowcol_to_cell(row, col)] = xfs[kind][number_format]
+        writer.save()
+
+        with zipfile.ZipFile(path) as saved:
+            xml = saved.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        written = {ref: int(xf or 0) for ref, xf in re.findall(r'<c r="([A-Z]+\d+)"(?: s="(\d+)")?', xml)}
+        self.assertEqual(written, expected)
+
+    def test_context_manager(self):
+        path = path_for('xlmap', 'ParallelWriterContext')
+        with ParallelWriter(path, workers=1) as writer:
+            xlmap = writer.to_excel(self.header_frame, columns=[('x', 'q')])
+        self.assertEqual(len(xlmap.f.columns), 1)
+        self.assertEqual(openpyxl.load_workbook(path)['Sheet1'].dimensions, 'A1:B6')
+
+
+class ManifestCase(unittest.TestCase):
+
+    def setUp(self):
+        n_rows = 12
+        index = pd.MultiIndex.from_arrays([np.arange(n_rows) // 4, pd.date_range('2000-01-01', periods=n_rows)],
+                                          names=['block', 'day'])
+        frame = XLDataFrame({'group': list('aabbccaabbcc'), 'x': np.arange(n_rows), 'y': np.linspace(0, 1, n_rows)},
+                            index=index, columns=['group', 'x', 'y'])
+        writer = pd.ExcelWriter(path_for('xlmap', 'ManifestCase'), engine='xlsxwriter')
+        self.xlmap = frame.to_excel(writer, group_by='group', startrow=2)
+        self.frame = self.xlmap.f
+
+    def assertSameMap(self, loaded, xlmap):
+        self.assertEqual((loaded.data, loaded.index, loaded.columns), (xlmap.data, xlmap.index, xlmap.columns))
+        self.assertEqual((loaded.index_levels, loaded.column_levels), (xlmap.index_levels, xlmap.column_levels))
+        self.assertEqual(loaded.extent, xlmap.extent)
+        self.assertEqual(loaded.iloc[3, 1:], xlmap.iloc[3, 1:])
+        self.assertEqual(loaded.T.iloc[0, 2], xlmap.T.iloc[0, 2])
+        self.assertEqual(list(loaded.groups.values()), list(xlmap.groups.values()))
+
+    def test_round_trip(self):
+        manifest = self.xlmap.to_manifest(format='json')
+        self.assertIsInstance(manifest, str)
+        loaded = XLMap.from_manifest(manifest)
+        self.assertSameMap(loaded, self.xlmap)
+
+        label = (1, pd.Timestamp('2000-01-06'))
+        self.assertEqual(loaded.loc[label, 'y'], self.xlmap.loc[label, 'y'])
+        self.assertEqual(list(loaded.groups), list(self.xlmap.groups))
+        self.assertEqual(loaded.layout.index_span(0, 5), self.xlmap.layout.index_span(0, 5))
+        self.assertEqual((loaded.parameters['startrow'], loaded.parameters['engine']), (2, 'xlsxwriter'))
+        self.assertEqual(loaded.to_manifest(), self.xlmap.to_manifest())
+        self.assertRaises(ValueError, lambda: loaded.f)
+
+        subset = self.xlmap.subset(columns=['x', 'y'])
+        self.assertEqual(XLMap.from_manifest(subset.to_manifest())['y'], subset['y'])
+
+    @unittest.skipIf(manifest.msgpack is None, "msgpack isn't installed")
+    def test_msgpack(self):
+        self.assertSameMap(XLMap.from_manifest(self.xlmap.to_manifest(format='msgpack')), self.xlmap)
+
+    def test_hashed_labels(self):
+        hashed = self.xlmap.to_manifest(labels='hash')
+        self.assertEqual(hashed['labels']['index']['hash'], manifest.labels_hash(self.frame.index))
+        self.assertNotEqual(hashed['labels']['index']['hash'], manifest.labels_hash(self.frame.index[::-1]))
+        loaded = XLMap.from_manifest(hashed)
+        self.assertSameMap(loaded, self.xlmap)
+        self.assertEqual(loaded.loc[(5, 5), 2], self.xlmap.loc[self.frame.index[5], 'y'])
+
+        unlabelled = self.xlmap.to_manifest(labels=False)
+        self.assertNotIn('hash', unlabelled['labels']['index'])
+        self.assertSameMap(XLMap.from_manifest(unlabelled), self.xlmap)
+
+    def test_newer_version(self):
+        newer = dict(self.xlmap.to_manifest(), version=manifest.MANIFEST_VERSION + 1)
+        self.assertRaises(ValueError, XLMap.from_manifest, newer)
+
+
+class WorkbookMapCase(unittest.TestCase):
+
+    def setUp(self):
+        self.writer = pd.ExcelWriter(path_for('xlmap', 'WorkbookMapCase'), engine='openpyxl')
+        self.frame = XLDataFrame(test_frame.set_index('Meal'))
+        self.first = self.frame.to_excel(self.writer)
+        self.second = self.frame.to_excel(self.writer, startcol=7)
+        self.other = self.frame.to_excel(self.writer, sheet_name='Other')
+        self.workbook_map = get_workbook_map(self.writer)
+
+    def test_registered(self):
+        self.assertIs(self.first.workbook_map, self.workbook_map)
+        self.assertEqual(len(self.workbook_map), 3)
+
+    def test_owner(self):
+        self.assertIs(self.workbook_map.owner(self.first.at['Lunch', 'Tues']), self.first)
+        self.assertIs(self.workbook_map.owner(self.second.index[0].fcell), self.second)
+        self.assertIs(self.workbook_map.owner(self.other.data.start), self.other)
+        self.assertIsNone(self.workbook_map.owner("'Sheet1'!Z100"))
+
+    def test_query_cell(self):
+        self.assertEqual(self.workbook_map.query_cell(self.second.columns[1]), [(self.second, 'columns')])
+
+    def test_overlapping(self):
+        self.assertEqual(self.workbook_map.overlapping("'Sheet1'!A1:Z1"), [self.first, self.second])
+        self.assertEqual(self.workbook_map.overlapping("'Other'!A1:Z1"), [self.other])
+
+    def test_overlap_warns(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.frame.to_excel(self.writer, startrow=2)
+        self.assertEqual(len(caught), 1)
+
+    def test_maps_kept(self):
+        self.frame.to_excel(self.writer, sheet_name='Unkept')
+        owner = self.workbook_map.owner("'Unkept'!B2")
+        self.assertEqual(owner.data.sheet, 'Unkept')
+        cell, expected = owner.loc['Lunch', 'Tues'], self.first.loc['Lunch', 'Tues']
+        self.assertEqual((cell.row, cell.col), (expected.row, expected.col))
+        self.assertEqual(len(self.workbook_map), 4)
+        self.assertIsNone(owner.writer)
+        self.assertRaises(ValueError, lambda: owner.f)
+
+    def test_weak_references(self):
+        writer = pd.ExcelWriter(path_for('xlmap', 'WorkbookMapWeak'), engine='xlsxwriter')
+        xlmap = self.frame.to_excel(writer)
+        workbook_map, xlmap = get_workbook_map(writer), weakref.ref(xlmap)
+        self.assertIsNone(xlmap())
+        self.assertIsNot(workbook_map.owner("'Sheet1'!B2"), None)
+        writer.close()
+
+    def test_side_by_side(self):
+        writer = pd.ExcelWriter(path_for('xlmap', 'WorkbookMapSideBySide'), engine='xlsxwriter')
+        workbook_map = get_workbook_map(writer)
+        frame = XLDataFrame(np.zeros((3, 2)))
+        for i in range(40):
+            frame.to_excel(writer, startcol=i * 4, index=False)
+
+        self.assertLess(len(workbook_map._sheets['Sheet1'].trees), 7)
+        self.assertEqual(workbook_map.owner(XLCell(2, 21, 'Sheet1')), workbook_map.maps[5])
+        self.assertIsNone(workbook_map.owner(XLCell(2, 22, 'Sheet1')))
+        self.assertEqual(workbook_map.overlapping("'Sheet1'!I1:M1"), workbook_map.maps[2:4])
+        writer.close()
+
+    def test_rectangle_tree(self):
+        rng = random.Random(0)
+        rectangles = []
+        for i in range(300):
+            row, col = rng.randrange(1000), rng.randrange(100)
+            rectangles.append((row, row + rng.randrange(50), col, col + rng.randrange(10), i))
+        tree = _RectangleTree(rectangles)
+        index = _SheetIndex()
+        for i in range(0, len(rectangles), 3):
+            index.add(rectangles[i:i + 3])
+
+        for _ in range(300):
+            row, col = rng.randrange(1100), rng.randrange(110)
+            query = (row, row + rng.randrange(20), col, col + rng.randrange(5))
+            expected = {rectangle[4] for rectangle in rectangles
+                        if rectangle[0] <= query[1] and query[0] <= rectangle[1]
+                        and rectangle[2] <= query[3] and query[2] <= rectangle[3]}
+            self.assertEqual(set(tree.query(*query)), expected)
+            self.assertEqual(sorted(index.query(*query)), sorted(expected))
+
+    def test_interval_tree(self):
+        rng = random.Random(0)
+        intervals = []
+        for i in range(200):
+            start = rng.randrange(1000)
+            intervals.append((start, start + rng.randrange(50), i))
+        tree = _IntervalTree(intervals)
+
+        for _ in range(200):
+            start = rng.randrange(1100)
+            stop = start + rng.randrange(20)
+            expected = {i for first, last, i in intervals if first <= stop and start <= last}
+            self.assertEqual(set(tree.query(start, stop)), expected)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=3)
 
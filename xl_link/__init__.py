@@ -1,3 +1,8 @@
-from .mappers import write_frame, XLDataFrame, get_xl_ranges, XLMap
+from .mappers import write_frame, XLDataFrame, get_xl_ranges, XLMap, CellLabel
+from .workbook_map import WorkbookMap, get_workbook_map
+from .layout import FrameLayout, frame_layout, LayoutCache, layout_cache
+from .instrumentation import set_instrumentation, get_timings, Timings
+from .counting import count_ops
+from .engines import choose_engine
 
 __version__ = '0.133dev'
\ No newline at end of file
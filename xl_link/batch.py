@@ -0,0 +1,115 @@
+"""
+Writing many workbooks in parallel, e.g. one per client from frames sharing a schema.
+
+Each job is built by a worker process: its frame is written, charts are created from a template and placed next to it,
+and the workbook is saved. Later frames of a schema a worker has written take their layout from
+xl_link.layout.layout_cache, rather than running pandas' formatter again.
+
+Examples
+--------
+>>> from functools import partial
+>>> jobs = [Job('client_{}.xlsx'.format(client), partial(pd.read_pickle, 'client_{}.pkl'.format(client)))
+>>>         for client in clients]
+>>> results = generate(jobs, workers=8, charts=[{'type_': 'line', 'values': ['Mon', 'Tues']}])
+>>> results[0]
+    BatchResult(path='client_0.xlsx', manifest={'version': 1, ...}, charts=[<XLRange: 'Sheet1'!G1:N15>], seconds=0.04)
+>>> XLMap.from_manifest(results[0].manifest).loc['Lunch']
+    <XLRange: 'Sheet1'!B3:F3>
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from time import perf_counter
+
+from .mappers import XLDataFrame
+
+
+Job = namedtuple('Job', ['path', 'frame', 'sheet_name', 'charts', 'options'])
+Job.__new__.__defaults__ = ('Sheet1', None, None)
+Job.__doc__ = """
+A workbook to generate.
+
+path is where to save it. frame is the DataFrame to write, or a callable taking no arguments that returns it (e.g.
+partial(pd.read_pickle, path)), so only the callable is sent to the worker rather than the frame's data. charts
+overrides the template given to generate for this job, and options are passed on to to_excel.
+"""
+
+BatchResult = namedtuple('BatchResult', ['path', 'manifest', 'charts', 'seconds'])
+BatchResult.__doc__ = """
+A workbook generated: its path, the manifest of its frame's XLMap (see XLMap.to_manifest, XLMap.from_manifest maps the
+frame again without the workbook), the range each chart was placed in and the seconds it took.
+"""
+
+
+def build(job, charts=None, engine=None, labels=True):
+    """
+    Generate the workbook of job in this process.
+
+    Parameters
+    ----------
+    job : Job
+    charts : list of dict
+        template of the charts to create, keyword arguments to XLMap.create_chart for each one, used unless job.charts
+        is given.
+    engine : str
+        engine to write with, 'auto' to choose it with xl_link.engines.choose_engine (recorded in the manifest), default
+        pandas' default for the path.
+    labels : True, 'hash' or False
+        labels kept in the manifest, see XLMap.to_manifest. 'hash' or False keep results small for long frames.
+
+    Returns
+    -------
+    BatchResult
+    """
+    start = perf_counter()
+
+    frame = job.frame() if callable(job.frame) else job.frame
+    options = dict(job.options or {})
+    charts = job.charts if job.charts is not None else charts or []
+
+    xlmap = XLDataFrame(frame).to_excel(job.path, sheet_name=job.sheet_name, engine=engine, **options)
+
+    placed = xlmap.place_charts([xlmap.create_chart(**chart) for chart in charts]) if charts else []
+    xlmap.save()
+
+    return BatchResult(job.path, xlmap.to_manifest(labels), placed, perf_counter() - start)
+
+
+def generate(jobs, workers=None, charts=None, engine=None, chunksize=1, labels=True):
+    """
+    Generate the workbook of each job, in parallel across worker processes.
+
+    Parameters
+    ----------
+    jobs : iterable of Job
+    workers : int
+        number of worker processes, default os.cpu_count(). If 1, jobs are built in this process.
+    charts : list of dict
+        template of the charts to create in every workbook, see build.
+    engine : str
+        engine to write with, see build.
+    chunksize : int
+        number of jobs sent to a worker at once, larger chunks cut the overhead of sending many small jobs.
+    labels : True, 'hash' or False
+        labels kept in each manifest, see build.
+
+    Returns
+    -------
+    list of BatchResult
+        in the order of jobs.
+
+    Notes
+    -----
+    Frames given directly are pickled to send them to the workers. Next to writing a workbook this takes little time
+    (see FrameTransferSuite in benchmarks/batch.py), but giving frames as callables loading them saves holding every
+    frame in this process. Exceptions raised building a job are raised here, once the jobs before it are done.
+    """
+    task = partial(build, charts=charts, engine=engine, labels=labels)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        return [task(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(task, jobs, chunksize=chunksize))
@@ -1,7 +1,9 @@
 from abc import abstractmethod
 import importlib
+from time import perf_counter
+from weakref import WeakKeyDictionary
 from xl_link.xl_types import to_series
-from warnings import warn
+from xl_link import hooks
 
 from distutils.version import StrictVersion
 
@@ -15,6 +17,12 @@ CATEGORIES_REQUIRED_CHARTS = ['scatter']
 MIN_VERSIONS = {'xlsxwriter': '0.9',
                 'openpyxl': '2.4'}
 
+DEFAULT_CHART_SIZES = {'xlsxwriter': (480, 288),
+                       'openpyxl': (567, 283)} # pixels, openpyxl's default is 15 x 7.5 cm
+DEFAULT_COL_WIDTH = 64 # pixels
+DEFAULT_ROW_HEIGHT = 20 # pixels
+PIXELS_PER_CM = 96 / 2.54
+
 
 def check_engine_compatible(engine):
     min_version = MIN_VERSIONS.get(engine.__name__, 0)
@@ -33,6 +41,87 @@ def ensure_list(specifier):
     return specifier
 
 
+class ReferenceCache:
+    """
+    Cache of the references chart series are built from, shared by every chart created within a workbook.
+
+    References are keyed by the sheet and coordinates of the XLRange they were built from, so the same range used by
+    many charts is only rendered (and for openpyxl parsed) once.
+
+    Attributes
+    ----------
+    hits : int
+        number of times a cached reference was reused
+    misses : int
+        number of references that have been built
+    """
+
+    def __init__(self):
+        self._references = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, xlrange, build):
+        """
+        Get the reference for xlrange, calling build(xlrange) to create it if it isn't cached yet.
+
+        Parameters
+        ----------
+        xlrange : XLRange
+            range reference is for
+        build : callable
+            takes xlrange and returns the reference object the engine uses
+
+        Returns
+        -------
+        object
+            cached reference
+        """
+        key = (xlrange.sheet, xlrange.start.row, xlrange.start.col, xlrange.stop.row, xlrange.stop.col)
+        try:
+            reference = self._references[key]
+        except KeyError:
+            self.misses += 1
+            reference = self._references[key] = build(xlrange)
+        else:
+            self.hits += 1
+        return reference
+
+    def clear(self):
+        self._references.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._references)
+
+    def __repr__(self):
+        return "<ReferenceCache: size: {}, hits: {}, misses: {}>".format(len(self), self.hits, self.misses)
+
+
+_reference_caches = WeakKeyDictionary()
+
+
+def get_reference_cache(book):
+    """
+    Get the ReferenceCache used for charts created in book, creating it if needed.
+
+    Parameters
+    ----------
+    book : object
+        either XlsxWriter.Workbook or openpyxl Workbook.
+
+    Returns
+    -------
+    ReferenceCache
+    """
+    try:
+        return _reference_caches[book]
+    except KeyError:
+        cache = _reference_caches[book] = ReferenceCache()
+        return cache
+
+
 class AbstractChartWrapper:
     """
     Wraps around excel writer module, for use by create_chart.
@@ -58,6 +147,7 @@ class AbstractChartWrapper:
         self.subtype = subtype
         self.engine = engine
         self.chart = None
+        self.references = get_reference_cache(book)
 
     @abstractmethod
     def add_series(self, name, values, categories=None):
@@ -113,13 +203,17 @@ class XlsxWriterChartWrapper(AbstractChartWrapper):
 
         self.chart = book.add_chart({'type': type_, 'subtype': subtype} if subtype else {'type': type_})
 
+    @staticmethod
+    def _build_reference(xlrange):
+        return s(xlrange.frange)
+
     def add_series(self, name, values, categories=None):
-        values = s(values.frange)
+        values = self.references.get(values, self._build_reference)
 
         kwargs = {'name': name, 'values': values}
 
         if categories:
-            kwargs['categories'] = s(categories.frange)
+            kwargs['categories'] = self.references.get(categories, self._build_reference)
 
         self.chart.add_series(kwargs)
 
@@ -160,22 +254,24 @@ class OpenPyXLChartWrapper(AbstractChartWrapper):
         if subtype:
             self.chart.type = subtype
 
+    def _build_reference(self, xlrange):
+        return self.engine.chart.Reference(range_string=xlrange.frange)
+
     def add_series(self, name, values, categories=None):
         Series = self.engine.chart.series_factory.SeriesFactory
+        reference = lambda xlrange: self.references.get(xlrange, self._build_reference)
 
         if categories is None:
-            series = Series(values.frange, title=name)
+            series = Series(reference(values), title=name)
             self.chart.append(series)
         elif self.type_ in SINGLE_CATEGORY_CHARTS:
-            if values.is_col:
-                values.start.row += -1 # To include top cell as name
-            else: # is_row
-                warn("Appears you're using rows as values with openpyxl, support for this is a little temperamental, you have been warned!")
-                values.start.col += -1
-            self.chart.add_data(values.frange, titles_from_data=True)
-            self.chart.set_categories(categories.frange)
+            # Build series directly rather than with add_data(titles_from_data=True), as the cell before values isn't
+            # necessarily the header (rows, or blocks of a grouped frame).
+            series = Series(reference(values), title=None if name is None else str(name))
+            self.chart.append(series)
+            self.chart.set_categories(reference(categories))
         else:
-            series = Series(values.frange, xvalues=categories.frange, title=name)
+            series = Series(reference(values), xvalues=reference(categories), title=name)
             self.chart.append(series)
 
     @property
@@ -202,6 +298,66 @@ class OpenPyXLChartWrapper(AbstractChartWrapper):
     def title(self, value):
         self.chart.title = value
 
+def engine_name(engine):
+    """
+    Normalise the engine name given by pandas (which can have the version appended) to a module name.
+    """
+    if 'openpyxl' in engine:
+        return 'openpyxl' # Cuz pandas appends version to engine name
+    return engine
+
+
+def chart_size(engine, size=None):
+    """
+    Get the size of a chart in cells, for a chart of size pixels, or the engine's default size if size is None.
+
+    Parameters
+    ----------
+    engine : str
+        engine used to create the chart.
+    size : tuple
+        (width, height) of chart in pixels.
+
+    Returns
+    -------
+    rows, cols : int
+        number of default sized rows and columns the chart covers.
+    """
+    width, height = size if size else DEFAULT_CHART_SIZES[engine_name(engine)]
+    return -(-height // DEFAULT_ROW_HEIGHT), -(-width // DEFAULT_COL_WIDTH)
+
+
+def insert_chart(sheet, engine, chart, cell, size=None):
+    """
+    Insert chart into sheet, with top left corner at cell.
+
+    Parameters
+    ----------
+    sheet : object
+        sheet to insert chart into, either an XlsxWriter Worksheet or an openpyxl Worksheet.
+    engine : str
+        engine the sheet belongs to.
+    chart : object
+        chart created with create_chart.
+    cell : XLCell
+        where to put the top left corner of the chart.
+    size : tuple
+        (width, height) of chart in pixels, default leaves the chart's size alone.
+    """
+    engine = engine_name(engine)
+
+    if engine == 'xlsxwriter':
+        if size:
+            chart.set_size({'width': size[0], 'height': size[1]})
+        sheet.insert_chart(cell.cell, chart)
+    elif engine == 'openpyxl':
+        if size:
+            chart.width, chart.height = size[0] / PIXELS_PER_CM, size[1] / PIXELS_PER_CM
+        sheet.add_chart(chart, cell.cell)
+    else:
+        raise TypeError("Couldn't insert chart using {}".format(engine))
+
+
 def create_chart(workbook, engine, type_, values, categories, names, subtype=None,
                  title=None, x_axis_name=None, y_axis_name=None):
     """
@@ -229,8 +385,8 @@ def create_chart(workbook, engine, type_, values, categories, names, subtype=Non
     chart : object
         populated chart object corresponding to engine's chart type.
     """
-    if 'openpyxl' in engine:
-        engine = 'openpyxl' # Cuz pandas appends version to engine name
+    start = perf_counter()
+    engine = engine_name(engine)
 
     values = ensure_list(values)
     categories = ensure_list(categories)
@@ -261,4 +417,7 @@ def create_chart(workbook, engine, type_, values, categories, names, subtype=Non
     if y_axis_name:
         chart.y_axis_name = y_axis_name
 
+    if hooks.listening('chart_created'):
+        hooks.emit('chart_created', type=type_, series=len(values), duration=perf_counter() - start)
+
     return chart.chart
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Optional counting of the operations xl_types and xlsxwriter.utility perform, to find code paths that create objects or
+convert references per cell.
+
+Operations counted:
+
+* 'xlcell', 'xlrange' - XLCell and XLRange objects created.
+* 'copy', 'translate' - calls to XLCell/ XLRange copy and translate.
+* 'to_a1' - cells converted to A1 notation (xl_rowcol_to_cell, xl_rowcol_to_cell_fast).
+* 'col_to_name' - columns converted to letters (xl_col_to_name).
+* 'from_a1' - A1 references parsed (xl_cell_to_rowcol, xl_cell_to_rowcol_abs, parse_reference, and each reference
+  parsed by parse_fcells/ parse_franges).
+
+Counts are kept per thread. Outside of count_ops blocks each counted operation only checks the module's active flag.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+
+active = 0 # number of count_ops blocks open, in any thread
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def tally(op, n=1):
+    """
+    Add n to the count of op for every count_ops block open in this thread.
+    """
+    for counts in getattr(_local, 'stack', ()):
+        counts[op] += n
+
+
+@contextmanager
+def count_ops():
+    """
+    Count the operations performed by this thread within the with statement.
+
+    Yields
+    ------
+    Counter
+        counts of each operation (see module docs), filled in as they happen.
+
+    Examples
+    --------
+    >>> with xl_link.count_ops() as counts:
+    >>>     xlmap.create_chart('line')
+    >>> counts
+        Counter({'xlcell': 38, 'copy': 24, 'xlrange': 8, 'to_a1': 16, 'col_to_name': 16, 'translate': 6})
+
+    Notes
+    -----
+    Blocks can be nested, operations are counted by every block open in the thread.
+    """
+    global active
+
+    counts = Counter()
+    stack = _local.__dict__.setdefault('stack', [])
+    stack.append(counts)
+    with _lock:
+        active += 1
+    try:
+        yield counts
+    finally:
+        with _lock:
+            active -= 1
+        del stack[[position for position, open_counts in enumerate(stack) if open_counts is counts][0]]
@@ -0,0 +1,166 @@
+"""
+Point selection routines used to decimate long series before charting them.
+
+Each routine returns the (sorted) integer positions of the points to keep, which means the selection can be applied
+to any frame with `iloc`.
+"""
+import numpy as np
+
+
+def numeric_axis(values):
+    """
+    Convert values to a float array that can be used as an x axis, falling back to positions if values aren't numeric.
+
+    Parameters
+    ----------
+    values : array-like
+        values to convert, e.g. a frame's index or a column.
+
+    Returns
+    -------
+    ndarray
+        float array, the same length as values.
+    """
+    values = np.asarray(values)
+
+    if np.issubdtype(values.dtype, np.datetime64) or np.issubdtype(values.dtype, np.timedelta64):
+        return values.view('i8').astype(float)
+
+    if np.issubdtype(values.dtype, np.number) or values.dtype == bool:
+        return values.astype(float)
+
+    return np.arange(values.size, dtype=float)
+
+
+def _ends(n, n_out):
+    """
+    Positions of the first and last of n points, or only the first if n_out is 1.
+    """
+    if n_out < 1:
+        raise ValueError("n_out must be at least 1, not {}".format(n_out))
+    return np.unique([0, n - 1][:n_out])
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select n_out points using the Largest-Triangle-Three-Buckets algorithm.
+
+    Parameters
+    ----------
+    x : array-like
+        numeric x values, should be monotonic for sensible results.
+    y : array-like
+        numeric y values.
+    n_out : int
+        number of points to select.
+
+    Returns
+    -------
+    ndarray
+        positions of at most n_out selected points, including the first and last point (only the first if n_out is 1).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = y.size
+
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return _ends(n, n_out)
+
+    y = np.where(np.isnan(y), 0, y)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+
+        if i + 2 < n_out - 1:
+            next_start, next_stop = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = x[next_start:next_stop].mean(), y[next_start:next_stop].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        areas = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Select at most n_out points by keeping the first and last point, and the minimum and maximum of (n_out - 2) / 2
+    equally sized buckets.
+
+    Parameters
+    ----------
+    y : array-like
+        numeric y values.
+    n_out : int
+        number of points to select.
+
+    Returns
+    -------
+    ndarray
+        positions of selected points, including the first and last point (only the first if n_out is 1).
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.size
+
+    if n_out >= n:
+        return np.arange(n)
+
+    n_buckets = (n_out - 2) // 2
+    if n_buckets < 1:
+        return _ends(n, n_out)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(n_buckets, size)
+
+    offsets = np.arange(n_buckets) * size
+    mins = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    maxs = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+
+    selected = np.concatenate(([0, n - 1], mins, maxs))
+    return np.unique(selected[selected < n])
+
+
+DOWNSAMPLE_METHODS = {'lttb': lambda x, y, n_out: lttb_indices(x, y, n_out),
+                      'minmax': lambda x, y, n_out: minmax_indices(y, n_out)}
+
+
+def downsample_indices(x, y, n_out, method='lttb'):
+    """
+    Select at most n_out points of (x, y) using method.
+
+    Parameters
+    ----------
+    x : array-like
+        x values, converted using numeric_axis.
+    y : array-like
+        numeric y values.
+    n_out : int
+        point budget.
+    method : str
+        one of 'lttb' or 'minmax'.
+
+    Returns
+    -------
+    ndarray
+        sorted positions of the selected points.
+    """
+    try:
+        select = DOWNSAMPLE_METHODS[method]
+    except KeyError:
+        raise ValueError("Unknown downsample method: {}, expected one of {}".format(method,
+                                                                                 tuple(DOWNSAMPLE_METHODS)))
+
+    return np.sort(select(numeric_axis(x), y, n_out))
@@ -0,0 +1,162 @@
+"""
+Choosing the engine to write a frame with, for XLDataFrame.to_excel(..., engine='auto').
+
+Measured with benchmarks/engines.py, xlsxwriter takes less time and memory per cell than openpyxl, and its fixed costs
+are no larger, at every frame size tried (a few cells to over 500,000), so a frame's size doesn't change which engine is
+cheapest: engines are chosen by the requirements of the workbook. The size of the frame gives the estimates recorded
+with the choice, and a warning if the write is estimated to need more memory than is available.
+
+Modes that stream rows to disk, xlsxwriter's constant_memory and openpyxl's write_only, aren't candidates: pandas
+writes a frame one column at a time, which constant_memory workbooks silently drop (they only keep the current row)
+and write_only worksheets reject (they don't support random access to cells).
+"""
+import importlib
+from collections import namedtuple
+from warnings import warn
+
+
+ENGINES = ('xlsxwriter', 'openpyxl')
+
+# Cost of writing (including saving) each cell, index and header included. Calibrated with benchmarks/engines.py
+# (python -m benchmarks.engines), rerun it and update these when an engine or pandas is upgraded.
+ENGINE_COSTS = {'xlsxwriter': {'seconds_per_cell': 14e-6, 'bytes_per_cell': 205},
+                'openpyxl': {'seconds_per_cell': 34e-6, 'bytes_per_cell': 1190}}
+
+# Requirements only some engines meet.
+REQUIREMENTS = {'append': ('openpyxl',), # xlsxwriter can't open existing workbooks
+                'stock_charts': ('openpyxl',)} # see README compatibility notes
+
+MEMORY_FRACTION = 0.8 # of available memory a write may use before warning
+
+EngineChoice = namedtuple('EngineChoice', ['engine', 'reason', 'estimates'])
+EngineChoice.__doc__ = """
+Engine chosen by choose_engine.
+
+engine is the engine's name, reason explains the choice, and estimates maps each engine considered to the (seconds,
+bytes) the cost model estimates writing with it will take.
+"""
+
+
+def installed_engines():
+    """
+    Get the engines that can be imported, in ENGINES order.
+    """
+    found = []
+    for engine in ENGINES:
+        try:
+            importlib.import_module(engine)
+        except ImportError:
+            continue
+        found.append(engine)
+    return found
+
+
+def available_memory():
+    """
+    Get the bytes of memory available to this process, or None if it can't be found on this platform.
+    """
+    try:
+        import psutil
+    except ImportError:
+        pass
+    else:
+        return psutil.virtual_memory().available
+
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def estimate_cost(engine, n_cells):
+    """
+    Estimate the (seconds, bytes) writing n_cells with engine takes, using ENGINE_COSTS.
+    """
+    costs = ENGINE_COSTS[engine]
+    return n_cells * costs['seconds_per_cell'], n_cells * costs['bytes_per_cell']
+
+
+def choose_engine(n_rows, n_cols, index_levels=1, requires=(), engines=None):
+    """
+    Choose the engine to write a frame with.
+
+    The engine meeting requires that ENGINE_COSTS estimates is fastest is chosen. As every cost is per cell, this
+    doesn't depend on the frame's size (see the module's docstring).
+
+    Parameters
+    ----------
+    n_rows, n_cols : int
+        shape of the frame.
+    index_levels : int
+        number of index columns written (0 if the index isn't written).
+    requires : iterable of str
+        requirements of the workbook, keys of REQUIREMENTS, e.g. 'append' if it will be re-opened and added to.
+    engines : list of str
+        optional, engines to choose between, default those installed.
+
+    Returns
+    -------
+    EngineChoice
+
+    Raises
+    ------
+    ValueError
+        if a requirement is unknown, or no engine meets every requirement.
+
+    Warns
+    -----
+    UserWarning
+        if the chosen engine is estimated to use more than MEMORY_FRACTION of the memory available.
+
+    Examples
+    --------
+    >>> choose_engine(500000, 20)
+        EngineChoice(engine='xlsxwriter', reason='fastest estimate (147.0s, 2.0GB)', ...)
+    >>> choose_engine(100, 5, requires=['append']).engine
+        'openpyxl'
+    """
+    candidates = list(engines if engines is not None else installed_engines())
+
+    for requirement in requires:
+        try:
+            supported = REQUIREMENTS[requirement]
+        except KeyError:
+            raise ValueError("Unknown requirement {!r}, expecting one of {}".format(requirement, sorted(REQUIREMENTS)))
+        candidates = [engine for engine in candidates if engine in supported]
+
+    if not candidates:
+        raise ValueError("No installed engine meets requirements {}".format(list(requires)))
+
+    n_cells = (n_rows + 1) * (n_cols + index_levels)
+    estimates = {engine: estimate_cost(engine, n_cells) for engine in candidates}
+
+    engine = min(candidates, key=lambda engine: estimates[engine][0])
+    reason = "fastest estimate ({})".format(_describe(estimates[engine]))
+
+    available = available_memory()
+    if available is not None and estimates[engine][1] > available * MEMORY_FRACTION:
+        warn("Writing {} cells with {} is estimated to take {}, more than the {} of memory available".format(
+            n_cells, engine, _bytes(estimates[engine][1]), _bytes(available)))
+
+    if requires:
+        reason += ", meeting {}".format(", ".join(requires))
+    if len(candidates) == 1 and not requires:
+        reason = "only engine installed, " + reason
+
+    return EngineChoice(engine, reason, estimates)
+
+
+def _describe(estimate):
+    seconds, size = estimate
+    return "{:.1f}s, {}".format(seconds, _bytes(size))
+
+
+def _bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return "{:.1f}{}".format(size, unit)
+        size /= 1024
@@ -0,0 +1,99 @@
+"""
+Callbacks for xl_link operations, e.g. to send metrics or tracing spans to a monitoring backend.
+
+Events, and the payload each is emitted with:
+
+* 'frame_written' - rows, cols, engine and duration (of pandas' to_excel), emitted by XLDataFrame.to_excel.
+* 'map_built' - cells, duration and mode ('to_excel', 'subset', 'transpose' or 'manifest'), emitted once an XLMap is
+  ready.
+* 'chart_created' - type, series (the number of series) and duration, emitted for each chart created.
+* 'workbook_saved' - bytes (size of the file written, None if it can't be found) and duration, emitted by
+  XLMap.save, and by XLDataFrame.to_excel when it saves the workbook itself.
+
+Durations are in seconds. While no callbacks are registered for an event, emitting it costs a dict lookup.
+
+Examples
+--------
+>>> from xl_link import hooks
+>>> @hooks.register('frame_written')
+>>> def record(event, payload):
+>>>     histogram('xl_link.write.seconds').observe(payload['duration'])
+>>> hooks.unregister('frame_written', record)
+"""
+
+EVENTS = ('frame_written', 'map_built', 'chart_created', 'workbook_saved')
+
+_callbacks = {event: [] for event in EVENTS}
+
+
+def _check_event(event):
+    if event not in _callbacks:
+        raise ValueError("Unknown event {!r}, expecting one of {}".format(event, EVENTS))
+
+
+def register(event, callback=None):
+    """
+    Call callback(event, payload) each time event happens, payload being a dict (see module docs for its keys).
+
+    Parameters
+    ----------
+    event : str
+        one of EVENTS.
+    callback : callable
+        optional, if not given returns a decorator.
+
+    Returns
+    -------
+    callable
+        callback, so register can be used as a decorator.
+
+    Notes
+    -----
+    Callbacks are called in the order they were registered, in the thread doing the operation, exceptions they raise
+    aren't caught.
+    """
+    _check_event(event)
+    if callback is None:
+        return lambda callback: register(event, callback)
+    _callbacks[event].append(callback)
+    return callback
+
+
+def unregister(event, callback):
+    """
+    Stop calling callback for event.
+
+    Raises
+    ------
+    ValueError
+        if callback isn't registered for event.
+    """
+    _check_event(event)
+    try:
+        _callbacks[event].remove(callback)
+    except ValueError:
+        raise ValueError("{!r} isn't registered for {!r}".format(callback, event))
+
+
+def clear(event=None):
+    """
+    Unregister every callback for event, or for every event if event is None.
+    """
+    for name in EVENTS if event is None else (event,):
+        _check_event(name)
+        del _callbacks[name][:]
+
+
+def listening(event):
+    """
+    Check whether any callbacks are registered for event, so that payloads are only built when needed.
+    """
+    return bool(_callbacks[event])
+
+
+def emit(event, **payload):
+    """
+    Call every callback registered for event with payload.
+    """
+    for callback in tuple(_callbacks[event]):
+        callback(event, payload)
@@ -0,0 +1,189 @@
+"""
+Optional timing of the phases of writing frames, building maps and creating charts.
+
+Off by default, turn on with set_instrumentation(True), or by setting the XL_LINK_INSTRUMENTATION environment variable
+to 1 (read on import). While off, each instrumented phase only costs a check of a flag.
+"""
+import os
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+
+ENVIRONMENT_VARIABLE = 'XL_LINK_INSTRUMENTATION'
+
+_enabled = os.environ.get(ENVIRONMENT_VARIABLE, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def set_instrumentation(enabled=True):
+    """
+    Turn timing of xl_link's phases on or off.
+
+    Parameters
+    ----------
+    enabled : bool
+
+    Returns
+    -------
+    bool
+        whether instrumentation was on before.
+
+    Examples
+    --------
+    >>> xl_link.set_instrumentation(True)
+    >>> xlmap = f.to_excel(writer)
+    >>> xlmap.timings
+        <Timings: write: 1.204s, layout: 0.002s, map: 0.031s, register: 0.000s>
+    """
+    global _enabled
+    previous, _enabled = _enabled, bool(enabled)
+    return previous
+
+
+def instrumentation_enabled():
+    """
+    Check whether timing of xl_link's phases is on.
+    """
+    return _enabled
+
+
+class Timings:
+    """
+    Total time spent, and number of times spent, in each phase.
+
+    Phases recorded are:
+
+    * 'sort', 'write', 'save', 'layout', 'map' and 'register' by XLDataFrame.to_excel (sorting by group, pandas'
+      to_excel, saving if given a path, working out the frame's layout, constructing the XLMap and registering it with
+      the WorkbookMap).
+    * 'mapper' the first time an XLMap is indexed (building its mapper frame).
+    * 'create_chart' and 'create_charts_by_group' by the XLMap methods of the same names.
+    * 'save' by XLMap.save.
+
+    Examples
+    --------
+    >>> timings = get_timings(writer)
+    >>> timings['write'], timings.counts['write']
+        (3.52, 4)
+    >>> timings.total
+        3.61
+    """
+
+    def __init__(self):
+        self.totals = OrderedDict()
+        self.counts = OrderedDict()
+
+    def record(self, phase, seconds):
+        """
+        Add seconds spent in phase.
+        """
+        self.totals[phase] = self.totals.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    @property
+    def total(self):
+        """
+        Seconds spent in every phase.
+        """
+        return sum(self.totals.values())
+
+    def items(self):
+        return self.totals.items()
+
+    def __getitem__(self, phase):
+        return self.totals[phase]
+
+    def __contains__(self, phase):
+        return phase in self.totals
+
+    def __iter__(self):
+        return iter(self.totals)
+
+    def __len__(self):
+        return len(self.totals)
+
+    def __repr__(self):
+        return "<Timings: {}>".format(", ".join("{}: {:.3f}s".format(phase, seconds)
+                                                for phase, seconds in self.totals.items()))
+
+
+class _NoSpan:
+    """
+    Context manager doing nothing, given by span while instrumentation is off.
+    """
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(phase, *timings):
+    """
+    Time the body of the with statement as phase, recording it on each of timings (None are skipped), if
+    instrumentation is on.
+    """
+    if not _enabled:
+        return _NO_SPAN
+    return _span(phase, timings)
+
+
+@contextmanager
+def _span(phase, timings):
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - start
+        for recorded in timings:
+            if recorded is not None:
+                recorded.record(phase, elapsed)
+
+
+def timed(phase):
+    """
+    Decorate an XLMap method so that calls are timed as phase, and recorded on the map's and its writer's timings.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(xlmap, *args, **kwargs):
+            if not _enabled:
+                return method(xlmap, *args, **kwargs)
+            with span(phase, xlmap.timings, get_timings(xlmap.writer)):
+                return method(xlmap, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _writer_timings(writer):
+    """
+    Get get_timings(writer) if instrumentation is on, otherwise None (so writers aren't given Timings while it's off).
+    """
+    return get_timings(writer) if _enabled else None
+
+
+def get_timings(writer):
+    """
+    Get the Timings of every phase recorded for frames written with writer, creating them if needed.
+
+    Parameters
+    ----------
+    writer : pd.ExcelWriter or None
+        None (the writer of an XLMap loaded from a manifest) gets Timings that aren't kept.
+
+    Returns
+    -------
+    Timings
+    """
+    if writer is None:
+        return Timings()
+    try:
+        return writer.xl_link_timings
+    except AttributeError:
+        timings = writer.xl_link_timings = Timings()
+        return timings
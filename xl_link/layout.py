@@ -0,0 +1,362 @@
+"""
+Works out where each part of a DataFrame lands when written with DataFrame.to_excel, including every level of a
+MultiIndex (rows or columns) and the cells pandas merges for them.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.io.formats.excel import ExcelFormatter
+except ImportError:
+    from pandas.formats.format import ExcelFormatter
+
+from .xl_types import XLCell
+
+
+def level_codes(labels):
+    """
+    Get the integer codes of each level of labels.
+
+    Parameters
+    ----------
+    labels : Index or MultiIndex
+
+    Returns
+    -------
+    list of ndarray
+        one array per level, the same length as labels.
+    """
+    if isinstance(labels, pd.MultiIndex):
+        return [np.asarray(codes) for codes in getattr(labels, 'codes', None) or labels.labels]
+    return [pd.factorize(labels)[0]]
+
+
+def level_runs(codes, merge=True):
+    """
+    Find the blocks pandas merges into single cells for each level of a (Multi)Index.
+
+    A level's run continues while the codes of that level and every level above it are unchanged, which matches the
+    sparsified labels pandas writes. The innermost level is never merged.
+
+    Parameters
+    ----------
+    codes : list of ndarray
+        codes of each level, as returned by level_codes.
+    merge : bool
+        if False, as when writing with merge_cells=False, every label is its own run.
+
+    Returns
+    -------
+    list of (ndarray, ndarray)
+        per level, the (inclusive) start and stop positions of each run.
+    """
+    if not codes:
+        return []
+
+    n = codes[0].size
+    singles = np.arange(n)
+
+    if not merge or n == 0:
+        return [(singles, singles) for _ in codes]
+
+    runs = []
+    breaks = np.zeros(max(n - 1, 0), dtype=bool)
+    for level in codes[:-1]:
+        breaks |= level[1:] != level[:-1]
+        starts = np.concatenate(([0], np.flatnonzero(breaks) + 1))
+        stops = np.concatenate((starts[1:] - 1, [n - 1]))
+        runs.append((starts, stops))
+
+    runs.append((singles, singles))
+    return runs
+
+
+def _as_index(labels):
+    return labels if isinstance(labels, pd.Index) else pd.Index(labels)
+
+
+class FrameLayout:
+    """
+    Positions of every part of a frame written to a worksheet.
+
+    Attributes
+    ----------
+    data : XLRange
+        range the frame's values occupy.
+    index : XLRange
+        range of the innermost index level (if the index wasn't written, the first data column, as XLMap expects).
+    columns : XLRange
+        range of the innermost header row.
+    index_levels : list of XLRange
+        range of each index level, outermost first, empty if the index wasn't written.
+    column_levels : list of XLRange
+        range of each header row, outermost first.
+    index_runs, column_runs : list of (ndarray, ndarray)
+        per level, the start and stop positions (relative to the first row or column of data) of the blocks of cells
+        pandas merges, see level_runs.
+
+    See Also
+    --------
+    frame_layout
+    """
+
+    def __init__(self, data, index, columns, index_levels, column_levels, index_runs, column_runs):
+        self.data = data
+        self.index = index
+        self.columns = columns
+        self.index_levels = index_levels
+        self.column_levels = column_levels
+        self.index_runs = index_runs
+        self.column_runs = column_runs
+
+    def index_span(self, level, position):
+        """
+        Get the (possibly merged) block of cells holding the label of row position in level.
+
+        Parameters
+        ----------
+        level : int
+            index level, 0 being the outermost.
+        position : int
+            row position within the frame.
+
+        Returns
+        -------
+        XLRange
+            cell(s) the label occupies.
+
+        Notes
+        -----
+        Found with a binary search of the runs in that level, so takes O(log n).
+        """
+        starts, stops = self.index_runs[level]
+        run = np.searchsorted(starts, position, side='right') - 1
+        level_range = self.index_levels[level]
+        return level_range[int(starts[run])] - level_range[int(stops[run])]
+
+    def column_span(self, level, position):
+        """
+        Get the (possibly merged) block of cells holding the label of column position in header level.
+
+        Parameters
+        ----------
+        level : int
+            header level, 0 being the outermost.
+        position : int
+            column position within the frame.
+
+        Returns
+        -------
+        XLRange
+            cell(s) the label occupies.
+        """
+        starts, stops = self.column_runs[level]
+        run = np.searchsorted(starts, position, side='right') - 1
+        level_range = self.column_levels[level]
+        return level_range[int(starts[run])] - level_range[int(stops[run])]
+
+    def __repr__(self):
+        return "<FrameLayout: index: {}, columns: {}, data: {}>".format(self.index, self.columns, self.data)
+
+
+class LayoutCache:
+    """
+    Bounded least recently used cache of where pandas puts the header and body of frames, keyed by their schema.
+
+    A frame's schema is its column labels, the number and names of its index levels, and the to_excel parameters that
+    change where its header and body go (header, index, index_label and merge_cells). Frames sharing a schema only
+    differ in length, so frame_layout only needs the rows of their header and the first row of their body, and the
+    cells merged in their header, which are kept here rather than running pandas' formatter each time.
+
+    Shared by every thread, frame_layout uses the module's layout_cache.
+
+    Parameters
+    ----------
+    maxsize : int
+        most schemas to keep, the least recently used is dropped once this is exceeded. 0 turns caching off.
+
+    Attributes
+    ----------
+    hits : int
+        number of layouts worked out from the cache
+    misses : int
+        number of layouts that had to run pandas' formatter
+
+    Examples
+    --------
+    >>> frame_layout(f.index, f.columns)
+    >>> layout_cache
+        <LayoutCache: size: 1/128, hits: 0, misses: 1>
+    >>> layout_cache.maxsize = 1024
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._probes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, probe):
+        """
+        Get what's cached for key, calling probe() to find it if it isn't cached.
+
+        Parameters
+        ----------
+        key : hashable
+            schema of the frame.
+        probe : callable
+            takes no arguments, returns what's to be cached for key.
+        """
+        with self._lock:
+            try:
+                result = self._probes[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._probes.move_to_end(key)
+                return result
+
+        result = probe()
+        with self._lock:
+            self._probes[key] = result
+            while len(self._probes) > self.maxsize:
+                self._probes.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._probes.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._probes)
+
+    def __repr__(self):
+        return "<LayoutCache: size: {}/{}, hits: {}, misses: {}>".format(len(self), self.maxsize, self.hits,
+                                                                          self.misses)
+
+
+layout_cache = LayoutCache()
+
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _probe(frame_index, frame_columns, header, index, index_label, merge_cells):
+    """
+    Run pandas' formatter over the header and first row of the frame, getting the rows of the header, the first row of
+    the body (relative to startrow), and the runs of the header's levels.
+    """
+    index_nlevels = frame_index.nlevels if index else 0
+
+    probe = pd.DataFrame(index=frame_index[:1], columns=frame_columns)
+    formatter = ExcelFormatter(probe, header=header, index=index, index_label=index_label, merge_cells=merge_cells)
+
+    header_cells = [cell for cell in formatter._format_header() if cell.col >= index_nlevels]
+    if not header_cells:
+        raise ValueError("Can only map frames written with a header")
+    header_rows = sorted({cell.row for cell in header_cells})
+
+    body_rows = [cell.row for cell in formatter._format_body() if cell.col >= index_nlevels]
+    first_row = body_rows[0] if body_rows else header_rows[-1] + 1
+
+    if len(header_rows) > 1:
+        column_runs = level_runs(level_codes(frame_columns), merge_cells)
+    else:
+        column_runs = [(np.arange(len(frame_columns)), np.arange(len(frame_columns)))]
+    for starts, stops in column_runs:
+        starts.setflags(write=False)
+        stops.setflags(write=False)
+
+    return header_rows, first_row, column_runs
+
+
+def frame_layout(frame_index, frame_columns,
+                 sheet_name='Sheet1',
+                 columns=None,
+                 header=True,
+                 index=True,
+                 index_label=None,
+                 startrow=0,
+                 startcol=0,
+                 merge_cells=True):
+    """
+    Work out the FrameLayout of a frame written using DataFrame.to_excel with the parameters provided.
+
+    Parameters
+    ----------
+    frame_index : Index
+        index of the frame.
+    frame_columns : Index
+        columns of the frame.
+
+    See get_xl_ranges for the remaining parameters.
+
+    Returns
+    -------
+    FrameLayout
+
+    Raises
+    ------
+    KeyError
+        if any of columns isn't one of frame_columns.
+
+    Notes
+    -----
+    pandas' ExcelFormatter is only run over the header and the first row, the first time a frame's schema is seen (see
+    LayoutCache), so the time taken doesn't depend on the length of the frame. Merged blocks are found from the index
+    codes with NumPy.
+    """
+    frame_index, frame_columns = _as_index(frame_index), _as_index(frame_columns)
+    if columns is not None:
+        positions = frame_columns.get_indexer(columns)
+        if (positions == -1).any():
+            raise KeyError("{} not in columns".format([column for column, position in zip(columns, positions)
+                                                       if position == -1]))
+        frame_columns = frame_columns[positions]
+
+    n_rows, n_cols = len(frame_index), len(frame_columns)
+    index_nlevels = frame_index.nlevels if index else 0
+
+    probe = lambda: _probe(frame_index, frame_columns, header, index, index_label, merge_cells)
+    if layout_cache.maxsize:
+        key = (tuple(frame_columns), tuple(frame_columns.names), tuple(frame_index.names), n_rows > 0,
+               _hashable(header), index, _hashable(index_label), merge_cells)
+        header_rows, first_row, column_runs = layout_cache.get(key, probe)
+    else:
+        header_rows, first_row, column_runs = probe()
+
+    first_row += startrow
+    first_col = startcol + index_nlevels
+    last_row = first_row + n_rows - 1
+    last_col = first_col + n_cols - 1
+
+    data = XLCell(first_row, first_col, sheet_name) - XLCell(last_row, last_col, sheet_name)
+
+    column_levels = [XLCell(row + startrow, first_col, sheet_name) - XLCell(row + startrow, last_col, sheet_name)
+                     for row in header_rows]
+
+    index_levels = [XLCell(first_row, startcol + level, sheet_name) - XLCell(last_row, startcol + level, sheet_name)
+                    for level in range(index_nlevels)]
+
+    if index_levels:
+        index_range = index_levels[-1]
+    else:
+        index_range = XLCell(first_row, startcol + frame_index.nlevels - 1, sheet_name) - \
+                      XLCell(last_row, startcol + frame_index.nlevels - 1, sheet_name)
+
+    if not index:
+        index_runs = []
+    elif isinstance(frame_index, pd.MultiIndex):
+        index_runs = level_runs(level_codes(frame_index), merge_cells)
+    else:
+        index_runs = [(np.arange(n_rows), np.arange(n_rows))] # a single level is never merged
+
+    return FrameLayout(data, index_range, column_levels[-1], index_levels, column_levels, index_runs, column_runs)
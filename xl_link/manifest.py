@@ -0,0 +1,181 @@
+"""
+Manifests of XLMaps: where each part of a frame was written, its labels and the parameters it was written with, as a
+dict of JSON types, so that a map can be saved, compared or sent to another process without its frame or workbook.
+
+See XLMap.to_manifest and XLMap.from_manifest.
+"""
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from .layout import level_codes
+
+
+MANIFEST_VERSION = 1
+FORMATS = ('json', 'msgpack')
+LABEL_MODES = (True, 'hash', False)
+
+
+def jsonable(value):
+    """
+    Convert value to JSON types: numpy scalars to Python ones, tuples to lists, and anything else that isn't a str,
+    number, bool, None, list or dict to its str.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): jsonable(item) for key, item in value.items()}
+    return str(value)
+
+
+def labels_hash(labels):
+    """
+    Get a digest of labels (an Index or MultiIndex) and their names, the same across processes and runs.
+    """
+    digest = hashlib.sha1(hash_pandas_object(labels, index=False).values.tobytes())
+    digest.update(json.dumps(jsonable(list(labels.names))).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _encode_level(level):
+    if isinstance(level, pd.RangeIndex):
+        # start, stop and step were private before pandas 0.25
+        return {'range': [getattr(level, name) if hasattr(level, name) else getattr(level, '_' + name)
+                          for name in ('start', 'stop', 'step')]}
+
+    kind = level.dtype.kind
+    if kind == 'M':
+        tz = getattr(level, 'tz', None)
+        return {'dtype': 'datetime64[ns]', 'tz': None if tz is None else str(tz), 'values': level.asi8.tolist()}
+    if kind == 'm':
+        return {'dtype': 'timedelta64[ns]', 'values': level.asi8.tolist()}
+    if kind in 'iufb':
+        return {'dtype': str(level.dtype), 'values': level.tolist()}
+    return {'dtype': 'object', 'values': jsonable(level.tolist())}
+
+
+def _decode_level(encoded):
+    if 'range' in encoded:
+        return pd.RangeIndex(*encoded['range'])
+
+    dtype, values = encoded['dtype'], encoded['values']
+    if dtype == 'datetime64[ns]':
+        level = pd.DatetimeIndex(np.array(values, dtype='i8').view('M8[ns]'))
+        return level if encoded['tz'] is None else level.tz_localize('UTC').tz_convert(encoded['tz'])
+    if dtype == 'timedelta64[ns]':
+        return pd.TimedeltaIndex(np.array(values, dtype='i8').view('m8[ns]'))
+    if dtype == 'object':
+        return pd.Index(values, dtype=object)
+    return pd.Index(np.array(values, dtype=dtype))
+
+
+def encode_labels(labels, mode=True):
+    """
+    Encode labels (an Index or MultiIndex) as JSON types.
+
+    Parameters
+    ----------
+    labels : Index
+    mode : True, 'hash' or False
+        True keeps every label (MultiIndexes as the values of each level and their codes), 'hash' keeps their
+        labels_hash instead, and False only their number.
+
+    Returns
+    -------
+    dict
+
+    Notes
+    -----
+    Labels that aren't numbers, strings, bools, None, datetimes or timedeltas are kept as their str.
+    """
+    if mode not in LABEL_MODES:
+        raise ValueError("labels must be one of {}, not {!r}".format(LABEL_MODES, mode))
+
+    encoded = {'length': len(labels), 'names': jsonable(list(labels.names))}
+    if mode == 'hash':
+        encoded['hash'] = labels_hash(labels)
+    elif mode:
+        if isinstance(labels, pd.MultiIndex):
+            encoded['levels'] = [_encode_level(level) for level in labels.levels]
+            encoded['codes'] = [codes.tolist() for codes in level_codes(labels)]
+        else:
+            encoded['values'] = _encode_level(labels)
+    return encoded
+
+
+def decode_labels(encoded):
+    """
+    Decode labels encoded with encode_labels.
+
+    If the labels themselves weren't kept, gets positions (0 to length - 1) in their place, repeated for each level.
+    """
+    names = encoded['names']
+    if 'levels' in encoded:
+        levels = [_decode_level(level) for level in encoded['levels']]
+        try:
+            return pd.MultiIndex(levels=levels, codes=encoded['codes'], names=names)
+        except TypeError: # pandas < 0.24
+            return pd.MultiIndex(levels=levels, labels=encoded['codes'], names=names)
+    if 'values' in encoded:
+        return _decode_level(encoded['values']).rename(names[0])
+
+    positions = pd.RangeIndex(encoded['length'])
+    if len(names) > 1:
+        return pd.MultiIndex.from_arrays([positions] * len(names), names=names)
+    return positions.rename(names[0])
+
+
+def encode_runs(runs):
+    """
+    Encode the runs of a FrameLayout, levels without merged cells as None.
+    """
+    return [None if len(starts) == len(stops) and (starts == stops).all() else [starts.tolist(), stops.tolist()]
+            for starts, stops in runs]
+
+
+def decode_runs(encoded, length):
+    """
+    Decode runs encoded with encode_runs, for levels of length labels.
+    """
+    singles = np.arange(length)
+    return [(singles, singles) if level is None else (np.array(level[0]), np.array(level[1])) for level in encoded]
+
+
+def _msgpack():
+    if msgpack is None:
+        raise ImportError("msgpack is required for manifests in msgpack format, install it with pip install msgpack")
+    return msgpack
+
+
+def dumps(manifest, format='json'):
+    """
+    Serialize manifest to a JSON str, or msgpack bytes.
+    """
+    if format == 'json':
+        return json.dumps(manifest, separators=(',', ':'))
+    if format == 'msgpack':
+        return _msgpack().packb(manifest, use_bin_type=True)
+    raise ValueError("format must be one of {}, not {!r}".format(FORMATS, format))
+
+
+def loads(data):
+    """
+    Deserialize a manifest serialized with dumps (JSON as str or bytes, or msgpack bytes), dicts are returned as is.
+    """
+    if isinstance(data, dict):
+        return data
+    if isinstance(data, (bytes, bytearray)) and not data.lstrip().startswith(b'{'):
+        return _msgpack().unpackb(data, raw=False)
+    return json.loads(data)
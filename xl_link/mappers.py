@@ -1,14 +1,25 @@
-import pandas as pd
+import os
+from collections import OrderedDict, namedtuple
+from time import perf_counter
 
-try:
-    from pandas.io.formats.excel import ExcelFormatter
-except ImportError:
-    from pandas.formats.format import ExcelFormatter
+import numpy as np
+import pandas as pd
 
 from pandas.io.common import _stringify_path
-
-from .xl_types import XLCell
-from .chart_wrapper import create_chart, SINGLE_CATEGORY_CHARTS, CATEGORIES_REQUIRED_CHARTS
+from pandas.core.common import is_bool_indexer
+
+from .xl_types import XLCell, XLRange, XLRangeSet
+from .xl_types.xl_types import is_int_type
+from .chart_wrapper import (create_chart, insert_chart, chart_size, ensure_list, get_reference_cache,
+                            SINGLE_CATEGORY_CHARTS, CATEGORIES_REQUIRED_CHARTS)
+from .downsample import downsample_indices
+from .workbook_map import get_workbook_map
+from .layout import FrameLayout, frame_layout
+from .instrumentation import Timings, span, timed, _writer_timings
+from .engines import EngineChoice, choose_engine
+from .manifest import (MANIFEST_VERSION, encode_labels, decode_labels, encode_runs, decode_runs, jsonable, dumps,
+                       loads)
+from . import hooks
 
 
 def get_xl_ranges(frame_index, frame_columns,
@@ -57,44 +68,25 @@ def get_xl_ranges(frame_index, frame_columns,
         Each range represents where the data, index and columns can be found on the spreadsheet
     empty_f : DatFrame
         an empty DataFrame with matching Indices.
+
+    See Also
+    --------
+    layout.frame_layout : the positions of every index and header level, and the cells merged for them.
     """
 
     empty_f = pd.DataFrame(index=frame_index, columns=frame_columns)
 
-    formatter = ExcelFormatter(empty_f,
-                               cols=columns,
-                               header=header,
-                               index=index,
-                               index_label=index_label,
-                               merge_cells=merge_cells)
-
-    excel_header = list(formatter._format_header())
-    col_start, col_stop = excel_header[0], excel_header[-1]
-
-    col_start_cell = XLCell(col_stop.row + startrow, col_start.col + startcol, sheet_name)
-    col_stop_cell = XLCell(col_stop.row + startrow, col_stop.col + startcol, sheet_name)
-
-    if isinstance(empty_f.index, pd.MultiIndex):
-        col_start_cell = col_start_cell.translate(0, 1)
-
-    col_range = col_start_cell - col_stop_cell
-
-    body = list(formatter._format_body())
-
-    if empty_f.index.name or index_label:
-        body.pop(0)  # gets rid of index label cell that comes first!
+    layout = frame_layout(empty_f.index, empty_f.columns,
+                          sheet_name=sheet_name,
+                          columns=columns,
+                          header=header,
+                          index=index,
+                          index_label=index_label,
+                          startrow=startrow,
+                          startcol=startcol,
+                          merge_cells=merge_cells)
 
-    index_start_cell = XLCell(body[0].row + startrow, body[0].col + startcol + empty_f.index.nlevels - 1, sheet_name)
-    index_stop_cell = XLCell(body[-1].row + startrow, body[0].col + startcol + empty_f.index.nlevels - 1, sheet_name)
-
-    index_range = index_start_cell - index_stop_cell
-
-    data_start_cell = XLCell(index_start_cell.row, col_start_cell.col, sheet_name)
-    data_stop_cell = XLCell(index_stop_cell.row, col_stop_cell.col, sheet_name)
-
-    data_range = data_start_cell - data_stop_cell
-
-    return data_range, index_range, col_range, empty_f
+    return layout.data, layout.index, layout.columns, empty_f
 
 
 def write_frame(f, excel_writer, to_excel_args=None):
@@ -121,47 +113,342 @@ def write_frame(f, excel_writer, to_excel_args=None):
     return xlf.to_excel(excel_writer, **to_excel_args)
 
 
-def _mapper_to_xl(value):
+def _positions_to_xl(rows, cols, origin, transposed=False):
+    """
+    Convert positions within a frame to the XLRange they occupy, or XLRangeSet if they aren't contiguous.
+
+    Parameters
+    ----------
+    rows, cols : array-like
+        row and column positions within the frame, the cells selected are every combination of rows and cols.
+    origin : XLCell
+        position of the frame's first value within the spreadsheet.
+    transposed : bool
+        if True, the frame's rows run across the spreadsheet and its columns down it (see XLMap.T).
+    """
+    if transposed:
+        rows, cols = cols, rows
+    selection = XLRangeSet.from_positions(np.asarray(rows) + origin.row, np.asarray(cols) + origin.col, origin.sheet)
+    return selection.ranges[0] if len(selection) == 1 else selection
+
+
+def _mapper_to_xl(value, origin, n_cols, transposed=False):
     """
-    Convert mapper frame result to XLRange or XLCell
+    Convert mapper frame result to XLRange or XLCell, or XLRangeSet if the cells found aren't contiguous.
+
+    Parameters
+    ----------
+    value : int or Series or DataFrame
+        result of indexing the mapper frame, whose values are the codes (row * n_cols + col) of each position.
+    origin : XLCell
+        position of the frame's first value within the spreadsheet.
+    n_cols : int
+        number of columns in the frame.
+    transposed : bool
+        if True, the frame's rows run across the spreadsheet and its columns down it (see XLMap.T).
     """
-    if isinstance(value, XLCell):
-        return value
+    if isinstance(value, (int, np.integer)):
+        row, col = divmod(int(value), n_cols)
+        return origin.translate(col, row) if transposed else origin.translate(row, col)
 
     if isinstance(value, pd.Series):
-        return value.values[0] - value.values[-1]
+        return _positions_to_xl(value.values // n_cols, value.values % n_cols, origin, transposed)
 
     if isinstance(value, pd.DataFrame):
-        return value.values[0, 0] - value.values[-1, -1]
+        return _positions_to_xl(value.values[:, 0] // n_cols, value.values[0, :] % n_cols, origin, transposed)
 
     raise TypeError("Could not conver {} to XLRange or XLCell".format(value))
 
 
+def _bounding_range(ranges):
+    """
+    Smallest XLRange that contains every range in ranges (all assumed to be in the same sheet).
+    """
+    ranges = list(ranges)
+    start = XLCell(min(r.start.row for r in ranges), min(r.start.col for r in ranges), ranges[0].sheet)
+    stop = XLCell(max(r.stop.row for r in ranges), max(r.stop.col for r in ranges), ranges[0].sheet)
+    return start - stop
+
+
+def _save(writer, *timings):
+    """
+    Save writer's workbook, timed as the 'save' phase on each of timings, emitting 'workbook_saved'.
+    """
+    start = perf_counter()
+    with span('save', *timings):
+        writer.save()
+
+    if hooks.listening('workbook_saved'):
+        path = getattr(writer, 'path', None)
+        size = os.path.getsize(path) if isinstance(path, str) and os.path.isfile(path) else None
+        hooks.emit('workbook_saved', bytes=size, duration=perf_counter() - start)
+
+
+def _append_writer(path):
+    """
+    Get an openpyxl ExcelWriter adding to the workbook at path (a new one if there isn't one), rather than replacing it.
+    """
+    writer = pd.ExcelWriter(path, engine='openpyxl')
+    if os.path.isfile(path):
+        import openpyxl
+        writer.book = openpyxl.load_workbook(path)
+        writer.sheets = {sheet.title: sheet for sheet in writer.book.worksheets}
+    return writer
+
+
+def _map_built(xlmap, mode, start):
+    """
+    Emit 'map_built' for xlmap, built (by mode) since start.
+    """
+    if hooks.listening('map_built'):
+        index, columns = xlmap._labels
+        hooks.emit('map_built', cells=len(index) * len(columns), duration=perf_counter() - start, mode=mode)
+
+
+def _no_frame():
+    raise ValueError("XLMap was loaded from a manifest, or kept by a WorkbookMap after its frame was deleted, so has "
+                     "no frame")
+
+
+CellLabel = namedtuple('CellLabel', ['kind', 'index', 'column'])
+CellLabel.__doc__ = """
+What a cell of an XLMap holds, see XLMap.label_at.
+
+kind is 'data', 'index' or 'columns', index is the index label of the cell's row (None for 'columns' cells), and column
+is the column label of the cell's column (None for 'index' cells).
+"""
+
+
+def _cache_key(key):
+    """
+    Convert an indexer key into a hashable key for IndexerCache, raising TypeError if it can't be (e.g. for boolean
+    masks or callables).
+    """
+    if isinstance(key, slice):
+        return slice, _cache_key(key.start), _cache_key(key.stop), _cache_key(key.step)
+
+    if isinstance(key, (tuple, list)):
+        return (type(key),) + tuple(_cache_key(part) for part in key)
+
+    if isinstance(key, (np.ndarray, pd.Series, pd.Index, pd.DataFrame)) or callable(key) or \
+            not pd.api.types.is_hashable(key):
+        raise TypeError("Can't cache indexer key {!r}".format(key))
+
+    return type(key), key
+
+
+def _label_block(labels, key):
+    """
+    Find the contiguous block of positions key selects from labels, without a full scan where possible.
+
+    Returns
+    -------
+    first, last, scalar : int, int, bool
+        inclusive positions of the block, and whether key selected a single position (as opposed to a slice that
+        happens to be one long), or None if key doesn't select a contiguous block or needs pandas to resolve.
+    """
+    if isinstance(key, slice):
+        if key == slice(None):
+            return 0, len(labels) - 1, False
+        if key.step not in (None, 1) or not (labels.is_monotonic_increasing or
+                                            (isinstance(labels, pd.MultiIndex) and labels.is_lexsorted())):
+            return None
+        try:
+            first, stop = labels.slice_locs(key.start, key.stop)
+        except (KeyError, TypeError, ValueError):
+            return None
+        return first, stop - 1, False
+
+    if not pd.api.types.is_hashable(key):
+        return None
+
+    try:
+        loc = labels.get_loc(key)
+    except (KeyError, TypeError, ValueError, pd.errors.UnsortedIndexError):
+        return None
+
+    if is_int_type(loc) and not isinstance(loc, bool):
+        return int(loc), int(loc), True
+    if isinstance(loc, slice) and loc.step in (None, 1):
+        return loc.start, loc.stop - 1, False
+    return None
+
+
+def _label_positions(labels, keys):
+    """
+    Get the position of each of keys in labels.
+
+    Raises
+    ------
+    KeyError
+        if any of keys isn't found.
+    """
+    positions = labels.get_indexer(keys)
+    if (positions == -1).any():
+        raise KeyError("{} not found".format([key for key, position in zip(keys, positions) if position == -1]))
+    return positions
+
+
+def _subset_block(labels, key):
+    """
+    Find the block of positions key (labels, a slice of labels or a list of labels) selects from labels, for
+    XLMap.subset.
+
+    Returns
+    -------
+    first, last : int
+        inclusive positions of the block.
+
+    Raises
+    ------
+    KeyError
+        if any label isn't found.
+    ValueError
+        if the positions selected aren't one contiguous, ascending block.
+    """
+    if key is None:
+        return 0, len(labels) - 1
+
+    if isinstance(key, slice):
+        positions = range(len(labels))[labels.slice_indexer(key.start, key.stop, key.step)]
+    elif pd.api.types.is_list_like(key) and not isinstance(key, tuple):
+        positions = labels.get_indexer(key)
+        if (positions == -1).any():
+            raise KeyError("{} not found".format([label for label, position in zip(key, positions) if position == -1]))
+    else:
+        loc = labels.get_loc(key)
+        if isinstance(loc, slice):
+            positions = range(len(labels))[loc]
+        elif is_int_type(loc):
+            positions = range(loc, loc + 1)
+        else:
+            positions = np.flatnonzero(loc)
+
+    if isinstance(positions, range):
+        contiguous = len(positions) and (positions.step == 1 or len(positions) == 1)
+    else:
+        contiguous = len(positions) and (np.diff(positions) == 1).all()
+
+    if not contiguous:
+        raise ValueError("{!r} doesn't select a contiguous block, subsets must be a single range".format(key))
+
+    return int(positions[0]), int(positions[-1])
+
+
+class IndexerCache:
+    """
+    Bounded least recently used cache of the results of an XLMap's indexers.
+
+    Results are keyed by the indexer used and the key passed to it, keys that can't be hashed (e.g. boolean masks)
+    are never cached. The cache empties itself if the map's data is moved.
+
+    Parameters
+    ----------
+    maxsize : int
+        most results to keep, the least recently used result is dropped once this is exceeded.
+
+    Attributes
+    ----------
+    hits : int
+        number of lookups answered from the cache
+    misses : int
+        number of lookups that had to be resolved with pandas
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._origin = None
+
+    def get(self, key, origin, resolve):
+        """
+        Get the result for key, calling resolve() to find it if it isn't cached.
+
+        Parameters
+        ----------
+        key : hashable
+            (indexer name, cache key) of the lookup.
+        origin : tuple
+            (sheet, row, col) of the map's data, if this changes since the last lookup the cache is emptied.
+        resolve : callable
+            takes no arguments and returns the XLCell, XLRange or XLRangeSet selected.
+
+        Returns
+        -------
+        XLCell or XLRange or XLRangeSet
+            a copy of the cached result, so callers are free to modify it.
+        """
+        if origin != self._origin:
+            self._results.clear()
+            self._origin = origin
+
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            result = self._results[key] = resolve()
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        else:
+            self.hits += 1
+            self._results.move_to_end(key)
+
+        return result.copy()
+
+    def clear(self):
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    def __repr__(self):
+        return "<IndexerCache: size: {}/{}, hits: {}, misses: {}>".format(len(self), self.maxsize, self.hits,
+                                                                           self.misses)
+
+
 class _SelectorProxy:
     """
     Proxy object that intercepts calls to Pandas DataFrame indexers, and re-interprets result into excel locations.
 
     Parameters
     ----------
-    mapper_frame: DataFrame
-        with index the same as the DataFrame it is representing, however, each cell contains
-        the location they sit within the spreadsheet.
+    xlmap: XLMap
+        map whose mapper frame is indexed. The mapper frame has the same index and columns as the DataFrame it is
+        representing, however, each cell contains the code (row * n_cols + col) of its position within the frame.
     selector_name: str
         name of the indexer SelectorProxy is emulating, i.e. loc, iloc, ix, iat or at
 
     Notes
     -----
     Only implements __getitem__ behaviour of indexers.
+
+    Boolean mask and integer array row selections (e.g. xlmap.loc[f['value'] > 0, 'value']) are resolved directly
+    with NumPy, without indexing the mapper frame.
     """
 
-    def __init__(self, mapper_frame, selector_name):
-        self.mapper_frame = mapper_frame
+    def __init__(self, xlmap, selector_name):
+        self.xlmap = xlmap
         self.selector_name = selector_name
 
     def __getitem__(self, key):
-        val = getattr(self.mapper_frame, self.selector_name)[key]
+        return self.xlmap._cached(self.selector_name, key, self._resolve)
+
+    def _resolve(self, key):
+        block = self.xlmap._block_range(self.selector_name, key)
+        if block is not None:
+            return block
+
+        positions = self.xlmap._array_positions(self.selector_name, key)
+        if positions is not None:
+            return _positions_to_xl(positions[0], positions[1], self.xlmap.data.start, self.xlmap._transposed)
+
+        val = getattr(self.xlmap._mapper_frame, self.selector_name)[key]
 
-        return _mapper_to_xl(val)
+        return self.xlmap._mapper_to_xl(val)
 
 
 class XLMap:
@@ -180,7 +467,7 @@ class XLMap:
     Recommended to not be created directly, instead via, XLDataFrame.to_excel.
 
     XLMap can only go 'one level deep' in terms of indexing, because each indexer always returns either an XLCell,
-    or an XLRange. The only workaround is to reduce the size of your DataFrame BEFORE you call write_frame.
+    an XLRange, or an XLRangeSet if the cells selected aren't contiguous (e.g. selecting rows with a boolean mask). The only workaround is to reduce the size of your DataFrame BEFORE you call write_frame.
     This limitation drastically simplifies the implementation. Examples of what WON'T WORK:
 
     >>> xlmap.loc['Mon':'Tues', :].index
@@ -195,6 +482,20 @@ class XLMap:
      that represents the region the DataFrame's data sits in.
     f : DataFrame
      that has been written to excel.
+    group_by : label or list of labels
+     what f was grouped by, if written with to_excel(..., group_by=key).
+    group_sizes : Series
+     number of rows in each group, indexed by group key, if written with to_excel(..., group_by=key).
+    layout : FrameLayout
+     positions of every index and header level, as found by to_excel.
+    copy : bool
+     if True (default), keep a copy of f, otherwise f is kept as is (for frames nothing else refers to).
+    timings : Timings
+     phases already timed for this map, e.g. by to_excel.
+    engine_choice : EngineChoice
+     engine to_excel(..., engine='auto') chose, and why.
+    parameters : dict
+     to_excel parameters f was written with.
 
     Attributes
     ----------
@@ -208,6 +509,23 @@ class XLMap:
         writer used to create spreadsheet
     sheet : object
         sheet object corresponding to sheet the frame was written to, handy if you want insert a chart into the same sheet
+    groups : OrderedDict or None
+        if the frame was written with to_excel(..., group_by=key), maps each group's key to the XLRange of its
+        (contiguous) block of data rows, otherwise None.
+    helpers : list of XLMap
+        maps of any helper blocks written next to the frame, e.g. by create_chart(..., downsample=n)
+    indexer_cache : IndexerCache or None
+        cache of indexer results, if enabled with XLMap.cache_indexers.
+    layout : FrameLayout or None
+        positions of every index and header level, including the cells merged for MultiIndexes.
+    timings : Timings
+        time spent in each phase of writing, mapping and charting the frame, only recorded while instrumentation is
+        on (see xl_link.set_instrumentation), the writer's totals are given by get_timings(writer).
+    engine_choice : EngineChoice or None
+        if written with to_excel(..., engine='auto'), the engine chosen, the reason, and the cost model's estimates.
+    parameters : dict or None
+        parameters the frame was written with (sheet_name, columns, header, index, index_label, startrow, startcol,
+        merge_cells, na_rep, float_format, inf_rep and engine), None for maps created directly.
 
     Examples
     --------
@@ -235,31 +553,53 @@ class XLMap:
                                         'values': proxy.loc[time].frange})
     """
 
-    def __init__(self, data_range, index_range, column_range, f, writer=None):
+    def __init__(self, data_range, index_range, column_range, f, writer=None, group_by=None, group_sizes=None,
+                 layout=None, copy=True, timings=None, engine_choice=None, parameters=None):
         self.index = index_range
         self.columns = column_range
+        self.layout = layout
 
         self.data = data_range
-        self._f = f.copy()
+        self._f = f.copy() if copy else f
+        self._make_f = None
+        self._labels = self._f.index, self._f.columns
+        self._levels = (layout.index_levels, layout.column_levels) if layout is not None else None
+        self._transposed = False
+
+        self.groups = None if group_sizes is None else self._group_ranges(group_sizes)
+        self._group_keys = [] if group_by is None else list(ensure_list(group_by))
 
         self.writer = writer
         self.book = writer.book
         self.sheet = writer.sheets[self.index.sheet]
 
-        self._mapper_frame = f.copy().astype(XLCell)
+        self.helpers = []
+        self._occupied = []
+        self.indexer_cache = None
+        self._mapper = None
+        self.timings = Timings() if timings is None else timings
+        self.engine_choice = engine_choice
+        self.parameters = parameters
+
+    def _group_ranges(self, group_sizes):
+        """
+        Get the block of data rows each group occupies, from the offsets of each group (frame assumed sorted by group).
+        """
+        stops = np.cumsum(group_sizes.values) - 1
+        starts = stops - group_sizes.values + 1
 
-        x_range = self._f.index.size
-        y_range = self._f.columns.size
+        sheet, first_col, last_col, row = self.data.sheet, self.data.start.col, self.data.stop.col, self.data.start.row
 
-        for x in range(x_range):
-            for y in range(y_range):
-                self._mapper_frame.values[x, y] = data_range[x, y]
+        return OrderedDict((key, XLCell(row + start, first_col, sheet) - XLCell(row + stop, last_col, sheet))
+                           for key, start, stop in zip(group_sizes.index, starts.tolist(), stops.tolist()))
 
     @property
     def f(self):
         """
         for convenience provides read-only access to the DataFrame originally written to excel.
         """
+        if self._f is None:
+            self._f, self._make_f = self._make_f(), None
         return self._f
 
     @property
@@ -267,15 +607,537 @@ class XLMap:
         """
         for convenience provides read-only access to the DataFrame originally written to excel.
         """
-        return self._f
+        return self.f
 
     def __repr__(self):
         return "<XLMap: index: {}, columns: {}, data: {}>".format(self.index, self.columns, self.data)
 
+    @property
+    def _mapper_frame(self):
+        """
+        Frame with the same index and columns as self.f, holding the code (row * n_cols + col) of each position, built
+        the first time it's needed.
+        """
+        if self._mapper is None:
+            index, columns = self._labels
+            n_rows, n_cols = len(index), len(columns)
+            with span('mapper', self.timings, _writer_timings(self.writer)):
+                self._mapper = pd.DataFrame(np.arange(n_rows * n_cols, dtype=np.int64).reshape(n_rows, n_cols),
+                                            index=index, columns=columns)
+        return self._mapper
+
+    @property
+    def index_levels(self):
+        """
+        Ranges of each level of the index, outermost first (just [xlmap.index] for a plain index).
+        """
+        return self._levels[0] if self._levels is not None else [self.index]
+
+    @property
+    def column_levels(self):
+        """
+        Ranges of each row of the header, outermost first (just [xlmap.columns] for plain columns).
+        """
+        return self._levels[1] if self._levels is not None else [self.columns]
+
+    def _block(self, first_row, last_row, first_col, last_col):
+        """
+        Get the XLRange of the block of frame positions first_row to last_row and first_col to last_col (inclusive).
+        """
+        if self._transposed:
+            first_row, last_row, first_col, last_col = first_col, last_col, first_row, last_row
+        start = self.data.start
+        return start.translate(first_row, first_col) - start.translate(last_row, last_col)
+
+    def _view(self, data, index, columns, levels, labels, make_f, transposed):
+        """
+        Create an XLMap sharing self's writer, sheet and helpers, for XLMap.subset and XLMap.T.
+        """
+        view = XLMap.__new__(XLMap)
+        view.data, view.index, view.columns = data, index, columns
+        view.layout = None
+        view._levels = levels
+        view._labels = labels
+        view._f, view._make_f = None, make_f
+        view._transposed = transposed
+
+        view.groups, view._group_keys = None, []
+
+        view.writer, view.book, view.sheet = self.writer, self.book, self.sheet
+
+        view.helpers = self.helpers
+        view._occupied = self._occupied
+        view.indexer_cache = None
+        view._mapper = None
+        view.timings = Timings()
+        view.engine_choice = self.engine_choice
+        view.parameters = self.parameters
+        return view
+
+    def _detached(self):
+        """
+        Create a copy of self without its frame or workbook, as XLMap.from_manifest would load, for WorkbookMap to keep
+        once self is deleted.
+        """
+        detached = XLMap.__new__(XLMap)
+        detached.__dict__.update(self.__dict__)
+        detached._f, detached._make_f = None, _no_frame
+        detached.writer = detached.book = detached.sheet = None
+        detached.helpers = []
+        detached._occupied = []
+        detached.indexer_cache = None
+        detached._mapper = None
+        detached.timings = Timings()
+        return detached
+
+    def subset(self, columns=None, rows=None):
+        """
+        Get the map of a block of the frame, without copying the frame or writing it again.
+
+        Parameters
+        ----------
+        columns : label, slice or list of labels
+            optional, columns to keep, default all of them.
+        rows : label, slice or list of labels
+            optional, index labels of the rows to keep, default all of them.
+
+        Returns
+        -------
+        XLMap
+            map of the block, whose data, index and columns ranges are the parts of self's that the block covers.
+
+        Raises
+        ------
+        KeyError
+            if a label isn't found.
+        ValueError
+            if columns or rows don't select one contiguous block (in the order they were written).
+
+        Examples
+        --------
+        >>> weekdays = xlmap.subset(columns=slice('Mon', 'Thur'))
+        >>> weekdays.create_chart('line')
+
+        Notes
+        -----
+        Positions are found with get_loc, slice_indexer or get_indexer, and the subset's ranges are then computed
+        from self's, so this takes the same time however large the frame. The subset's f is only sliced from self.f
+        when it's first accessed, and indexing the subset builds a mapper frame only as large as the block.
+
+        Subsets share self's helpers, and aren't registered with the WorkbookMap (they overlap self).
+        """
+        start = perf_counter()
+        index_labels, column_labels = self._labels
+        first_row, last_row = _subset_block(index_labels, rows)
+        first_col, last_col = _subset_block(column_labels, columns)
+
+        all_rows = rows is None or (first_row == 0 and last_row == len(index_labels) - 1)
+        all_cols = columns is None or (first_col == 0 and last_col == len(column_labels) - 1)
+
+        index_levels, column_levels = self.index_levels, self.column_levels
+        if not all_rows:
+            index_levels = [level[first_row] - level[last_row] for level in index_levels]
+        if not all_cols:
+            column_levels = [level[first_col] - level[last_col] for level in column_levels]
+
+        labels = (index_labels if all_rows else index_labels[first_row:last_row + 1],
+                  column_labels if all_cols else column_labels[first_col:last_col + 1])
+
+        make_f = lambda: self.f.iloc[first_row:last_row + 1, first_col:last_col + 1]
+        all_sheet_rows = all_cols if self._transposed else all_rows
+
+        view = self._view(self._block(first_row, last_row, first_col, last_col),
+                          self.index if all_rows else self.index[first_row] - self.index[last_row],
+                          self.columns if all_cols else self.columns[first_col] - self.columns[last_col],
+                          (index_levels, column_levels), labels, make_f, self._transposed)
+
+        if all_sheet_rows and self.groups is not None:
+            first, last, sheet = view.data.start.col, view.data.stop.col, view.data.sheet
+            view.groups = OrderedDict((key, XLCell(block.start.row, first, sheet) - XLCell(block.stop.row, last, sheet))
+                                      for key, block in self.groups.items())
+            view._group_keys = self._group_keys
+
+        _map_built(view, 'subset', start)
+        return view
+
+    @property
+    def T(self):
+        """
+        Map of the transpose of the frame, i.e. of self.f.T, without copying the frame or writing it again.
+
+        The transposed map's index is self's header and its columns are self's index (so xlmap.T.loc[column, label] is
+        xlmap.loc[label, column]), its data range and groups are the same as self's.
+
+        Returns
+        -------
+        XLMap
+
+        Examples
+        --------
+        >>> xlmap.T.loc['Mon']
+            <XLRange: 'Sheet1'!B2:B5>
+        >>> xlmap.T.create_chart('line', values='Lunch')
+        """
+        start = perf_counter()
+        index_labels, column_labels = self._labels
+        view = self._view(self.data, self.columns, self.index, (self.column_levels, self.index_levels),
+                          (column_labels, index_labels), lambda: self.f.T, not self._transposed)
+        view.groups, view._group_keys = self.groups, self._group_keys
+        _map_built(view, 'transpose', start)
+        return view
+
+    def to_manifest(self, labels=True, format=None):
+        """
+        Get the manifest of self: the ranges of its data, index and columns (every level), the cells merged for them,
+        its labels, groups and the parameters it was written with, without its frame or workbook.
+
+        Parameters
+        ----------
+        labels : True, 'hash' or False
+            True (default) keeps every label, 'hash' a digest of them (see xl_link.manifest.labels_hash), e.g. to
+            check the frame a manifest was made from without saving its labels, False only their number.
+        format : str
+            optional, 'json' or 'msgpack' (needs msgpack installed) to serialize the manifest, default gets a dict.
+
+        Returns
+        -------
+        dict, str or bytes
+            of JSON types, serialized if format is given.
+
+        Examples
+        --------
+        >>> xlmap.to_manifest(format='json')
+            '{"version":1,"sheet":"Sheet1","data":"B2:E5","index":"A2:A5","columns":"B1:E1",...}'
+        >>> XLMap.from_manifest(xlmap.to_manifest()).loc['Lunch', 'Mon']
+            <XLCell: 'Sheet1'!B3>
+        """
+        layout = self.layout
+        manifest = {'version': MANIFEST_VERSION,
+                    'sheet': self.data.sheet,
+                    'data': self.data.range,
+                    'index': self.index.range,
+                    'columns': self.columns.range,
+                    'levels': None if self._levels is None else [[level.range for level in levels]
+                                                                 for levels in self._levels],
+                    'layout': None if layout is None else {'index_runs': encode_runs(layout.index_runs),
+                                                           'column_runs': encode_runs(layout.column_runs)},
+                    'transposed': self._transposed,
+                    'labels': {'index': encode_labels(self._labels[0], labels),
+                               'columns': encode_labels(self._labels[1], labels)},
+                    'groups': None if self.groups is None else
+                              {'keys': encode_labels(pd.Index(list(self.groups)), labels),
+                               'ranges': [group.range for group in self.groups.values()]},
+                    'group_by': jsonable(self._group_keys),
+                    'parameters': jsonable(self.parameters),
+                    'engine_choice': None if self.engine_choice is None else jsonable(self.engine_choice._asdict())}
+        return manifest if format is None else dumps(manifest, format)
+
+    @classmethod
+    def from_manifest(cls, manifest):
+        """
+        Load a map from its manifest (see XLMap.to_manifest), without its frame or workbook.
+
+        Parameters
+        ----------
+        manifest : dict, str or bytes
+            as returned by to_manifest, or serialized in JSON or msgpack.
+
+        Returns
+        -------
+        XLMap
+            whose writer, book and sheet are None. Indexers, subset, T, label_at, labels_at and extent work as on the
+            original map, while f, and anything writing to the workbook (e.g. create_chart), raise ValueError. If the
+            labels weren't kept, positions take their place.
+
+        Raises
+        ------
+        ValueError
+            if the manifest is from a newer version of xl_link.
+        """
+        start = perf_counter()
+        manifest = loads(manifest)
+        if manifest['version'] > MANIFEST_VERSION:
+            raise ValueError("Manifest version {} is newer than this version of xl_link supports ({})"
+                             .format(manifest['version'], MANIFEST_VERSION))
+
+        sheet = manifest['sheet']
+
+        def to_range(reference):
+            return XLRange.from_range(reference, sheet)
+
+        xlmap = cls.__new__(cls)
+        xlmap.data, xlmap.index, xlmap.columns = (to_range(manifest[key]) for key in ('data', 'index', 'columns'))
+        xlmap._labels = (decode_labels(manifest['labels']['index']), decode_labels(manifest['labels']['columns']))
+        xlmap._levels = None if manifest['levels'] is None else tuple([to_range(level) for level in levels]
+                                                                      for levels in manifest['levels'])
+        xlmap._transposed = manifest['transposed']
+
+        layout = manifest['layout']
+        if layout is None:
+            xlmap.layout = None
+        else:
+            index_labels, column_labels = xlmap._labels
+            xlmap.layout = FrameLayout(xlmap.data, xlmap.index, xlmap.columns, xlmap._levels[0], xlmap._levels[1],
+                                       decode_runs(layout['index_runs'], len(index_labels)),
+                                       decode_runs(layout['column_runs'], len(column_labels)))
+
+        xlmap._f, xlmap._make_f = None, _no_frame
+
+        groups = manifest['groups']
+        xlmap.groups = None if groups is None else OrderedDict(zip(decode_labels(groups['keys']),
+                                                                   map(to_range, groups['ranges'])))
+        xlmap._group_keys = manifest['group_by']
+
+        xlmap.writer = xlmap.book = xlmap.sheet = None
+        xlmap.helpers = []
+        xlmap._occupied = []
+        xlmap.indexer_cache = None
+        xlmap._mapper = None
+        xlmap.timings = Timings()
+
+        choice = manifest['engine_choice']
+        xlmap.engine_choice = None if choice is None else EngineChoice(
+            choice['engine'], choice['reason'], {engine: tuple(estimate) for engine, estimate in
+                                                 choice['estimates'].items()})
+        xlmap.parameters = manifest['parameters']
+
+        _map_built(xlmap, 'manifest', start)
+        return xlmap
+
+    @property
+    def reference_cache(self):
+        """
+        ReferenceCache shared by all charts created in this map's workbook, see ReferenceCache.hits for the number of
+        references that have been reused.
+        """
+        return get_reference_cache(self.book)
+
+    @property
+    def workbook_map(self):
+        """
+        WorkbookMap of every frame written with this map's writer, see WorkbookMap.owner to find which frame a cell
+        belongs to.
+        """
+        return get_workbook_map(self.writer)
+
+    @property
+    def extent(self):
+        """
+        Smallest range containing the index, columns, data and anything else xl_link has placed alongside the frame,
+        e.g. helper blocks written by create_chart.
+
+        Returns
+        -------
+        XLRange
+        """
+        return _bounding_range([self.index, self.columns, self.data] + self._occupied)
+
+    def _cell_offsets(self, rows, cols):
+        """
+        Classify cells at rows, cols (arrays of spreadsheet positions) by what they hold within self.
+
+        Returns
+        -------
+        row_offsets, col_offsets : ndarray
+            position of each cell relative to the first data value
+        in_data, in_index, in_columns : ndarray
+            bool arrays, True where the cell is a data value, an index label or a column label.
+        """
+        index_labels, column_labels = self._labels
+        n_rows, n_cols = len(index_labels), len(column_labels)
+
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        data_start, index_start, columns_start = self.data.start, self.index.start, self.columns.start
+        if self._transposed: # the frame's rows run across the sheet
+            rows, cols = cols, rows
+            data_start, index_start, columns_start = (XLCell(cell.col, cell.row, cell.sheet)
+                                                      for cell in (data_start, index_start, columns_start))
+
+        row_offsets = rows - data_start.row
+        col_offsets = cols - data_start.col
+
+        in_rows = (row_offsets >= 0) & (row_offsets < n_rows)
+        in_cols = (col_offsets >= 0) & (col_offsets < n_cols)
+
+        index_col = cols - index_start.col
+        header_row = rows - columns_start.row
+
+        in_data = in_rows & in_cols
+        in_index = in_rows & (index_col <= 0) & (index_col > -index_labels.nlevels)
+        in_columns = in_cols & (header_row <= 0) & (header_row > -column_labels.nlevels)
+
+        return row_offsets, col_offsets, in_data, in_index, in_columns
+
+    def label_at(self, cell):
+        """
+        Find which labels of the frame cell corresponds to.
+
+        Parameters
+        ----------
+        cell : XLCell or str
+            cell, either an XLCell, or a str in excel notation (e.g. 'B4', assumed to be in the same sheet as self) or
+            excel formula notation (e.g. "'Sheet1'!B4").
+
+        Returns
+        -------
+        CellLabel
+            namedtuple of (kind, index, column), where kind is 'data', 'index' or 'columns'.
+
+        Raises
+        ------
+        KeyError
+            if cell isn't part of the frame.
+
+        Examples
+        --------
+        >>> xlmap.label_at('C3')
+            CellLabel(kind='data', index='Lunch', column='Tues')
+        >>> xlmap.label_at("'Sheet1'!A3")
+            CellLabel(kind='index', index='Lunch', column=None)
+
+        Notes
+        -----
+        Labels are found from the cell's offset from the data, without searching.
+        """
+        if isinstance(cell, str):
+            cell = XLCell.from_fcell(cell) if '!' in cell else XLCell.from_cell(cell, self.data.sheet)
+
+        if cell.sheet == self.data.sheet:
+            (row,), (col,), (in_data,), (in_index,), (in_columns,) = self._cell_offsets([cell.row], [cell.col])
+
+            index_labels, column_labels = self._labels
+            if in_data:
+                return CellLabel('data', index_labels[row], column_labels[col])
+            if in_index:
+                return CellLabel('index', index_labels[row], None)
+            if in_columns:
+                return CellLabel('columns', None, column_labels[col])
+
+        raise KeyError("{} is not part of {}".format(cell, self))
+
+    def labels_at(self, cells):
+        """
+        Vectorised XLMap.label_at.
+
+        Parameters
+        ----------
+        cells : iterable of XLCell or str
+            cells to look up.
+
+        Returns
+        -------
+        DataFrame
+            with columns 'kind', 'index' and 'column', one row per cell, see CellLabel. Cells that aren't part of the
+            frame have kind None.
+        """
+        sheet = self.data.sheet
+        cells = [(XLCell.from_fcell(cell) if '!' in cell else XLCell.from_cell(cell, sheet))
+                 if isinstance(cell, str) else cell for cell in cells]
+
+        rows = np.fromiter((cell.row if cell.sheet == sheet else -1 for cell in cells), dtype=np.int64, count=len(cells))
+        cols = np.fromiter((cell.col if cell.sheet == sheet else -1 for cell in cells), dtype=np.int64, count=len(cells))
+
+        row_offsets, col_offsets, in_data, in_index, in_columns = self._cell_offsets(rows, cols)
+
+        kinds = np.full(len(cells), None, dtype=object)
+        kinds[in_columns] = 'columns'
+        kinds[in_index] = 'index'
+        kinds[in_data] = 'data'
+
+        def take(labels, offsets, mask):
+            found = np.full(len(cells), None, dtype=object)
+            found[mask] = np.asarray(labels.take(offsets[mask]), dtype=object)
+            return found
+
+        return pd.DataFrame({'kind': kinds,
+                             'index': take(self._labels[0], row_offsets, in_data | in_index),
+                             'column': take(self._labels[1], col_offsets, in_data | in_columns)},
+                            columns=['kind', 'index', 'column'])
+
+    def _write_helper(self, frame):
+        """
+        Write frame to the sheet, to the right of everything already occupied by self, returning its XLMap.
+        """
+        top = self.columns.start.row - (self.f.columns.nlevels - 1)
+        left = self.extent.stop.col + 2
+
+        if isinstance(self.writer, pd.ExcelWriter):
+            helper = XLDataFrame(frame).to_excel(self.writer, sheet_name=self.data.sheet, startrow=top, startcol=left)
+        else: # writers of their own, e.g. ParallelWriter, write frames with their to_excel
+            helper = self.writer.to_excel(frame, sheet_name=self.data.sheet, startrow=top, startcol=left)
+
+        self.helpers.append(helper)
+        self._occupied.append(helper.extent)
+        return helper
+
+    def _downsampled(self, n_points, method, values, categories):
+        """
+        Write a decimated copy of the columns needed to plot values against categories, returning its XLMap.
+
+        At most n_points are chosen from each series, the helper block holds the union of the points chosen.
+        """
+        value_labels = list(self.f.columns) if values is None else list(ensure_list(values))
+        category_labels = [] if categories is None else list(ensure_list(categories))
+
+        if len(category_labels) == 1:
+            category_labels *= len(value_labels)
+
+        keep = []
+        for i, value in enumerate(value_labels):
+            x = self.f[category_labels[i]].values if category_labels else self.f.index.values
+            keep.append(downsample_indices(x, self.f[value].values, n_points, method))
+
+        keep = np.unique(np.concatenate(keep))
+
+        used = []
+        for label in value_labels + category_labels:
+            if label not in used:
+                used.append(label)
+
+        return self._write_helper(self.f.iloc[keep][used])
+
+    def _row_ranges(self, labels):
+        """
+        Get the XLRange of the data in each row of labels, computed from the index positions of labels in bulk.
+        """
+        index_labels, column_labels = self._labels
+        positions = index_labels.get_indexer(labels)
+
+        if (positions == -1).any():
+            raise KeyError("{} not in index".format([label for label, position in zip(labels, positions)
+                                                     if position == -1]))
+
+        last_col = len(column_labels) - 1
+        return [self._block(row, row, 0, last_col) for row in positions.tolist()]
+
+    def _create_row_chart(self, type_, values, categories, names,
+                          subtype, title,
+                          x_axis_name, y_axis_name):
+        """
+        Create chart where each series corresponds to a row of the frame, see XLMap.create_chart.
+        """
+        labels = list(self.f.index) if values is None else list(ensure_list(values))
+
+        if names is None:
+            names = [str(label) for label in labels]
+
+        if categories is None:
+            categories = self.columns
+        else:
+            categories = self._row_ranges(list(ensure_list(categories)))
+
+        return create_chart(self.book, self.writer.engine, type_,
+                            self._row_ranges(labels), categories, names,
+                            subtype, title,
+                            x_axis_name, y_axis_name)
+
+    @timed('create_chart')
     def create_chart(self, type_='scatter',
                      values=None, categories=None, names=None,
                      subtype=None,
-                     title=None, x_axis_name=None, y_axis_name=None):
+                     title=None, x_axis_name=None, y_axis_name=None,
+                     downsample=None, downsample_method='lttb',
+                     orient='columns'):
         """
         Create excel chart object based off of data within the Frame.
 
@@ -300,6 +1162,15 @@ class XLMap:
             used as label on x_axis
         y_axis_name : str
             used as label on y_axis
+        downsample : int
+            if given, and the frame is longer than downsample, at most this many points are plotted for each series.
+            The chosen rows are written to a helper block to the right of the frame (see XLMap.helpers), and the chart
+            references the helper block instead. The original data is left untouched.
+        downsample_method : str
+            'lttb' (Largest-Triangle-Three-Buckets, default) or 'minmax' (min and max of equally sized buckets).
+        orient : str
+            'columns' (default) or 'rows'. If 'rows', values and categories are index labels, each series is a row of
+            the frame, categories default to the columns header, and names default to the index labels of values.
 
         Returns
         -------
@@ -308,10 +1179,32 @@ class XLMap:
 
         Notes
         -----
-        values, categories parameters can only correspond to columns.
+        With orient='columns', values, categories parameters can only correspond to columns, and with orient='rows'
+        they can only correspond to rows.
+
+        Examples
+        --------
+        One series per meal, plotted against the days of the week:
+
+        >>> chart = xlmap.create_chart('line', orient='rows')
 
         """
 
+        if orient == 'rows':
+            if downsample:
+                raise ValueError("downsample is only supported with orient='columns'")
+            return self._create_row_chart(type_, values, categories, names,
+                                          subtype, title,
+                                          x_axis_name, y_axis_name)
+        elif orient != 'columns':
+            raise ValueError("orient must be 'columns' or 'rows', not {}".format(orient))
+
+        if downsample and self.f.index.size > downsample:
+            helper = self._downsampled(downsample, downsample_method, values, categories)
+            return helper.create_chart(type_, values, categories, names,
+                                       subtype, title,
+                                       x_axis_name, y_axis_name)
+
         if names is None and categories is None:
             names = tuple(name for name in self.f.columns.values)
         elif names is None and isinstance(categories, (str, int, list, tuple)):
@@ -343,6 +1236,152 @@ class XLMap:
                             subtype, title,
                             x_axis_name, y_axis_name)
 
+    @timed('create_charts_by_group')
+    def create_charts_by_group(self, type_='scatter',
+                               values=None, categories=None, names=None,
+                               subtype=None,
+                               title=None, x_axis_name=None, y_axis_name=None):
+        """
+        Create one chart per group, for a frame written with to_excel(..., group_by=key).
+
+        Each chart only references the rows of its group. Ranges are computed from the group offsets, so no pandas
+        indexing is done per group.
+
+        Parameters
+        ----------
+        type_ : str
+            Type of chart to create.
+        values : str or list or tuple
+            label or list of labels of columns to use as values for each series in each chart.
+            Default all columns, except those grouped by.
+        categories : str or list or tuple
+            label or list of labels of columns to use as categories for each series in each chart.
+            Default, use index for 'scatter' or None for everything else.
+        names: str or list or tuple
+            str or list of strs to corresponding to names for each series in each chart. Default, labels of values.
+        subtype : str
+            subtype of type, only available for some chart types e.g. bar, see Excel writing package for details
+        title : str
+            chart title, formatted with the group's key, e.g. 'Sales for {}'. Default, the group's key.
+        x_axis_name : str
+            used as label on x_axis
+        y_axis_name : str
+            used as label on y_axis
+
+        Returns
+        -------
+        OrderedDict
+            mapping each group's key to its chart.
+
+        Examples
+        --------
+        >>> xlmap = sales.to_excel(writer, group_by='Region')
+        >>> charts = xlmap.create_charts_by_group('line', values='Revenue', title='Revenue in {}')
+        >>> xlmap.place_charts(list(charts.values()), cols=4)
+        """
+        if self.groups is None:
+            raise TypeError("XLMap has no groups, write the frame using to_excel(..., group_by=key)")
+
+        # groups are blocks of the sheet's rows, so each series runs down the sheet whether or not self is transposed
+        index_labels, column_labels = self._labels
+        series_labels, index_range = (index_labels, self.columns) if self._transposed else (column_labels, self.index)
+
+        if values is None:
+            values = [label for label in series_labels if label not in self._group_keys]
+        values = list(ensure_list(values))
+
+        if names is None:
+            names = [str(value) for value in values]
+
+        use_index = categories is None and (type_ in SINGLE_CATEGORY_CHARTS and len(values) > 1) or \
+                    type_ in CATEGORIES_REQUIRED_CHARTS
+        categories = [] if categories is None or use_index else list(ensure_list(categories))
+
+        value_cols = (_label_positions(series_labels, values) + self.data.start.col).tolist()
+        category_cols = (_label_positions(series_labels, categories) + self.data.start.col).tolist()
+        if use_index:
+            category_cols = [index_range.start.col]
+
+        sheet = self.data.sheet
+
+        charts = OrderedDict()
+        for key, block in self.groups.items():
+            first, last = block.start.row, block.stop.row
+            charts[key] = create_chart(self.book, self.writer.engine, type_,
+                                       [XLCell(first, col, sheet) - XLCell(last, col, sheet) for col in value_cols],
+                                       [XLCell(first, col, sheet) - XLCell(last, col, sheet) for col in category_cols]
+                                       or None,
+                                       names,
+                                       subtype, title.format(key) if title else str(key),
+                                       x_axis_name, y_axis_name)
+        return charts
+
+    def save(self):
+        """
+        Save the workbook self was written to, i.e. writer.save(), timed as the 'save' phase and emitting the
+        'workbook_saved' hook.
+
+        Notes
+        -----
+        xlsxwriter workbooks can only be saved once, so call this after everything has been written.
+        """
+        _save(self.writer, self.timings, _writer_timings(self.writer))
+
+    def place_charts(self, charts, anchor='right', cols=None, size=None, gap=1):
+        """
+        Insert charts into self.sheet, laid out on a grid next to the frame so that they don't overlap the frame,
+        any helper blocks or each other.
+
+        Parameters
+        ----------
+        charts : chart or list of charts
+            charts to insert, e.g. created with XLMap.create_chart.
+        anchor : str
+            'right' (default) to start the grid to the right of the frame, or 'below' to start it underneath.
+        cols : int
+            number of charts per row of the grid. Default 1 for 'right' (a column of charts) or all of them for 'below'
+            (a row of charts).
+        size : tuple
+            (width, height) in pixels to give each chart, default keeps the engine's default chart size.
+        gap : int
+            number of empty cells left between charts, and between the frame and the grid.
+
+        Returns
+        -------
+        list of XLRange
+            range of cells each chart covers, assuming default row heights and column widths.
+
+        Examples
+        --------
+        >>> charts = [xlmap.create_chart('line', values=col) for col in xlmap.f.columns]
+        >>> xlmap.place_charts(charts, anchor='below', cols=3)
+            [<XLRange: 'Sheet1'!A7:H21>, <XLRange: 'Sheet1'!J7:Q21>, <XLRange: 'Sheet1'!S7:Z21>, ...]
+        """
+        charts = ensure_list(charts)
+
+        extent = self.extent
+        if anchor == 'right':
+            origin = XLCell(extent.start.row, extent.stop.col + 1 + gap, extent.sheet)
+            cols = cols or 1
+        elif anchor == 'below':
+            origin = XLCell(extent.stop.row + 1 + gap, extent.start.col, extent.sheet)
+            cols = cols or len(charts)
+        else:
+            raise ValueError("anchor must be 'right' or 'below', not {}".format(anchor))
+
+        height, width = chart_size(self.writer.engine, size)
+
+        placed = []
+        for i, chart in enumerate(charts):
+            row, col = divmod(i, cols)
+            start = origin.translate(row * (height + gap), col * (width + gap))
+
+            insert_chart(self.sheet, self.writer.engine, chart, start, size)
+            placed.append(start - start.translate(height - 1, width - 1))
+
+        self._occupied.extend(placed)
+        return placed
+
     def __getitem__(self, key):
         """
         Emulates DataFrame.__getitem__ (DataFrame[key] syntax), see Pandas DataFrame indexing for help on behaviour.
@@ -364,9 +1403,139 @@ class XLMap:
         >>> xlmap['Col 1']
             <XLRange: B2:B10>
         """
-        val = self._mapper_frame[key]
+        if is_bool_indexer(key):
+            return self.loc[key]
 
-        return _mapper_to_xl(val)
+        return self._cached('getitem', key, lambda key: self._mapper_to_xl(self._mapper_frame[key]))
+
+    def cache_indexers(self, maxsize=256):
+        """
+        Cache the results of this map's indexers, so that repeated lookups (e.g. xlmap.loc[label] inside a loop) don't
+        go through pandas each time.
+
+        Parameters
+        ----------
+        maxsize : int
+            most results to keep, pass 0 (or None) to stop caching.
+
+        Returns
+        -------
+        IndexerCache or None
+            the cache now in use, its hits and misses attributes show how effective it is.
+
+        Examples
+        --------
+        >>> xlmap.cache_indexers()
+        >>> for meal in meals:
+        >>>     chart.add_series({'values': xlmap.loc[meal, 'Mon':'Thur'].frange})
+        >>> xlmap.indexer_cache
+            <IndexerCache: size: 4/256, hits: 1020, misses: 4>
+        """
+        self.indexer_cache = IndexerCache(maxsize) if maxsize else None
+        return self.indexer_cache
+
+    def _cached(self, selector_name, key, resolve):
+        """
+        Get resolve(key), via the indexer cache if it is enabled and key can be hashed.
+        """
+        cache = self.indexer_cache
+        if cache is None:
+            return resolve(key)
+
+        try:
+            cache_key = (selector_name, _cache_key(key))
+        except TypeError:
+            return resolve(key)
+
+        start = self.data.start
+        return cache.get(cache_key, (start.sheet, start.row, start.col), lambda: resolve(key))
+
+    def _mapper_to_xl(self, value):
+        """
+        Convert result of indexing the mapper frame to XLCell, XLRange or XLRangeSet.
+        """
+        return _mapper_to_xl(value, self.data.start, self._labels[1].size, self._transposed)
+
+    def _block_range(self, selector_name, key):
+        """
+        Resolve loc selections of MultiIndex labels (including partial keys, e.g. xlmap.loc['2024'] on a year/region
+        index) with get_loc and slice_locs, which binary search a sorted MultiIndex instead of indexing the mapper frame.
+
+        Returns
+        -------
+        XLCell or XLRange
+            position of the block selected, or None if key isn't such a selection, in which case the mapper frame
+            should be indexed instead.
+        """
+        index, columns = self._labels
+        if selector_name != 'loc' or not (isinstance(index, pd.MultiIndex) or isinstance(columns, pd.MultiIndex)):
+            return None
+
+        if isinstance(key, tuple) and len(key) == 2 and (isinstance(key[0], (tuple, slice)) or
+                                                          not isinstance(index, pd.MultiIndex)):
+            row_key, col_key = key
+        elif isinstance(key, tuple):
+            return None  # could be a row key or (row, column), leave it to pandas to decide
+        else:
+            row_key, col_key = key, slice(None)
+
+        rows = _label_block(index, row_key)
+        cols = _label_block(columns, col_key) if rows is not None else None
+        if cols is None:
+            return None
+
+        (first_row, last_row, row_scalar), (first_col, last_col, col_scalar) = rows, cols
+        if last_row < first_row or last_col < first_col:
+            return None
+
+        if row_scalar and col_scalar:
+            return self._block(first_row, first_row, first_col, first_col).start
+        return self._block(first_row, last_row, first_col, last_col)
+
+    def _array_positions(self, selector_name, key):
+        """
+        Resolve selections whose rows are a boolean mask or an integer array, using NumPy rather than pandas.
+
+        Returns
+        -------
+        rows, cols : ndarray
+            positions selected, or None if key isn't such a selection, in which case the mapper frame should be
+            indexed instead.
+        """
+        if selector_name not in ('loc', 'iloc'):
+            return None
+
+        row_key, col_key = key if isinstance(key, tuple) and len(key) == 2 else (key, slice(None))
+
+        if not isinstance(row_key, (np.ndarray, pd.Series, pd.Index, list)):
+            return None
+
+        index_labels, column_labels = self._labels
+        n_rows, n_cols = len(index_labels), len(column_labels)
+        if isinstance(row_key, pd.Series) and not row_key.index.equals(index_labels):
+            return None # Needs aligning, leave that to pandas
+
+        row_key = np.asarray(row_key)
+        if row_key.dtype == bool and row_key.shape == (n_rows,):
+            rows = np.flatnonzero(row_key)
+        elif selector_name == 'iloc' and row_key.ndim == 1 and np.issubdtype(row_key.dtype, np.integer):
+            rows = np.where(row_key < 0, row_key + n_rows, row_key)
+            if ((rows < 0) | (rows >= n_rows)).any():
+                return None
+        else:
+            return None
+
+        if isinstance(col_key, slice) and col_key == slice(None):
+            cols = np.arange(n_cols)
+        elif selector_name == 'iloc' and is_int_type(col_key):
+            cols = np.array([col_key + n_cols if col_key < 0 else col_key])
+        elif selector_name == 'loc' and not isinstance(col_key, (tuple, slice)) and column_labels.is_unique and \
+                pd.api.types.is_hashable(col_key) and col_key in column_labels:
+            cols = np.array([column_labels.get_loc(col_key)])
+        else:
+            return None
+
+        return rows, cols
 
     @property
     def loc(self):
@@ -385,7 +1554,7 @@ class XLMap:
         >>> xlmap.loc['Tues']
             <XLRange: A2:D2>
         """
-        return _SelectorProxy(self._mapper_frame, 'loc')
+        return _SelectorProxy(self, 'loc')
 
     @property
     def iloc(self):
@@ -404,7 +1573,7 @@ class XLMap:
         >>> xlmap.iloc[3, :]
             <XLRange: A2:D2>
         """
-        return _SelectorProxy(self._mapper_frame, 'iloc')
+        return _SelectorProxy(self, 'iloc')
 
     @property
     def ix(self):
@@ -424,7 +1593,7 @@ class XLMap:
         >>> xlmap.ix[3, :]
             <XLRange A2:D2>
         """
-        return _SelectorProxy(self._mapper_frame, 'ix')
+        return _SelectorProxy(self, 'ix')
 
     @property
     def iat(self):
@@ -443,7 +1612,7 @@ class XLMap:
         >>> xlmap.iat[3, 2]
             <XLCell C3>
         """
-        return _SelectorProxy(self._mapper_frame, 'iat')
+        return _SelectorProxy(self, 'iat')
 
     @property
     def at(self):
@@ -463,7 +1632,7 @@ class XLMap:
         >>> xlmap.at["Mon", "Lunch"]
             <XLCell: C3>
         """
-        return _SelectorProxy(self._mapper_frame, 'at')
+        return _SelectorProxy(self, 'at')
 
 
 class XLDataFrame(pd.DataFrame):
@@ -495,7 +1664,7 @@ class XLDataFrame(pd.DataFrame):
     def to_excel(self, excel_writer, sheet_name='Sheet1', na_rep='',
                  float_format=None, columns=None, header=True, index=True,
                  index_label=None, startrow=0, startcol=0, engine=None,
-                 merge_cells=True, encoding=None, inf_rep='inf', verbose=True,
+                 merge_cells=True, encoding=None, inf_rep='inf', verbose=True, group_by=None, requires=(),
                  **kwargs):
         """
 
@@ -504,6 +1673,20 @@ class XLDataFrame(pd.DataFrame):
         Changes:
         --------
 
+        Parameters
+        ----------
+        group_by : label or list of labels
+            optional, column or index level names (anything DataFrame.groupby accepts) to group rows by. Rows are
+            written sorted by group (stable within each group) so that each group is one contiguous block, see
+            XLMap.groups and XLMap.create_charts_by_group. Rows with a missing key are written last.
+        engine : str
+            as for pandas, or 'auto' to choose the cheapest engine meeting requires with
+            xl_link.engines.choose_engine. The choice and its reason are recorded as XLMap.engine_choice.
+        requires : iterable of str
+            optional, requirements the workbook has when engine is 'auto', e.g. 'append' (see
+            xl_link.engines.REQUIREMENTS). With 'append', the frame is added to the workbook at excel_writer, if
+            there is one, keeping its sheets.
+
         Returns
         -------
 
@@ -522,33 +1705,94 @@ class XLDataFrame(pd.DataFrame):
         called once no further changes are to be made to the spreadsheet.
         """
 
+        engine_choice = None
         if isinstance(excel_writer, pd.ExcelWriter):
             need_save = False
+            if engine == 'auto':
+                engine, engine_choice = None, EngineChoice(excel_writer.engine, "writer given", {})
         else:
-            excel_writer = pd.ExcelWriter(_stringify_path(excel_writer), engine=engine)
+            if engine == 'auto':
+                engine_choice = choose_engine(len(self.index), len(self.columns) if columns is None else len(columns),
+                                              index_levels=self.index.nlevels if index else 0, requires=requires)
+                engine = engine_choice.engine
+            if engine == 'openpyxl' and 'append' in requires:
+                excel_writer = _append_writer(_stringify_path(excel_writer))
+            else:
+                excel_writer = pd.ExcelWriter(_stringify_path(excel_writer), engine=engine)
             need_save = True if excel_writer.engine != 'xlsxwriter' else False # xlsxwriter can only save once!
 
-        super().to_excel(excel_writer, sheet_name=sheet_name, na_rep=na_rep,
-                 float_format=float_format, columns=columns, header=header, index=index,
-                 index_label=index_label, startrow=startrow, startcol=startcol, engine=engine,
-                 merge_cells=merge_cells, encoding=encoding, inf_rep=inf_rep, verbose=verbose,
-                 **kwargs)
+        timings, writer_timings = Timings(), _writer_timings(excel_writer)
+
+        if group_by is None:
+            frame, group_sizes = self, None
+        else:
+            with span('sort', timings, writer_timings):
+                frame, group_sizes = self._sorted_by_group(group_by)
+
+        start = perf_counter()
+        with span('write', timings, writer_timings):
+            pd.DataFrame.to_excel(frame, excel_writer, sheet_name=sheet_name, na_rep=na_rep,
+                     float_format=float_format, columns=columns, header=header, index=index,
+                     index_label=index_label, startrow=startrow, startcol=startcol, engine=engine,
+                     merge_cells=merge_cells, encoding=encoding, inf_rep=inf_rep, verbose=verbose,
+                     **kwargs)
+
+        if hooks.listening('frame_written'):
+            hooks.emit('frame_written', rows=len(frame.index), cols=len(columns) if columns is not None else
+                       len(frame.columns), engine=excel_writer.engine, duration=perf_counter() - start)
 
         if need_save:
-            excel_writer.save()
-
-        data_range, index_range, col_range, _ = get_xl_ranges(self.index, self.columns,
-                                                              sheet_name=sheet_name,
-                                                              columns=columns,
-                                                              header=header,
-                                                              index=index,
-                                                              index_label=index_label,
-                                                              startrow=startrow,
-                                                              startcol=startcol,
-                                                              merge_cells=merge_cells)
-        f = self.copy()
-
-        if isinstance(columns, list) or isinstance(columns, tuple):
-            f = f[columns]
-
-        return XLMap(data_range, index_range, col_range, f, writer=excel_writer)
\ No newline at end of file
+            _save(excel_writer, timings, writer_timings)
+
+        start = perf_counter()
+
+        with span('layout', timings, writer_timings):
+            layout = frame_layout(frame.index, frame.columns,
+                                  sheet_name=sheet_name,
+                                  columns=columns,
+                                  header=header,
+                                  index=index,
+                                  index_label=index_label,
+                                  startrow=startrow,
+                                  startcol=startcol,
+                                  merge_cells=merge_cells)
+
+        with span('map', timings, writer_timings):
+            if isinstance(columns, list) or isinstance(columns, tuple):
+                f = frame[list(columns)]
+            else:
+                f = frame
+
+            xlmap = XLMap(layout.data, layout.index, layout.columns, f, writer=excel_writer,
+                          group_by=group_by, group_sizes=group_sizes, layout=layout,
+                          copy=f is self, # selecting columns or sorting by group already made a copy
+                          timings=timings, engine_choice=engine_choice,
+                          parameters={'sheet_name': sheet_name, 'columns': columns, 'header': header, 'index': index,
+                                      'index_label': index_label, 'startrow': startrow, 'startcol': startcol,
+                                      'merge_cells': merge_cells, 'na_rep': na_rep, 'float_format': float_format,
+                                      'inf_rep': inf_rep, 'engine': excel_writer.engine})
+
+        with span('register', timings, writer_timings):
+            get_workbook_map(excel_writer).register(xlmap)
+
+        _map_built(xlmap, 'to_excel', start)
+        return xlmap
+
+    def _sorted_by_group(self, group_by):
+        """
+        Sort rows so each group of group_by is contiguous, keeping the order of rows within each group.
+
+        Returns
+        -------
+        frame : XLDataFrame
+            sorted frame
+        group_sizes : Series
+            number of rows in each group, indexed by group key, in the order the groups appear in frame.
+        """
+        grouped = self.groupby(group_by, sort=True)
+        group_sizes = grouped.size()
+
+        codes = grouped.ngroup().values
+        codes = np.where(codes == -1, group_sizes.size, codes) # missing keys go last
+
+        return self.iloc[np.argsort(codes, kind='mergesort')], group_sizes
\ No newline at end of file
@@ -0,0 +1,510 @@
+"""
+Writing the sheets of a workbook in parallel.
+
+ParallelWriter writes each frame's header and creates its XLMap in this process, as XLDataFrame.to_excel does, while the
+cells of the frame's body (index and data) are serialized to worksheet XML by worker processes, placed using the
+frame's FrameLayout. On saving, xlsxwriter saves the workbook (headers, charts and anything else written to it), then
+each body is spliced into its worksheet.
+
+Bodies are written as pandas and xlsxwriter would write them, except that strings are written inline rather than to
+the shared strings table, and always as text (xlsxwriter writes strings starting with '=' as formulas, and URLs as
+hyperlinks).
+
+Splicing depends on the worksheet XML xlsxwriter writes, and the XF indexes it gives formats (got from its private
+Format API by _xf_index), so ParallelWriter only accepts the xlsxwriter versions in XLSXWRITER_VERSIONS, which
+tests.xlmap.ParallelWriterCase has been run against. Worksheet XML that isn't as expected, or has cells where a body
+goes, raises ValueError rather than being spliced.
+"""
+import os
+import re
+import zipfile
+from distutils.version import LooseVersion
+from datetime import datetime, date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer, is_float, is_bool
+from pandas.io.common import _stringify_path
+
+try:
+    from pandas.io.formats.excel import ExcelFormatter
+except ImportError:
+    from pandas.formats.format import ExcelFormatter
+
+from .xlsxwriter.utility import (xl_col_to_name, xl_cell_to_rowcol, xl_rowcol_to_cell, xl_range,
+                                 datetime_to_excel_datetime)
+from .mappers import XLMap, _map_built
+from .layout import frame_layout
+from .workbook_map import get_workbook_map
+from .instrumentation import Timings, span, _writer_timings
+
+
+MAX_STRING_LENGTH = 32767 # longest string Excel allows in a cell
+
+# (oldest, newest) xlsxwriter versions tested with, see the module's docstring.
+XLSXWRITER_VERSIONS = ('0.9.9', '3.0.3')
+
+# pandas' style for index cells (its header_style), as xlsxwriter format properties.
+INDEX_FORMAT = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+
+_ESCAPES = [(re.compile('(_x[0-9a-fA-F]{4}_)'), r'_x005F\1'),
+            (re.compile('[\x00-\x08\x0B-\x1F]'), lambda match: "_x%04X_" % ord(match.group(0))),
+            (re.compile('\uFFFE'), '_xFFFE_'),
+            (re.compile('\uFFFF'), '_xFFFF_')]
+
+
+def _escape(string):
+    string = string[:MAX_STRING_LENGTH]
+    string = string.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    for pattern, replacement in _ESCAPES:
+        string = pattern.sub(replacement, string)
+    return string
+
+
+def _style(xf):
+    return ' s="{}"'.format(xf) if xf else ''
+
+
+def _string_cell(ref, string, xf):
+    if not string:
+        return '<c r="{}" s="{}"/>'.format(ref, xf) if xf else ''
+    preserve = ' xml:space="preserve"' if string[0].isspace() or string[-1].isspace() else ''
+    return '<c r="{}"{} t="inlineStr"><is><t{}>{}</t></is></c>'.format(ref, _style(xf), preserve, _escape(string))
+
+
+def _number_cell(ref, number, xf):
+    return '<c r="%s"%s><v>%.16g</v></c>' % (ref, _style(xf), number)
+
+
+def _cell(ref, value, xfs, options):
+    """
+    Serialize a value as pandas' ExcelFormatter and ExcelWriter, then xlsxwriter, would write it.
+    """
+    if np.ndim(value) == 0 and pd.isnull(value):
+        return _string_cell(ref, options['na_rep'], xfs[None])
+
+    if is_float(value):
+        if np.isinf(value):
+            return _string_cell(ref, options['inf_rep'] if value > 0 else '-' + options['inf_rep'], xfs[None])
+        if options['float_format'] is not None:
+            value = float(options['float_format'] % value)
+        return _number_cell(ref, value, xfs[None])
+    if is_integer(value):
+        return _number_cell(ref, int(value), xfs[None])
+    if is_bool(value):
+        return '<c r="{}"{} t="b"><v>{:d}</v></c>'.format(ref, _style(xfs[None]), bool(value))
+    if isinstance(value, datetime):
+        return _number_cell(ref, datetime_to_excel_datetime(value, options['date_1904'], False),
+                            xfs[options['datetime_format']])
+    if isinstance(value, date):
+        return _number_cell(ref, datetime_to_excel_datetime(value, options['date_1904'], False),
+                            xfs[options['date_format']])
+    if isinstance(value, timedelta):
+        return _number_cell(ref, value.total_seconds() / 86400, xfs['0'])
+    return _string_cell(ref, str(value), xfs[None])
+
+
+def _excel_days(values, date_1904):
+    """
+    Convert datetime64 values to Excel serial dates, as xlsxwriter's datetime_to_excel_datetime does.
+    """
+    values = values.astype('M8[ns]')
+    days = (values - np.datetime64('1904-01-01' if date_1904 else '1899-12-31')) / np.timedelta64(1, 'D')
+    if not date_1904:
+        days[(values >= np.datetime64('1900-01-01')) & (values < np.datetime64('1900-01-02'))] -= 1
+        days[days > 59] += 1
+    return days
+
+
+def _column_cells(values, letter, rows, xfs, options):
+    """
+    Serialize a column of values, one cell per row (empty strings for cells left blank).
+    """
+    values = np.asarray(values)
+    kind = values.dtype.kind
+
+    if kind in 'Mm':
+        missing = np.isnat(values)
+        if kind == 'M':
+            numbers, xf = _excel_days(values, options['date_1904']).tolist(), xfs[options['datetime_format']]
+        else:
+            numbers, xf = (values / np.timedelta64(1, 'D')).tolist(), xfs['0']
+        na = options['na_rep']
+        return [_string_cell(letter + row, na, xfs[None]) if is_missing else _number_cell(letter + row, number, xf)
+                for row, number, is_missing in zip(rows, numbers, missing.tolist())]
+
+    if kind in 'iu':
+        xf = _style(xfs[None])
+        return ['<c r="%s%s"%s><v>%.16g</v></c>' % (letter, row, xf, number)
+                for row, number in zip(rows, values.tolist())]
+
+    if kind == 'b':
+        xf = _style(xfs[None])
+        return ['<c r="{}{}"{} t="b"><v>{:d}</v></c>'.format(letter, row, xf, value)
+                for row, value in zip(rows, values.tolist())]
+
+    if kind == 'f' and options['float_format'] is None:
+        xf = _style(xfs[None])
+        finite = np.isfinite(values).tolist()
+        return ['<c r="%s%s"%s><v>%.16g</v></c>' % (letter, row, xf, number) if is_finite else
+                _cell(letter + row, number, xfs, options)
+                for row, number, is_finite in zip(rows, values.tolist(), finite)]
+
+    return [_cell(letter + row, value, xfs, options) for row, value in zip(rows, values.tolist())]
+
+
+def sheet_body(frame, layout, xfs, na_rep='', float_format=None, inf_rep='inf',
+               datetime_format='YYYY-MM-DD HH:MM:SS', date_format='YYYY-MM-DD', date_1904=False):
+    """
+    Serialize the index and data cells of frame to worksheet XML, as placed by layout.
+
+    Parameters
+    ----------
+    frame : DataFrame
+    layout : FrameLayout
+        of frame, as written.
+    xfs : dict
+        maps 'index' and 'data' to dicts of the xlsxwriter XF index to give cells of each number format (None for values
+        without one).
+
+    See DataFrame.to_excel and pd.ExcelWriter for the remaining parameters.
+
+    Returns
+    -------
+    rows : list of (int, int, str)
+        (row, first column, XML of its cells) of each row of the body, rows and columns 0 based.
+    merges : list of str
+        A1 references of the cells merged for MultiIndex levels.
+    """
+    options = {'na_rep': na_rep, 'float_format': float_format, 'inf_rep': inf_rep, 'date_1904': date_1904,
+               'datetime_format': datetime_format, 'date_format': date_format}
+
+    first_row = layout.data.start.row
+    n_rows = len(frame.index)
+    rows = [str(row + 1) for row in range(first_row, first_row + n_rows)]
+
+    index = frame.index.to_timestamp() if isinstance(frame.index, pd.PeriodIndex) else frame.index
+
+    columns, merges = [], []
+    for level, (level_range, (starts, stops)) in enumerate(zip(layout.index_levels, layout.index_runs)):
+        col = level_range.start.col
+        letter, xf = xl_col_to_name(col), xfs['index'][None]
+        values = index.get_level_values(level)
+
+        if len(starts) == n_rows:
+            cells = _column_cells(values, letter, rows, xfs['index'], options)
+        else:
+            cells = ['<c r="{}{}" s="{}"/>'.format(letter, row, xf) for row in rows]
+            run_cells = _column_cells(values.take(starts), letter, [rows[start] for start in starts.tolist()],
+                                      xfs['index'], options)
+            for start, stop, cell in zip(starts.tolist(), stops.tolist(), run_cells):
+                cells[start] = cell
+                if stop > start:
+                    merges.append(xl_range(first_row + start, col, first_row + stop, col))
+        columns.append(cells)
+
+    first_col = layout.data.start.col
+    for position in range(len(frame.columns)):
+        columns.append(_column_cells(frame.iloc[:, position], xl_col_to_name(first_col + position), rows,
+                                     xfs['data'], options))
+
+    body_col = layout.index_levels[0].start.col if layout.index_levels else first_col
+    return [(first_row + i, body_col, ''.join(cells)) for i, cells in enumerate(zip(*columns))], merges
+
+
+_ROW = re.compile(r'<row r="(\d+)"([^>]*?)(?:/>|>(.*?)</row>)', re.S)
+_CELL = re.compile(r'<c r="([A-Z]+)\d+"[^>]*?(?:/>|>.*?</c>)', re.S)
+_COLUMN = re.compile(r'^[A-Z]+')
+_SHEET_DATA = re.compile(r'<sheetData/>|<sheetData>(.*?)</sheetData>', re.S)
+_DIMENSION = re.compile(r'<dimension ref="([^"]*)"/>')
+_MERGE_CELLS = re.compile(r'<mergeCells count="(\d+)">')
+_AFTER_MERGE_CELLS = re.compile(r'<(?:conditionalFormatting|dataValidations|hyperlinks|printOptions|pageMargins)\b')
+_SPANS = re.compile(r'\s*spans="[^"]*"')
+
+
+def _column_number(reference):
+    return xl_cell_to_rowcol(_COLUMN.match(reference).group(0) + '1')[1]
+
+
+def splice_bodies(xml, bodies):
+    """
+    Add the rows and merged cells of each body (as returned by sheet_body) to the worksheet XML xlsxwriter saved.
+
+    Parameters
+    ----------
+    xml : str
+        worksheet XML.
+    bodies : list of (rows, merges, extent)
+        extent being the (first row, first col, last row, last col) each body covers.
+
+    Returns
+    -------
+    str
+
+    Raises
+    ------
+    ValueError
+        if the XML isn't as xlsxwriter writes it, or has cells within a body's extent (they would be duplicated).
+    """
+    rows = {}
+    attributes = {}
+
+    sheet_data = _SHEET_DATA.search(xml)
+    if sheet_data is None or xml.count('<sheetData') != 1:
+        raise ValueError("Can't splice bodies into worksheet XML without exactly one sheetData element")
+
+    saved = sheet_data.group(1) or ''
+    matches = list(_ROW.finditer(saved))
+    if len(matches) != saved.count('<row '):
+        raise ValueError("Can't splice bodies into worksheet XML with rows not written as expected")
+    for match in matches:
+        row = int(match.group(1)) - 1
+        attributes[row] = _SPANS.sub('', match.group(2))
+        cells = list(_CELL.finditer(match.group(3) or ''))
+        if len(cells) != (match.group(3) or '').count('<c '):
+            raise ValueError("Can't splice bodies into worksheet XML with cells not written as expected")
+        rows[row] = [(_column_number(cell.group(1)), cell.group(0)) for cell in cells]
+
+    saved_rows = sorted(rows)
+    for _, _, (first_row, first_col, last_row, last_col) in bodies:
+        overlaps = [xl_rowcol_to_cell(row, col) for row in saved_rows if first_row <= row <= last_row
+                    for col, _ in rows[row] if first_col <= col <= last_col]
+        if overlaps:
+            raise ValueError("Cells {} were written over a frame's body, which can't be spliced into the worksheet"
+                             .format(', '.join(overlaps)))
+
+    for body_rows, _, _ in bodies:
+        for row, col, cells in body_rows:
+            rows.setdefault(row, []).append((col, cells))
+
+    data = ''.join('<row r="{}"{}>{}</row>'.format(row + 1, attributes.get(row, ''),
+                                                   ''.join(cells for _, cells in sorted(rows[row],
+                                                                                         key=lambda cell: cell[0])))
+                   for row in sorted(rows))
+    xml = xml[:sheet_data.start()] + '<sheetData>{}</sheetData>'.format(data) + xml[sheet_data.end():]
+
+    extents = [extent for _, _, extent in bodies if extent[2] >= extent[0]]
+    dimension = _DIMENSION.search(xml)
+    if extents and dimension:
+        ref = dimension.group(1).split(':')
+        corners = [xl_cell_to_rowcol(ref[0]), xl_cell_to_rowcol(ref[-1])]
+        corners += [extent[:2] for extent in extents] + [extent[2:] for extent in extents]
+        ref = xl_range(min(row for row, _ in corners), min(col for _, col in corners),
+                       max(row for row, _ in corners), max(col for _, col in corners))
+        xml = xml[:dimension.start()] + '<dimension ref="{}"/>'.format(ref) + xml[dimension.end():]
+
+    merges = [merge for _, body_merges, _ in bodies for merge in body_merges]
+    if merges:
+        cells = ''.join('<mergeCell ref="{}"/>'.format(merge) for merge in merges)
+        existing = _MERGE_CELLS.search(xml)
+        if existing:
+            count = int(existing.group(1)) + len(merges)
+            xml = xml[:existing.start()] + '<mergeCells count="{}">{}'.format(count, cells) + xml[existing.end():]
+        else:
+            after = _AFTER_MERGE_CELLS.search(xml)
+            position = after.start() if after else xml.index('</worksheet>')
+            xml = xml[:position] + '<mergeCells count="{}">{}</mergeCells>'.format(len(merges), cells) + \
+                  xml[position:]
+    return xml
+
+
+def _xf_index(book, properties):
+    """
+    Get the XF index of the format with properties in book (0 for no properties).
+
+    xlsxwriter has no public API for this: formats are given XF indexes as cells are first written with them, by the
+    private Format._get_xf_index. This is ParallelWriter's only use of xlsxwriter's internals, tested against
+    XLSXWRITER_VERSIONS by tests.xlmap.ParallelWriterCase.test_xf_indexes.
+    """
+    return book.add_format(properties)._get_xf_index() if properties else 0
+
+
+def _check_xlsxwriter():
+    import xlsxwriter
+    oldest, newest = XLSXWRITER_VERSIONS
+    if not LooseVersion(oldest) <= LooseVersion(xlsxwriter.__version__) <= LooseVersion(newest):
+        raise ImportError("ParallelWriter has only been tested with xlsxwriter {} to {}, not {}, see "
+                          "xl_link.parallel".format(oldest, newest, xlsxwriter.__version__))
+
+
+class ParallelWriter:
+    """
+    Write frames to sheets of an xlsx workbook, serializing the cells of each frame in a pool of worker processes.
+
+    Used like a pd.ExcelWriter (engine 'xlsxwriter') whose frames are written with ParallelWriter.to_excel, the
+    returned XLMaps create charts and helpers as usual. Serializing starts as each frame is given, and the workbook is
+    assembled by save.
+
+    Parameters
+    ----------
+    path : str
+        of the xlsx workbook to write.
+    workers : int
+        number of worker processes, default os.cpu_count(). If 1, frames are serialized in this process when saving.
+    **kwargs
+        passed on to pd.ExcelWriter, e.g. date_format and datetime_format.
+
+    Raises
+    ------
+    ImportError
+        if the version of xlsxwriter installed isn't within XLSXWRITER_VERSIONS.
+
+    Examples
+    --------
+    >>> with ParallelWriter('report.xlsx', workers=8) as writer:
+    >>>     for name, frame in frames.items():
+    >>>         xlmap = writer.to_excel(frame, sheet_name=name)
+    >>>         xlmap.place_charts(xlmap.create_chart('line'))
+
+    Notes
+    -----
+    Most of the time saved is from serializing cells to XML directly rather than through pandas and xlsxwriter, which a
+    single worker does too. How much more workers save depends on the cores available, benchmarks/parallel.py measures
+    it by number of workers.
+
+    Cells written directly to a worksheet (e.g. with xlmap.sheet.write) are kept, but not over a frame's body (index
+    and data), which is added to the worksheet after xlsxwriter has saved it: saving raises ValueError if they are.
+    """
+
+    engine = 'xlsxwriter'
+
+    def __init__(self, path, workers=None, **kwargs):
+        _check_xlsxwriter()
+        self.path = _stringify_path(path)
+        self.workers = workers or os.cpu_count() or 1
+        self._writer = pd.ExcelWriter(self.path, engine='xlsxwriter', **kwargs)
+        self._executor = None
+        self._bodies = [] # (sheet name, extent, callable returning the body)
+        self._xfs = None
+
+    @property
+    def book(self):
+        return self._writer.book
+
+    @property
+    def sheets(self):
+        return self._writer.sheets
+
+    def _get_xfs(self):
+        """
+        Register the formats of body cells with the workbook, getting the XF index of each.
+        """
+        if self._xfs is None:
+            self._xfs = {'index': {}, 'data': {}}
+            for kind, style in (('index', INDEX_FORMAT), ('data', None)):
+                for number_format in (None, self._writer.datetime_format, self._writer.date_format, '0'):
+                    properties = dict(style or {})
+                    if number_format is not None:
+                        properties['num_format'] = number_format
+                    self._xfs[kind][number_format] = _xf_index(self.book, properties)
+        return self._xfs
+
+    def to_excel(self, frame, sheet_name='Sheet1', na_rep='', float_format=None, columns=None, header=True,
+                 index=True, index_label=None, startrow=0, startcol=0, merge_cells=True, inf_rep='inf'):
+        """
+        Write frame to sheet_name, as DataFrame.to_excel would.
+
+        Returns
+        -------
+        XLMap
+            of frame as it will appear in the workbook once saved.
+
+        See Also
+        --------
+        XLDataFrame.to_excel, for the parameters.
+        """
+        timings, writer_timings = Timings(), _writer_timings(self)
+        f = frame if columns is None else frame[list(columns)]
+
+        start = perf_counter()
+        with span('layout', timings, writer_timings):
+            layout = frame_layout(f.index, f.columns, sheet_name=sheet_name, header=header, index=index,
+                                  index_label=index_label, startrow=startrow, startcol=startcol,
+                                  merge_cells=merge_cells)
+
+        with span('write', timings, writer_timings):
+            formatter = ExcelFormatter(f.iloc[:1], na_rep=na_rep, float_format=float_format, header=header,
+                                       index=index, index_label=index_label, merge_cells=merge_cells, inf_rep=inf_rep)
+            header_cells = [cell for cell in formatter.get_formatted_cells()
+                            if startrow + cell.row < layout.data.start.row]
+            self._writer.write_cells(header_cells, sheet_name, startrow=startrow, startcol=startcol)
+
+        with span('map', timings, writer_timings):
+            xlmap = XLMap(layout.data, layout.index, layout.columns, f, writer=self, layout=layout,
+                          copy=f is frame, timings=timings,
+                          parameters={'sheet_name': sheet_name, 'columns': columns, 'header': header, 'index': index,
+                                      'index_label': index_label, 'startrow': startrow, 'startcol': startcol,
+                                      'merge_cells': merge_cells, 'na_rep': na_rep, 'float_format': float_format,
+                                      'inf_rep': inf_rep, 'engine': self.engine})
+
+        with span('register', timings, writer_timings):
+            get_workbook_map(self).register(xlmap)
+
+        first_col = layout.index_levels[0].start.col if layout.index_levels else layout.data.start.col
+        extent = (layout.data.start.row, first_col, layout.data.stop.row, layout.data.stop.col)
+        body = partial(sheet_body, xlmap.f, layout, self._get_xfs(), na_rep=na_rep, float_format=float_format,
+                       inf_rep=inf_rep, datetime_format=self._writer.datetime_format,
+                       date_format=self._writer.date_format, date_1904=self.book.date_1904)
+        if self.workers > 1:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            body = self._executor.submit(body).result
+        self._bodies.append((sheet_name, extent, body))
+
+        _map_built(xlmap, 'to_excel', start)
+        return xlmap
+
+    def save(self):
+        """
+        Save the workbook, once each frame's body has been serialized.
+
+        Raises
+        ------
+        ValueError
+            if cells were written to a worksheet over a frame's body, see ParallelWriter.
+        """
+        try:
+            self._writer.save()
+
+            parts = {}
+            sheets = [sheet for sheet in self.book.worksheets() if not sheet.is_chartsheet]
+            for number, sheet in enumerate(sheets, 1):
+                bodies = [(extent, body) for name, extent, body in self._bodies if name == sheet.name]
+                if bodies:
+                    parts['xl/worksheets/sheet{}.xml'.format(number)] = bodies
+
+            self._splice(parts)
+        finally:
+            self.close()
+
+    def _splice(self, parts):
+        spliced = self.path + '.spliced'
+        with zipfile.ZipFile(self.path) as saved, zipfile.ZipFile(spliced, 'w', zipfile.ZIP_DEFLATED) as out:
+            for item in saved.infolist():
+                data = saved.read(item.filename)
+                if item.filename in parts:
+                    bodies = [body() + (extent,) for extent, body in parts[item.filename]]
+                    data = splice_bodies(data.decode('utf-8'), bodies).encode('utf-8')
+                out.writestr(item, data)
+        os.replace(spliced, self.path)
+
+    def close(self):
+        """
+        Stop the worker processes, without saving.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._bodies = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.save()
+        else:
+            self.close()
@@ -0,0 +1,372 @@
+"""
+Registry of every XLMap written with an ExcelWriter, indexed by position so that the frame owning a cell, or the frames
+overlapping a range, can be found without scanning every map.
+"""
+from collections import OrderedDict
+from warnings import warn
+from weakref import ref
+
+from .xl_types import XLCell, XLRange
+
+
+class _IntervalTree:
+    """
+    Static centred interval tree.
+
+    Parameters
+    ----------
+    intervals : list of tuple
+        (start, stop, item) tuples, stop inclusive.
+
+    Notes
+    -----
+    Each node holds the intervals that contain its centre, sorted by start and by stop, intervals entirely before the
+    centre go to the left child, and entirely after to the right. Building takes O(n log n), and finding the k intervals
+    overlapping a query takes O(log n + k).
+    """
+
+    def __init__(self, intervals):
+        self.root = self._build(list(intervals))
+
+    @classmethod
+    def _build(cls, intervals):
+        if not intervals:
+            return None
+
+        ends = sorted(end for start, stop, _ in intervals for end in (start, stop))
+        center = ends[len(ends) // 2]
+
+        left = [interval for interval in intervals if interval[1] < center]
+        right = [interval for interval in intervals if interval[0] > center]
+        here = [interval for interval in intervals if interval[0] <= center <= interval[1]]
+
+        return (center,
+                sorted(here, key=lambda interval: interval[0]),
+                sorted(here, key=lambda interval: interval[1], reverse=True),
+                cls._build(left),
+                cls._build(right))
+
+    def query(self, start, stop):
+        """
+        Get the items of all intervals overlapping start to stop (inclusive).
+        """
+        found = []
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            if node is None:
+                continue
+
+            center, by_start, by_stop, left, right = node
+
+            if stop < center:
+                for interval in by_start:
+                    if interval[0] > stop:
+                        break
+                    found.append(interval[2])
+                nodes.append(left)
+            elif start > center:
+                for interval in by_stop:
+                    if interval[1] < start:
+                        break
+                    found.append(interval[2])
+                nodes.append(right)
+            else:
+                found.extend(interval[2] for interval in by_start)
+                nodes.append(left)
+                nodes.append(right)
+
+        return found
+
+
+class _RectangleTree:
+    """
+    Static two dimensional interval tree.
+
+    Parameters
+    ----------
+    rectangles : list of tuple
+        (first_row, last_row, first_col, last_col, item) tuples, last row and column inclusive.
+
+    Notes
+    -----
+    A centred interval tree over rows, each node keeping an _IntervalTree over the columns of the rectangles containing
+    its centre row, so frames side by side in the same rows are told apart by column in O(log n) rather than scanned.
+    """
+
+    def __init__(self, rectangles):
+        self.rectangles = list(rectangles)
+        self.root = self._build(self.rectangles)
+
+    @classmethod
+    def _build(cls, rectangles):
+        if not rectangles:
+            return None
+
+        ends = sorted(end for rectangle in rectangles for end in rectangle[:2])
+        center = ends[len(ends) // 2]
+
+        left = [rectangle for rectangle in rectangles if rectangle[1] < center]
+        right = [rectangle for rectangle in rectangles if rectangle[0] > center]
+        here = [(rectangle[2], rectangle[3], rectangle) for rectangle in rectangles
+                if rectangle[0] <= center <= rectangle[1]]
+
+        return center, _IntervalTree(here), cls._build(left), cls._build(right)
+
+    def query(self, first_row, last_row, first_col, last_col):
+        """
+        Get the items of all rectangles overlapping first_row to last_row and first_col to last_col (inclusive).
+        """
+        found = []
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            if node is None:
+                continue
+
+            center, columns, left, right = node
+            found.extend(rectangle[4] for rectangle in columns.query(first_col, last_col)
+                         if rectangle[0] <= last_row and first_row <= rectangle[1])
+            if first_row < center:
+                nodes.append(left)
+            if last_row > center:
+                nodes.append(right)
+
+        return found
+
+
+class _SheetIndex:
+    """
+    Rectangles of one sheet, added a few at a time.
+
+    Notes
+    -----
+    Uses the logarithmic method: rectangles are kept in _RectangleTrees of decreasing size, and a tree at least as large
+    as the one being added is merged into it, rebuilding both. Each rectangle is rebuilt into O(log n) trees, so
+    adding takes O(log^2 n) amortised, and queries search the O(log n) trees.
+    """
+
+    def __init__(self):
+        self.trees = []
+
+    def add(self, rectangles):
+        tree = _RectangleTree(rectangles)
+        while self.trees and len(self.trees[-1].rectangles) <= len(tree.rectangles):
+            tree = _RectangleTree(self.trees.pop().rectangles + tree.rectangles)
+        self.trees.append(tree)
+
+    def query(self, first_row, last_row, first_col, last_col):
+        return [item for tree in self.trees for item in tree.query(first_row, last_row, first_col, last_col)]
+
+
+class WorkbookMap:
+    """
+    Spatial index of every XLMap written to a workbook.
+
+    Every XLDataFrame.to_excel call registers the XLMap it returns with the WorkbookMap of its ExcelWriter (see
+    get_workbook_map), which keeps the data, index (every level) and columns (every header row) ranges of each map in a
+    two dimensional interval tree for each sheet.
+
+    Attributes
+    ----------
+    maps : list of XLMap
+        maps registered, in the order they were registered (copies without their frame or workbook for maps since
+        deleted).
+
+    Examples
+    --------
+    >>> risk_map = risk.to_excel(writer, sheet_name='Risk')
+    >>> workbook_map = get_workbook_map(writer)
+    >>> workbook_map.owner("'Risk'!K4012") is risk_map
+        True
+    >>> workbook_map.query_cell("'Risk'!K4012")
+        [(<XLMap: ...>, 'data')]
+
+    Notes
+    -----
+    Registering a map and looking up a cell or range both take O(log^2 n) (amortised for registering), for n maps on
+    the sheet, see _SheetIndex.
+
+    Maps are held by weak reference, as they refer back to the writer (the cycle would leave unsaved xlsxwriter
+    workbooks to be closed by the garbage collector, whose Workbook.__del__ can deadlock) and keep a copy of their
+    frame. Each map's positions and labels are kept in a copy without its frame or workbook (see
+    XLMap.from_manifest), which lookups give once the map is deleted, so frames written without keeping the XLMap
+    returned (e.g. f.to_excel(writer)) are still found.
+    """
+
+    def __init__(self):
+        self._refs = []
+        self._detached = []
+        self._sheets = {}
+
+    def register(self, xlmap, warn_overlaps=True):
+        """
+        Add xlmap to the index.
+
+        Parameters
+        ----------
+        xlmap : XLMap
+            map to add.
+        warn_overlaps : bool
+            if True (default), warn if xlmap overlaps any map already registered.
+        """
+        parts = _parts(xlmap)
+
+        if warn_overlaps:
+            overlapping = set()
+            for xlrange in parts.values():
+                overlapping.update(order for order, _ in self._query(xlrange))
+            if overlapping:
+                warn("{} overlaps {} frame(s) already written to the workbook".format(xlmap, len(overlapping)))
+
+        order = len(self._refs)
+        self._refs.append(ref(xlmap))
+        self._detached.append(xlmap._detached())
+
+        rectangles = OrderedDict()
+        for kind, xlrange in parts.items():
+            rows = sorted((xlrange.start.row, xlrange.stop.row))
+            cols = sorted((xlrange.start.col, xlrange.stop.col))
+            if kind != 'data' and _contains(xlmap.data, rows, cols):
+                continue  # written with index=False, the index range points at the first data column
+            rectangles.setdefault(xlrange.sheet, []).append((rows[0], rows[1], cols[0], cols[1], (order, kind)))
+
+        for sheet, sheet_rectangles in rectangles.items():
+            self._sheets.setdefault(sheet, _SheetIndex()).add(sheet_rectangles)
+
+    def _map(self, order):
+        xlmap = self._refs[order]()
+        return self._detached[order] if xlmap is None else xlmap
+
+    @property
+    def maps(self):
+        return [self._map(order) for order in range(len(self._refs))]
+
+    def _query(self, xlrange):
+        if isinstance(xlrange, str):
+            xlrange = XLRange.from_frange(xlrange)
+        if isinstance(xlrange, XLCell):
+            xlrange = xlrange - xlrange
+
+        try:
+            sheet = self._sheets[xlrange.sheet]
+        except KeyError:
+            return []
+
+        found = sheet.query(min(xlrange.start.row, xlrange.stop.row), max(xlrange.start.row, xlrange.stop.row),
+                            min(xlrange.start.col, xlrange.stop.col), max(xlrange.start.col, xlrange.stop.col))
+        return sorted(found)
+
+    def query_range(self, xlrange):
+        """
+        Find every part of every map overlapping xlrange.
+
+        Parameters
+        ----------
+        xlrange : XLRange or XLCell or str
+            range to look up, strs are parsed as an frange (or fcell).
+
+        Returns
+        -------
+        list of tuple
+            (xlmap, kind) for each part overlapping xlrange, where kind is 'data', 'index' or 'columns', in the order
+            the maps were registered.
+        """
+        return [(self._map(order), kind) for order, kind in self._query(xlrange)]
+
+    def query_cell(self, cell):
+        """
+        Find every part of every map containing cell.
+
+        Parameters
+        ----------
+        cell : XLCell or str
+            cell to look up, strs are parsed as an fcell.
+
+        Returns
+        -------
+        list of tuple
+            (xlmap, kind) for each part containing cell, where kind is 'data', 'index' or 'columns'.
+        """
+        return self.query_range(cell)
+
+    def owner(self, cell):
+        """
+        Get the map owning cell.
+
+        Parameters
+        ----------
+        cell : XLCell or str
+            cell to look up, strs are parsed as an fcell.
+
+        Returns
+        -------
+        XLMap or None
+            map whose data, index or columns contain cell (the most recently registered, if there are several), or
+            None.
+        """
+        found = self.query_cell(cell)
+        if not found:
+            return None
+        return found[-1][0]
+
+    def overlapping(self, xlrange):
+        """
+        Get the maps overlapping xlrange.
+
+        Parameters
+        ----------
+        xlrange : XLRange or XLCell or str
+            range to check, e.g. where a new block is about to be written.
+
+        Returns
+        -------
+        list of XLMap
+            maps with any of their data, index or columns within xlrange, in the order they were registered.
+        """
+        found = []
+        for xlmap, _ in self.query_range(xlrange):
+            if not found or found[-1] is not xlmap:
+                found.append(xlmap)
+        return found
+
+    def __len__(self):
+        return len(self._refs)
+
+    def __repr__(self):
+        return "<WorkbookMap: {} maps over {} sheets>".format(len(self), len(self._sheets))
+
+
+def _parts(xlmap):
+    """
+    Get the ranges of the data, index (every level) and columns (every header row) of xlmap.
+    """
+    index_levels, column_levels = xlmap.index_levels or [xlmap.index], xlmap.column_levels
+    return OrderedDict((('data', xlmap.data),
+                        ('index', index_levels[0].start - index_levels[-1].stop),
+                        ('columns', column_levels[0].start - column_levels[-1].stop)))
+
+
+def _contains(xlrange, rows, cols):
+    return (min(xlrange.start.row, xlrange.stop.row) <= rows[0] and rows[1] <= max(xlrange.start.row, xlrange.stop.row)
+            and min(xlrange.start.col, xlrange.stop.col) <= cols[0] and cols[1] <= max(xlrange.start.col,
+                                                                                        xlrange.stop.col))
+
+
+def get_workbook_map(writer):
+    """
+    Get the WorkbookMap attached to writer, creating it if needed.
+
+    Parameters
+    ----------
+    writer : pd.ExcelWriter
+
+    Returns
+    -------
+    WorkbookMap
+    """
+    try:
+        return writer.xl_link_workbook_map
+    except AttributeError:
+        workbook_map = writer.xl_link_workbook_map = WorkbookMap()
+        return workbook_map
@@ -1 +1,2 @@
-from .xl_types import XLCell, XLRange, to_series
+from .xl_types import XLCell, XLRange, XLRangeSet, to_series
+from .parsing import XLCellArray, XLRangeArray, parse_fcells, parse_franges
@@ -0,0 +1,275 @@
+"""
+Batch parsing of cell and range references, for ingesting large numbers of references (e.g. chart series or defined
+names read from an existing workbook) at once.
+"""
+from sys import intern
+
+import numpy as np
+
+from xl_link import counting
+from .xl_types import XLCell, XLRange, REFERENCE_PATTERN, column_number, parse_reference
+
+
+class XLCellArray:
+    """
+    Array of cell locations, stored as one int array per coordinate.
+
+    Parameters
+    ----------
+    rows, cols : ndarray
+        zero indexed rows and cols of each cell.
+    sheet_codes : ndarray
+        position of each cell's sheet within sheets.
+    sheets : list of str
+        unique sheet names.
+
+    Examples
+    --------
+    >>> cells = parse_fcells(["'Accounts'!F1", "'Accounts'!$B$7", "'Summary'!A1"])
+    >>> cells
+        <XLCellArray: 3 cells over 2 sheets>
+    >>> cells[1]
+        <XLCell: 'Accounts'!B7>
+    >>> cells.rows
+        array([0, 6, 0])
+
+    Notes
+    -----
+    Indexing with an int returns an XLCell, indexing with a slice, bool or int array returns a new XLCellArray.
+    """
+
+    def __init__(self, rows, cols, sheet_codes, sheets):
+        self.rows = rows
+        self.cols = cols
+        self.sheet_codes = sheet_codes
+        self.sheets = sheets
+
+    @property
+    def sheet_names(self):
+        """
+        Gets the sheet of each cell, as an object array.
+        """
+        return np.array(self.sheets, dtype=object)[self.sheet_codes]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return XLCell(int(self.rows[key]), int(self.cols[key]), self.sheets[self.sheet_codes[key]])
+        return XLCellArray(self.rows[key], self.cols[key], self.sheet_codes[key], self.sheets)
+
+    def __iter__(self):
+        sheets = self.sheets
+        for row, col, code in zip(self.rows.tolist(), self.cols.tolist(), self.sheet_codes.tolist()):
+            yield XLCell(row, col, sheets[code])
+
+    def __repr__(self):
+        return "<XLCellArray: {} cells over {} sheets>".format(len(self), len(self.sheets))
+
+
+class XLRangeArray:
+    """
+    Array of range locations, stored as one int array per coordinate.
+
+    Parameters
+    ----------
+    start_rows, start_cols, stop_rows, stop_cols : ndarray
+        zero indexed start and stop of each range.
+    sheet_codes : ndarray
+        position of each range's sheet within sheets.
+    sheets : list of str
+        unique sheet names.
+
+    Examples
+    --------
+    >>> ranges = parse_franges(["'Accounts'!$A$1:$A$10", "'Accounts'!B1:B10"])
+    >>> ranges[0]
+        <XLRange: 'Accounts'!A1:A10>
+    >>> ranges.starts[1]
+        <XLCell: 'Accounts'!B1>
+
+    Notes
+    -----
+    Indexing with an int returns an XLRange, indexing with a slice, bool or int array returns a new XLRangeArray.
+    """
+
+    def __init__(self, start_rows, start_cols, stop_rows, stop_cols, sheet_codes, sheets):
+        self.start_rows = start_rows
+        self.start_cols = start_cols
+        self.stop_rows = stop_rows
+        self.stop_cols = stop_cols
+        self.sheet_codes = sheet_codes
+        self.sheets = sheets
+
+    @property
+    def starts(self):
+        """
+        Gets the start of each range, as an XLCellArray.
+        """
+        return XLCellArray(self.start_rows, self.start_cols, self.sheet_codes, self.sheets)
+
+    @property
+    def stops(self):
+        """
+        Gets the stop of each range, as an XLCellArray.
+        """
+        return XLCellArray(self.stop_rows, self.stop_cols, self.sheet_codes, self.sheets)
+
+    @property
+    def sheet_names(self):
+        """
+        Gets the sheet of each range, as an object array.
+        """
+        return np.array(self.sheets, dtype=object)[self.sheet_codes]
+
+    @property
+    def shapes(self):
+        """
+        Gets the (rows, cols) shape of each range, as an n x 2 int array.
+        """
+        return np.column_stack((np.abs(self.stop_rows - self.start_rows) + 1,
+                                np.abs(self.stop_cols - self.start_cols) + 1))
+
+    def __len__(self):
+        return len(self.start_rows)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            sheet = self.sheets[self.sheet_codes[key]]
+            return XLRange(XLCell(int(self.start_rows[key]), int(self.start_cols[key]), sheet),
+                           XLCell(int(self.stop_rows[key]), int(self.stop_cols[key]), sheet))
+        return XLRangeArray(self.start_rows[key], self.start_cols[key], self.stop_rows[key], self.stop_cols[key],
+                            self.sheet_codes[key], self.sheets)
+
+    def __iter__(self):
+        sheets = self.sheets
+        for start_row, start_col, stop_row, stop_col, code in zip(self.start_rows.tolist(), self.start_cols.tolist(),
+                                                                  self.stop_rows.tolist(), self.stop_cols.tolist(),
+                                                                  self.sheet_codes.tolist()):
+            sheet = sheets[code]
+            yield XLRange(XLCell(start_row, start_col, sheet), XLCell(stop_row, stop_col, sheet))
+
+    def __repr__(self):
+        return "<XLRangeArray: {} ranges over {} sheets>".format(len(self), len(self.sheets))
+
+
+def _parse_batch(references, sheet):
+    """
+    Parse references with a single pass of REFERENCE_PATTERN over all of them.
+
+    Returns
+    -------
+    start_rows, start_cols, stop_rows, stop_cols, sheet_codes, sheets
+        stop_rows is a list of strs, with '' where a reference has no stop, and stop_cols a list of ints, with -1 where
+        a reference has no stop.
+    """
+    references = list(references)
+    if counting.active:
+        counting.tally('from_a1', len(references))
+    matches = REFERENCE_PATTERN.findall("\n".join(references)) if references else []
+
+    if len(matches) != len(references):
+        for reference in references:
+            parse_reference(reference)  # raises for the first bad reference
+        raise ValueError("References cannot contain new lines")
+
+    quoted, bare, start_cols, start_rows, stop_cols, stop_rows = zip(*matches) if matches else ((),) * 6
+
+    codes, sheets, sheet_codes = {}, [], []
+    for name in zip(quoted, bare):
+        try:
+            sheet_codes.append(codes[name])
+        except KeyError:
+            quote, plain = name
+            if quote:
+                sheet_name = intern(quote.replace("''", "'"))
+            elif plain:
+                sheet_name = intern(plain)
+            elif sheet is not None:
+                sheet_name = sheet
+            else:
+                raise ValueError("Found a reference without a sheet, and no default sheet given")
+            codes[name] = len(sheets)
+            sheet_codes.append(len(sheets))
+            sheets.append(sheet_name)
+
+    letters = {col: column_number(col) for col in set(start_cols) | set(stop_cols) if col}
+
+    return (np.array(start_rows, dtype=np.int64) - 1,
+            np.array([letters[col] for col in start_cols], dtype=np.int64),
+            stop_rows,
+            [letters.get(col, -1) for col in stop_cols],
+            np.array(sheet_codes, dtype=np.int64),
+            sheets)
+
+
+def parse_fcells(fcells, sheet=None):
+    """
+    Parse many cell references at once.
+
+    Parameters
+    ----------
+    fcells : iterable of str
+        cell references, e.g. "'Sheet1'!A1", "Sheet1!$B$2" or "'Bob''s'!C3".
+    sheet : str, optional
+        sheet to use for references without one, by default these raise a ValueError.
+
+    Returns
+    -------
+    XLCellArray
+        parsed cells, in the same order as fcells, sheet names are interned.
+
+    Raises
+    ------
+    ValueError
+        if any reference cannot be parsed, or is a range.
+    """
+    rows, cols, stop_rows, _, sheet_codes, sheets = _parse_batch(fcells, sheet)
+
+    if any(stop_rows):
+        raise ValueError("Found range reference(s) when parsing cells, use parse_franges")
+
+    return XLCellArray(rows, cols, sheet_codes, sheets)
+
+
+def parse_franges(franges, sheet=None):
+    """
+    Parse many range references at once.
+
+    Parameters
+    ----------
+    franges : iterable of str
+        range references, e.g. "'Sheet1'!A1:B20" or "Sheet1!$A$1:$A$20", single cell references are parsed as one
+        cell ranges.
+    sheet : str, optional
+        sheet to use for references without one, by default these raise a ValueError.
+
+    Returns
+    -------
+    XLRangeArray
+        parsed ranges, in the same order as franges, sheet names are interned.
+
+    Raises
+    ------
+    ValueError
+        if any reference cannot be parsed.
+
+    Examples
+    --------
+    >>> ranges = parse_franges(chart_references)
+    >>> ranges.sheet_names
+        array(['Sales', 'Sales', 'Costs'], dtype=object)
+    >>> ranges.shapes
+        array([[120,   1],
+               [120,   1],
+               [ 52,   1]])
+    """
+    start_rows, start_cols, stop_rows, stop_cols, sheet_codes, sheets = _parse_batch(franges, sheet)
+
+    stop_rows = np.array([row or 0 for row in stop_rows], dtype=np.int64) - 1
+    stop_cols = np.array(stop_cols, dtype=np.int64)
+    cells = stop_cols < 0
+    stop_rows[cells], stop_cols[cells] = start_rows[cells], start_cols[cells]
+
+    return XLRangeArray(start_rows, start_cols, stop_rows, stop_cols, sheet_codes, sheets)
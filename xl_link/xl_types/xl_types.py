@@ -1,6 +1,11 @@
+import re
+from itertools import product, repeat
+
+import numpy as np
 from pandas.core.common import is_bool_indexer
 
-from xl_link.xlsxwriter.utility import xl_rowcol_to_cell, xl_cell_to_rowcol
+from xl_link.xlsxwriter.utility import xl_rowcol_to_cell, xl_cell_to_rowcol, xl_col_to_name
+from xl_link import counting
 
 
 def is_int_type(i):
@@ -12,6 +17,68 @@ def is_int_type(i):
         return False
 
 
+MAX_COLS = 16384  # columns in an Excel sheet, cols are packed below this when hashing
+_RANGE_SHIFT = 2 ** 34  # a packed cell fits in 34 bits (2 ** 20 rows * 2 ** 14 cols)
+
+
+# "'Sheet'!$A$1:$B$2", sheet names are either quoted (with quotes escaped as '') or bare, the stop is optional
+REFERENCE_PATTERN = re.compile(r"^(?:'((?:[^'\n]|'')+)'!|([^'!:\n]+)!)?"
+                               r"\$?([A-Za-z]{1,3})\$?([0-9]+)(?::\$?([A-Za-z]{1,3})\$?([0-9]+))?$", re.MULTILINE)
+
+# an area of a multi-area reference, e.g. "'Sheet1'!A1:A5,'Sheet1'!A9:A12" (commas within quotes don't separate areas)
+AREA_PATTERN = re.compile(r"(?:'(?:[^']|'')*'|[^,'])+")
+
+
+def column_number(letters):
+    """
+    Convert column letters (e.g. 'AB') to a zero indexed column number.
+    """
+    col = 0
+    for char in letters.upper():
+        col = col * 26 + ord(char) - 64
+    return col - 1
+
+
+def quote_sheet(sheet):
+    """
+    Quote a sheet name for use in a formula, escaping any quotes within it.
+    """
+    return "'{}'".format(sheet.replace("'", "''"))
+
+
+def parse_reference(reference):
+    """
+    Parse a single cell or range reference, e.g. "'Sheet1'!$A$1:B2".
+
+    Parameters
+    ----------
+    reference : str
+        reference to parse.
+
+    Returns
+    -------
+    sheet, start_row, start_col, stop_row, stop_col : tuple
+        sheet is None if reference has no sheet, stop_row and stop_col are None for cell references.
+
+    Raises
+    ------
+    ValueError
+        if reference could not be parsed.
+    """
+    if counting.active:
+        counting.tally('from_a1')
+
+    match = REFERENCE_PATTERN.match(reference)
+    if match is None or match.end() != len(reference):
+        raise ValueError("""Could not parse reference: {}, is it in the form "'Sheet1'!A1:B2"?""".format(reference))
+
+    quoted, bare, start_col, start_row, stop_col, stop_row = match.groups()
+    sheet = quoted.replace("''", "'") if quoted is not None else bare
+    if stop_col is None:
+        return sheet, int(start_row) - 1, column_number(start_col), None, None
+    return sheet, int(start_row) - 1, column_number(start_col), int(stop_row) - 1, column_number(stop_col)
+
+
 def fill_slice(holey_slice):
     return slice(holey_slice.start if holey_slice.start is not None else 0,
                  holey_slice.stop if holey_slice.stop is not None else -1,
@@ -69,6 +136,8 @@ class XLCell:
     """
 
     def __init__(self, row, col, sheet='Sheet1'):
+        if counting.active:
+            counting.tally('xlcell')
         self.sheet = sheet
         self.row = row
         self.col = col
@@ -107,12 +176,10 @@ class XLCell:
         XLCell
             Initialised XLCell
         """
-        try:
-            sheet, cell = fcell.split('!')
-            sheet = sheet.replace("'", "")
-        except ValueError:
-            raise ValueError("""Could not parse fcell: {}, is your fcell in the form "'Sheet1'!A1:B2"?""".format(fcell))
-        return cls(*xl_cell_to_rowcol(cell), sheet)
+        sheet, row, col, stop_row, stop_col = parse_reference(fcell)
+        if sheet is None or stop_row is not None:
+            raise ValueError("""Could not parse fcell: {}, is your fcell in the form "'Sheet1'!A1"?""".format(fcell))
+        return cls(row, col, sheet)
 
     @property
     def cell(self):
@@ -148,7 +215,7 @@ class XLCell:
         >>> cell.fcell
             "'Accounts'!F1"
         """
-        return "'{}'!{}".format(self.sheet, self.cell)
+        return "{}!{}".format(quote_sheet(self.sheet), self.cell)
 
     @property
     def rowcol(self):
@@ -204,17 +271,58 @@ class XLCell:
         Notes
         -----
         other can be another XLCell or str, if a str is provided, XLCell.from_fcell will be called on other, and then
-        the comparison made. Comparisons between XLCells first compares sheets, and then for equal rows and columns.
+        the comparison made (strs that aren't fcells are unequal). Comparisons between XLCells first compares sheets,
+        and then for equal rows and columns.
         """
-        if isinstance(other, str):
-            return self == XLCell.from_fcell(other)
-
         if isinstance(other, XLCell):
-            if self.sheet != other.sheet:
+            return self.row == other.row and self.col == other.col and self.sheet == other.sheet
+
+        if isinstance(other, str):
+            try:
+                return self == XLCell.from_fcell(other)
+            except ValueError:
                 return False
-            return self.row == other.row and self.col == other.col
 
-        return False
+        return NotImplemented
+
+    @property
+    def packed(self):
+        """
+        Gets row and col packed into a single int.
+
+        Returns
+        -------
+        int
+            row * 16384 + col, which orders the same as (row, col) for any cell within Excel's limits.
+        """
+        return self.row * MAX_COLS + self.col
+
+    @property
+    def sort_key(self):
+        """
+        Gets the key XLCells are ordered by, sheet (None sorting first), then row, then col.
+        """
+        return (self.sheet or '', self.row, self.col)
+
+    def __lt__(self, other):
+        if not isinstance(other, XLCell):
+            return NotImplemented
+        return self.sort_key < other.sort_key
+
+    def __le__(self, other):
+        if not isinstance(other, XLCell):
+            return NotImplemented
+        return self.sort_key <= other.sort_key
+
+    def __gt__(self, other):
+        if not isinstance(other, XLCell):
+            return NotImplemented
+        return self.sort_key > other.sort_key
+
+    def __ge__(self, other):
+        if not isinstance(other, XLCell):
+            return NotImplemented
+        return self.sort_key >= other.sort_key
 
     def __repr__(self):
         return "<XLCell: {}>".format(self.fcell)
@@ -226,6 +334,8 @@ class XLCell:
         XLCell
             copy of self
         """
+        if counting.active:
+            counting.tally('copy')
         return XLCell(self.row, self.col, self.sheet)
 
     def translate(self, row, col):
@@ -244,6 +354,8 @@ class XLCell:
         XLCell
          new cell with translation applied
         """
+        if counting.active:
+            counting.tally('translate')
         cell = self.copy()
         cell.row += row or 0
         cell.col += col or 0
@@ -260,7 +372,7 @@ class XLCell:
         return self.translate(row, col)
 
     def __hash__(self):
-        return hash((self.row, self.col, self.sheet))
+        return hash((self.sheet, self.row * MAX_COLS + self.col))
 
 class XLRange:
     """
@@ -306,6 +418,8 @@ class XLRange:
     """
     def __init__(self, start, stop):
         assert start.sheet == stop.sheet, "start and stop must be in the same sheet"
+        if counting.active:
+            counting.tally('xlrange')
         self._sheet = start.sheet
         self.start = start.copy()
         self.stop = stop.copy()
@@ -346,9 +460,12 @@ class XLRange:
         XLRange
             initialised XLRange
         """
-        sheet, range = frange.split('!')
-        sheet = sheet.replace("'", "")
-        return cls.from_range(range, sheet)
+        sheet, start_row, start_col, stop_row, stop_col = parse_reference(frange)
+        if stop_row is None:
+            stop_row, stop_col = start_row, start_col
+        if sheet is None:
+            raise ValueError("""Could not parse frange: {}, is your frange in the form "'Sheet1'!A1:B2"?""".format(frange))
+        return cls(XLCell(start_row, start_col, sheet), XLCell(stop_row, stop_col, sheet))
 
     @property
     def sheet(self):
@@ -396,7 +513,7 @@ class XLRange:
         >>> range.frange
             "'Sheet1'!A1:B7"
         """
-        return "'{}'!{}".format(self._sheet, self.range)
+        return "{}!{}".format(quote_sheet(self._sheet), self.range)
 
     @property
     def rowcol_rowcol(self):
@@ -464,11 +581,79 @@ class XLRange:
         Will raise TypeError if self is not 1 dimensional
         """
         if self.is_1D:
-            for x in range(len(self)):
-                yield self[x]
+            yield from self.iter_cells()
         else:
             raise TypeError("Can only iterate over 1D ranges")
 
+    def iter_cells(self, form='xlcell', order='rows'):
+        """
+        Iterate over every cell within self, computing each position incrementally rather than indexing.
+
+        Parameters
+        ----------
+        form : str
+            what to yield for each cell:
+
+            * 'xlcell' (default) an XLCell
+            * 'rowcol' a (row, col) tuple
+            * 'cell' a str in excel notation, e.g. 'A1'
+            * 'fcell' a str in excel formula notation, e.g. "'Sheet1'!A1"
+        order : str
+            'rows' (default) to go along each row in turn, or 'cols' to go down each column in turn.
+
+        Yields
+        ------
+        XLCell or tuple or str
+            per cell, see form.
+
+        Examples
+        --------
+        >>> list((XLCell(0, 0) - XLCell(1, 1)).iter_cells('cell'))
+            ['A1', 'B1', 'A2', 'B2']
+        >>> list((XLCell(0, 0) - XLCell(1, 1)).iter_cells('rowcol', order='cols'))
+            [(0, 0), (1, 0), (0, 1), (1, 1)]
+        """
+        if order not in ('rows', 'cols'):
+            raise ValueError("order must be 'rows' or 'cols', not {}".format(order))
+
+        rows = range(self.start.row, self.stop.row + 1)
+        cols = range(self.start.col, self.stop.col + 1)
+        by_rows = order == 'rows'
+
+        if form == 'rowcol':
+            if by_rows:
+                yield from product(rows, cols)
+            else:
+                for col in cols:
+                    yield from zip(rows, repeat(col))
+
+        elif form == 'xlcell':
+            sheet = self._sheet
+            if by_rows:
+                for row, col in product(rows, cols):
+                    yield XLCell(row, col, sheet)
+            else:
+                for col in cols:
+                    for row in rows:
+                        yield XLCell(row, col, sheet)
+
+        elif form in ('cell', 'fcell'):
+            prefix = quote_sheet(self._sheet) + '!' if form == 'fcell' else ''
+            letters = [prefix + xl_col_to_name(col) for col in cols]
+            if by_rows:
+                for row in rows:
+                    number = str(row + 1)
+                    for col_letters in letters:
+                        yield col_letters + number
+            else:
+                numbers = [str(row + 1) for row in rows]
+                for col_letters in letters:
+                    for number in numbers:
+                        yield col_letters + number
+
+        else:
+            raise ValueError("form must be one of 'xlcell', 'rowcol', 'cell' or 'fcell', not {}".format(form))
+
     def __getitem__(self, key):
         """
         Get subsection of self using given key
@@ -484,9 +669,10 @@ class XLRange:
 
         Notes
         -----
-        int, single slice and boolean indexers can only be used on one dimensional XLRanges.
+        int, single slice, boolean and integer array indexers can only be used on one dimensional XLRanges.
 
-        Will always return an XLRange unless a scalar key is used.
+        Will return an XLCell if a scalar key is used. Boolean and integer array indexers return an XLRange if the
+        cells they select are contiguous, otherwise an XLRangeSet. Otherwise will always return an XLRange.
         """
         if is_int_type(key):
 
@@ -515,17 +701,13 @@ class XLRange:
             if not self.is_1D:
                 raise TypeError("Can only use Boolean indexers on 1D ranges")
 
-            true_positions = list(i for i, bool_ in enumerate(key) if bool_ == True)
-
-            start = min(true_positions)
-            stop = max(true_positions)
-
-            step_is_1 = ((stop - start) + 1) / len(true_positions) == 1
+            return self._select_positions(np.flatnonzero(np.asarray(key, dtype=bool)))
 
-            if not step_is_1:
-                raise TypeError("Bool indexers can't have any holes in (i.e. equivalent as slice must have step=1)")
+        elif self.is_1D and not isinstance(key, tuple) and np.ndim(key) == 1 and \
+                np.issubdtype(np.asarray(key).dtype, np.integer):
 
-            return self[start:stop]
+            positions = np.asarray(key, dtype=np.int64)
+            return self._select_positions(np.where(positions < 0, positions + len(self), positions))
 
         elif len(key) == 2:
 
@@ -560,29 +742,158 @@ class XLRange:
 
         raise TypeError("Expecting tuple of slices, boolean indexer, or an index or a slice if 1D, not {}".format(key))
 
-    def iterrows(self):
+    def _select_positions(self, positions):
+        """
+        Get the cells at positions along self (which must be 1D), as an XLRange if they are contiguous, or else an
+        XLRangeSet.
+        """
+        if self.is_row:
+            selection = XLRangeSet.from_positions(self.start.row, positions + self.start.col, self._sheet)
+        else:
+            selection = XLRangeSet.from_positions(positions + self.start.row, self.start.col, self._sheet)
+
+        return selection.ranges[0] if len(selection) == 1 else selection
+
+    def iterrows(self, form='xlrange'):
         """
         Iterate over each row of self, yields each row as XLRange
 
+        Parameters
+        ----------
+        form : str
+            what to yield for each row, 'xlrange' (default) an XLRange, 'rowcol' a ((row, col), (row, col)) tuple in
+            the form of XLRange.rowcol_rowcol, 'range' a str like 'A1:D1' or 'frange' a str like "'Sheet1'!A1:D1".
+
         Yields
         -------
-        XLRange
+        XLRange or tuple or str
             corresponding to current row
         """
         if not self.is_2D:
             raise TypeError("Can only call iterrows on 2D ranges")
 
-        for x in range(self.shape[0]):
-            yield self[x, 0] - self[x, -1]
+        first, last = self.start.col, self.stop.col
+        yield from self._iter_lines(range(self.start.row, self.stop.row + 1),
+                                    lambda row: ((row, first), (row, last)), form)
+
+    def itercols(self, form='xlrange'):
+        """
+        Iterate over each column of self, yields each column as XLRange
+
+        Parameters
+        ----------
+        form : str
+            what to yield for each column, see XLRange.iterrows.
+
+        Yields
+        -------
+        XLRange or tuple or str
+            corresponding to current column
+        """
+        if not self.is_2D:
+            raise TypeError("Can only call itercols on 2D ranges")
+
+        first, last = self.start.row, self.stop.row
+        yield from self._iter_lines(range(self.start.col, self.stop.col + 1),
+                                    lambda col: ((first, col), (last, col)), form)
+
+    def _iter_lines(self, positions, bounds, form):
+        sheet = self._sheet
+
+        if form == 'rowcol':
+            yield from map(bounds, positions)
+
+        elif form == 'xlrange':
+            for (start_row, start_col), (stop_row, stop_col) in map(bounds, positions):
+                if counting.active:
+                    counting.tally('xlrange')
+                line = XLRange.__new__(XLRange)
+                line._sheet, line.start, line.stop = sheet, XLCell(start_row, start_col, sheet), XLCell(stop_row,
+                                                                                                       stop_col, sheet)
+                yield line
+
+        elif form in ('range', 'frange'):
+            prefix = quote_sheet(sheet) + '!' if form == 'frange' else ''
+            for start, stop in map(bounds, positions):
+                yield prefix + xl_rowcol_to_cell(*start) + ':' + xl_rowcol_to_cell(*stop)
+
+        else:
+            raise ValueError("form must be one of 'xlrange', 'rowcol', 'range' or 'frange', not {}".format(form))
 
     def __eq__(self, other):
-        return self.start == other.start and self.stop == other.stop
+        """
+        Equality check.
+
+        Parameters
+        ----------
+        other : object
+            to compare for equality.
+
+        Notes
+        -----
+        other can be another XLRange or str, if a str is provided, XLRange.from_frange will be called on other, and
+        then the comparison made (strs that aren't franges are unequal).
+        """
+        if isinstance(other, XLRange):
+            return self.start == other.start and self.stop == other.stop
+
+        if isinstance(other, str):
+            try:
+                return self == XLRange.from_frange(other)
+            except ValueError:
+                return False
+
+        return NotImplemented
+
+    @property
+    def packed(self):
+        """
+        Gets start and stop packed into a single int, so ranges within one sheet can be deduplicated or sorted as an
+        int array (e.g. with np.unique).
+
+        Returns
+        -------
+        int
+            start.packed * 2 ** 34 + stop.packed, which orders the same as XLRange.sort_key (without the sheet) for
+            any range within Excel's limits.
+        """
+        return self.start.packed * _RANGE_SHIFT + self.stop.packed
+
+    @property
+    def sort_key(self):
+        """
+        Gets the key XLRanges are ordered by, sheet (None sorting first), then start, then stop.
+        """
+        return (self._sheet or '', self.start.row, self.start.col, self.stop.row, self.stop.col)
+
+    def __lt__(self, other):
+        if not isinstance(other, XLRange):
+            return NotImplemented
+        return self.sort_key < other.sort_key
+
+    def __le__(self, other):
+        if not isinstance(other, XLRange):
+            return NotImplemented
+        return self.sort_key <= other.sort_key
+
+    def __gt__(self, other):
+        if not isinstance(other, XLRange):
+            return NotImplemented
+        return self.sort_key > other.sort_key
+
+    def __ge__(self, other):
+        if not isinstance(other, XLRange):
+            return NotImplemented
+        return self.sort_key >= other.sort_key
 
     def copy(self):
+        if counting.active:
+            counting.tally('copy')
         return self.start.copy() - self.stop.copy()
 
     def __hash__(self):
-        return hash((self.start.row, self.start.col, self.stop.row, self.stop.row, self._sheet))
+        start, stop = self.start, self.stop
+        return hash((self._sheet, (start.row * MAX_COLS + start.col) * _RANGE_SHIFT + stop.row * MAX_COLS + stop.col))
 
     def translate(self, row, col):
         """
@@ -604,6 +915,8 @@ class XLRange:
         -----
         This moves the whole range, and cannot be used to change the shape of self.
         """
+        if counting.active:
+            counting.tally('translate')
         new = self.copy()
 
         new.start = new.start.translate(row, col)
@@ -620,3 +933,411 @@ class XLRange:
         XLRange.translate
         """
         return self.translate(row, col)
+
+
+def _runs(positions):
+    """
+    Split integer positions into runs of consecutive positions.
+
+    Parameters
+    ----------
+    positions : array-like
+        integer positions, duplicates and any order allowed (already sorted input is not re-sorted).
+
+    Returns
+    -------
+    list of tuple
+        (start, stop) of each run, stop inclusive, in ascending order.
+    """
+    positions = np.asarray(positions, dtype=np.int64).ravel()
+
+    if positions.size == 0:
+        return []
+
+    steps = np.diff(positions)
+    if (steps <= 0).any():
+        positions = np.unique(positions)
+        steps = np.diff(positions)
+
+    breaks = np.flatnonzero(steps != 1)
+    starts = positions[np.concatenate(([0], breaks + 1))]
+    stops = positions[np.concatenate((breaks, [positions.size - 1]))]
+
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def _merge_intervals(intervals):
+    """
+    Merge overlapping or adjacent (start, stop) intervals (stop inclusive), returning them sorted.
+    """
+    merged = []
+    for start, stop in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if stop > merged[-1][1]:
+                merged[-1] = (merged[-1][0], stop)
+        else:
+            merged.append((start, stop))
+    return tuple(merged)
+
+
+def _sweep(a, b, keep):
+    """
+    Sweep over the boundaries of two sorted lists of (start, stop, payload) segments (stop inclusive).
+
+    Yields (start, stop, payload_a, payload_b) for each stretch in which neither list changes, where payload is None
+    if the list has no segment there, and keep(payload_a, payload_b) is True.
+    """
+    bounds = sorted({start for start, _, _ in a} | {stop + 1 for _, stop, _ in a} |
+                    {start for start, _, _ in b} | {stop + 1 for _, stop, _ in b})
+    i = j = 0
+    for start, next_start in zip(bounds, bounds[1:]):
+        while i < len(a) and a[i][1] < start:
+            i += 1
+        while j < len(b) and b[j][1] < start:
+            j += 1
+        payload_a = a[i][2] if i < len(a) and a[i][0] <= start else None
+        payload_b = b[j][2] if j < len(b) and b[j][0] <= start else None
+        if keep(payload_a, payload_b):
+            yield start, next_start - 1, payload_a, payload_b
+
+
+def _combine_intervals(a, b, op):
+    """
+    Combine two merged interval tuples, keeping positions where op(in_a, in_b) holds.
+    """
+    keep = lambda in_a, in_b: op(in_a is not None, in_b is not None)
+    found = [(start, stop) for start, stop, _, _ in _sweep([s + (True,) for s in a], [s + (True,) for s in b], keep)]
+    return _merge_intervals(found)
+
+
+def _coalesce_bands(bands):
+    """
+    Drop empty bands, and merge vertically adjacent bands with identical columns.
+    """
+    coalesced = []
+    for start, stop, intervals in bands:
+        if not intervals:
+            continue
+        if coalesced and coalesced[-1][2] == intervals and coalesced[-1][1] + 1 == start:
+            coalesced[-1] = (coalesced[-1][0], stop, intervals)
+        else:
+            coalesced.append((start, stop, intervals))
+    return coalesced
+
+
+def _combine_bands(a, b, op):
+    """
+    Combine two band lists, keeping cells where op(in_a, in_b) holds.
+    """
+    bands = ((start, stop, _combine_intervals(intervals_a or (), intervals_b or (), op))
+             for start, stop, intervals_a, intervals_b in _sweep(a, b, lambda x, y: x is not None or y is not None))
+    return _coalesce_bands(bands)
+
+
+def _bands_from_rects(rects):
+    """
+    Convert (row_start, row_stop, col_start, col_stop) rectangles (stops inclusive) into bands.
+
+    Bands are (row_start, row_stop, intervals) sorted by row, where intervals are the sorted, merged (col_start,
+    col_stop) intervals covered in every row of the band.
+    """
+    rects = sorted(rects)
+    bounds = sorted({r0 for r0, _, _, _ in rects} | {r1 + 1 for _, r1, _, _ in rects})
+
+    bands = []
+    active = []
+    i = 0
+    for start, next_start in zip(bounds, bounds[1:]):
+        while i < len(rects) and rects[i][0] <= start:
+            active.append(rects[i])
+            i += 1
+        active = [rect for rect in active if rect[1] >= start]
+        bands.append((start, next_start - 1, _merge_intervals((c0, c1) for _, _, c0, c1 in active)))
+
+    return _coalesce_bands(bands)
+
+
+class XLRangeSet:
+    """
+    Represents a multi-area reference, i.e. a set of XLRanges, e.g. "'Sheet1'!A1:A5,'Sheet1'!A9:A12"
+
+    Parameters
+    ----------
+    ranges : iterable of XLRange or XLCell
+        areas that make up the set, these may overlap.
+
+    Attributes
+    ----------
+    ranges : list of XLRange
+        the rectangles covering the set.
+
+    Examples
+    --------
+    >>> column = XLRange.from_range('A1:A12')
+    >>> column[[True] * 5 + [False] * 3 + [True] * 4]
+        <XLRangeSet: 'Sheet1'!A1:A5,'Sheet1'!A9:A12>
+
+    >>> XLRangeSet([XLRange.from_range('A1:B4')]) - XLRangeSet([XLRange.from_range('A3:A3')])
+        <XLRangeSet: 'Sheet1'!A1:B2,'Sheet1'!B3:B3,'Sheet1'!A4:B4>
+
+    Notes
+    -----
+    Areas are always stored in a canonical form: each sheet is split into horizontal bands of rows that cover the
+    same columns, adjacent bands covering the same columns are merged, and overlapping or touching columns are merged
+    within each band. As a result, equal sets always have equal ranges, and a set built from a boolean mask or a
+    list of positions along a row or column is made of the fewest possible rectangles.
+
+    Union, intersection and difference are computed by sweeping over the sorted band and column boundaries of both
+    sets, rather than over individual cells.
+
+    All methods are designed to return new objects, preserving the state of self.
+    """
+
+    def __init__(self, ranges=()):
+        rects = {}
+        for xlrange in ranges:
+            if isinstance(xlrange, XLCell):
+                xlrange = xlrange - xlrange
+            rects.setdefault(xlrange.sheet, []).append(
+                (min(xlrange.start.row, xlrange.stop.row), max(xlrange.start.row, xlrange.stop.row),
+                 min(xlrange.start.col, xlrange.stop.col), max(xlrange.start.col, xlrange.stop.col)))
+
+        self._bands = {sheet: _bands_from_rects(sheet_rects) for sheet, sheet_rects in rects.items()}
+
+    @classmethod
+    def _from_bands(cls, bands):
+        new = cls()
+        new._bands = {sheet: sheet_bands for sheet, sheet_bands in bands.items() if sheet_bands}
+        return new
+
+    @classmethod
+    def from_positions(cls, rows, cols, sheet='Sheet1'):
+        """
+        Alternative constructor, for the cells at every combination of rows and cols.
+
+        Parameters
+        ----------
+        rows : int or array-like
+            row number(s) (0 indexed).
+        cols : int or array-like
+            column number(s) (0 indexed).
+        sheet : str
+            sheet the cells are in, default='Sheet1'
+
+        Returns
+        -------
+        XLRangeSet
+            initialised XLRangeSet
+
+        Notes
+        -----
+        Positions are split into runs in linear time if they are sorted, otherwise they are sorted first.
+        """
+        col_runs = tuple(_runs(cols))
+        if not col_runs:
+            return cls()
+        return cls._from_bands({sheet: [(start, stop, col_runs) for start, stop in _runs(rows)]})
+
+    @property
+    def sheets(self):
+        """
+        Names of the sheets the set covers, sorted.
+        """
+        return sorted(self._bands, key=str)
+
+    @property
+    def sheet(self):
+        """
+        Name of the sheet the set is in, raises ValueError if the set spans several sheets.
+        """
+        sheets = self.sheets
+        if len(sheets) != 1:
+            raise ValueError("XLRangeSet covers {} sheets, not 1".format(len(sheets)))
+        return sheets[0]
+
+    @property
+    def ranges(self):
+        """
+        Rectangles covering the set, ordered by sheet, then row, then column.
+
+        Returns
+        -------
+        list of XLRange
+        """
+        return [XLCell(r0, c0, sheet) - XLCell(r1, c1, sheet)
+                for sheet in self.sheets
+                for r0, r1, intervals in self._bands[sheet]
+                for c0, c1 in intervals]
+
+    @property
+    def size(self):
+        """
+        Number of cells in the set.
+        """
+        return sum((r1 - r0 + 1) * (c1 - c0 + 1)
+                   for bands in self._bands.values()
+                   for r0, r1, intervals in bands
+                   for c0, c1 in intervals)
+
+    @property
+    def range(self):
+        """
+        Gets the Excel multi-area reference this object represents, e.g. 'A1:A5,A9:A12'
+        """
+        return ",".join(xlrange.range for xlrange in self.ranges)
+
+    @property
+    def frange(self):
+        """
+        Gets the Excel multi-area reference this object represents, for use in excel formulas
+        e.g. "'Sheet1'!A1:A5,'Sheet1'!A9:A12"
+        """
+        return ",".join(xlrange.frange for xlrange in self.ranges)
+
+    def __repr__(self):
+        return "<XLRangeSet: {}>".format(self.frange)
+
+    def __len__(self):
+        """
+        Number of rectangles (areas) that make up self.
+        """
+        return sum(len(intervals) for bands in self._bands.values() for _, _, intervals in bands)
+
+    def __bool__(self):
+        return bool(self._bands)
+
+    def __iter__(self):
+        """
+        Iterate over each rectangle (as an XLRange) within self.
+        """
+        return iter(self.ranges)
+
+    def __contains__(self, cell):
+        if isinstance(cell, XLRange):
+            return not (XLRangeSet([cell]) - self)
+        if isinstance(cell, str):
+            cell = XLCell.from_fcell(cell)
+        for r0, r1, intervals in self._bands.get(cell.sheet, ()):
+            if r0 <= cell.row <= r1:
+                return any(c0 <= cell.col <= c1 for c0, c1 in intervals)
+        return False
+
+    def _combine(self, other, op):
+        if not isinstance(other, XLRangeSet):
+            other = XLRangeSet(other if isinstance(other, (list, tuple)) else [other])
+
+        return XLRangeSet._from_bands({sheet: _combine_bands(self._bands.get(sheet, []),
+                                                             other._bands.get(sheet, []), op)
+                                       for sheet in set(self._bands) | set(other._bands)})
+
+    def union(self, other):
+        """
+        Get cells in self or other.
+
+        Parameters
+        ----------
+        other : XLRangeSet or XLRange or XLCell
+
+        Returns
+        -------
+        XLRangeSet
+        """
+        return self._combine(other, lambda a, b: a or b)
+
+    def intersection(self, other):
+        """
+        Get cells in both self and other.
+
+        Parameters
+        ----------
+        other : XLRangeSet or XLRange or XLCell
+
+        Returns
+        -------
+        XLRangeSet
+        """
+        return self._combine(other, lambda a, b: a and b)
+
+    def difference(self, other):
+        """
+        Get cells in self but not in other.
+
+        Parameters
+        ----------
+        other : XLRangeSet or XLRange or XLCell
+
+        Returns
+        -------
+        XLRangeSet
+        """
+        return self._combine(other, lambda a, b: a and not b)
+
+    def __or__(self, other):
+        """
+        Alias for XLRangeSet.union
+        """
+        return self.union(other)
+
+    def __and__(self, other):
+        """
+        Alias for XLRangeSet.intersection
+        """
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        """
+        Alias for XLRangeSet.difference
+        """
+        return self.difference(other)
+
+    def __eq__(self, other):
+        if isinstance(other, (XLRange, XLCell)):
+            other = XLRangeSet([other])
+        elif isinstance(other, str):
+            areas = AREA_PATTERN.findall(other)
+            if ','.join(areas) != other:
+                return False
+            try:
+                other = XLRangeSet([XLRange.from_frange(area) for area in areas])
+            except ValueError:
+                return False
+        if not isinstance(other, XLRangeSet):
+            return NotImplemented
+        return self._bands == other._bands
+
+    def __hash__(self):
+        return hash(tuple((sheet, tuple(self._bands[sheet])) for sheet in self.sheets))
+
+    def copy(self):
+        return XLRangeSet._from_bands(dict(self._bands))
+
+    def translate(self, row, col):
+        """
+        Translates every area of self by row, col.
+
+        Parameters
+        ----------
+        row : int
+            corresponding to movement in row direction (+ve down the spreadsheet)
+        col : int
+            corresponding to movement in col direction (+ve right across the spreadsheet)
+
+        Returns
+        -------
+        XLRangeSet
+            new with translation applied
+        """
+        row, col = row or 0, col or 0
+        return XLRangeSet._from_bands({sheet: [(r0 + row, r1 + row, tuple((c0 + col, c1 + col) for c0, c1 in cols))
+                                               for r0, r1, cols in bands]
+                                       for sheet, bands in self._bands.items()})
+
+    def trans(self, row, col):
+        """
+        Short for XLRangeSet.translate
+
+        See Also
+        --------
+        XLRangeSet.translate
+        """
+        return self.translate(row, col)
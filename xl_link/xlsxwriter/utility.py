@@ -8,6 +8,8 @@ import re
 import datetime
 from warnings import warn
 
+from xl_link import counting
+
 COL_NAMES = {}
 range_parts = re.compile(r'(\$?)([A-Z]{1,3})(\$?)(\d+)')
 
@@ -26,6 +28,9 @@ def xl_rowcol_to_cell(row, col, row_abs=False, col_abs=False):
         A1 style string.
 
     """
+    if counting.active:
+        counting.tally('to_a1')
+
     row += 1  # Change to 1-index.
     row_abs = '$' if row_abs else ''
 
@@ -46,6 +51,9 @@ def xl_rowcol_to_cell_fast(row, col):
         A1 style string.
 
     """
+    if counting.active:
+        counting.tally('to_a1')
+
     if col in COL_NAMES:
         col_str = COL_NAMES[col]
     else:
@@ -67,6 +75,9 @@ def xl_col_to_name(col_num, col_abs=False):
         Column style string.
 
     """
+    if counting.active:
+        counting.tally('col_to_name')
+
     col_num += 1  # Change to 1-index.
     col_str = ''
     col_abs = '$' if col_abs else ''
@@ -101,6 +112,9 @@ def xl_cell_to_rowcol(cell_str):
         row, col: Zero indexed cell row and column indices.
 
     """
+    if counting.active:
+        counting.tally('from_a1')
+
     if not cell_str:
         return 0, 0
 
@@ -134,6 +148,9 @@ def xl_cell_to_rowcol_abs(cell_str):
         row, col, row_abs, col_abs:  Zero indexed cell row and column indices.
 
     """
+    if counting.active:
+        counting.tally('from_a1')
+
     if not cell_str:
         return 0, 0, False, False
 